@@ -1,6 +1,9 @@
+import json
 import os
 import pandas as pd
 import psycopg2
+import subprocess
+import sys
 from sqlalchemy import create_engine
 
 #directory containing your CSV files
@@ -8,6 +11,9 @@ csv_directory = r'D:\School\bakalarka\data\data_wip\redo\02-1hod_checked'
 metadata_file = r'D:\School\bakalarka\data\data_wip\redo\Metadata_by_stations.csv'
 station_metadata = r'D:\School\bakalarka\data\data_wip\redo\station_metadata_doplneno.xlsx'
 
+#django project, its compute_derived and compute_qc commands are run for imported stations
+django_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'hydro_src')
+
 #set up PostgreSQL connection parameters
 db_params = {
     'user': 'user',
@@ -20,6 +26,23 @@ db_params = {
 #create PostgreSQL engine
 engine = create_engine(f'postgresql+psycopg2://{db_params["user"]}:{db_params["password"]}@{db_params["host"]}:{db_params["port"]}/{db_params["database"]}')
 
+#aggregation used by the API when resampling, parameters not listed are averaged
+aggregation_policies = {
+    'p_mm': 'sum',
+    'wd_deg': 'vector_mean',
+    'wd_2_deg': 'vector_mean',
+    'swe_mm': 'last',
+    'swe_1_mm': 'last',
+    'hs_mm': 'last',
+    'hs_2_mm': 'last',
+    'hs_cm': 'last',
+    'hs_laser_cm': 'last',
+    'wsmax_m_s': 'max',
+    'atmax_2_degc': 'max',
+    'wsmin_m_s': 'min',
+    'atmin_2_degc': 'min',
+}
+
 #function to sanitize column names
 def sanitize_column_name(column_name):
     #check if value is NaN
@@ -60,6 +83,28 @@ def create_table_from_csv(csv_file):
     with engine.connect() as connection:
         connection.execute(f'ALTER TABLE "{table_name}" ADD PRIMARY KEY (date_time);')
 
+    #bump data version so API caches and columnar exports of this station are invalidated (data_version is created by django migrations)
+    with engine.connect() as connection:
+        version = connection.execute(
+            "INSERT INTO data_version (station, version, updated_at) VALUES (%s, 1, now()) "
+            "ON CONFLICT (station) DO UPDATE SET version = data_version.version + 1, updated_at = now() RETURNING version;", (table_name,)).scalar()
+
+    #notify live API streams (same payload as hydro.live.notify_new_rows)
+    payload = json.dumps({'station': table_name, 'start': df['date_time'].min().isoformat(), 'end': df['date_time'].max().isoformat(), 'version': version})
+    with engine.connect() as connection:
+        connection.execute("SELECT pg_notify('hydro_new_rows', %s);", (payload,))
+
+    return table_name
+
+#physically plausible ranges used by the API quality control are kept in values_metadata (seeded by django migration 0007)
+#they are read before the table is replaced, on first import the migration fills them in
+def read_valid_ranges():
+    with engine.connect() as connection:
+        columns = {row[0] for row in connection.execute("SELECT column_name FROM information_schema.columns WHERE table_name = 'values_metadata';")}
+        if not {'valid_min', 'valid_max'} <= columns:
+            return {}
+        return {name: (low, high) for name, low, high in connection.execute('SELECT django_field_name, valid_min, valid_max FROM values_metadata;')}
+
 #function to create metadata of values
 def create_value_metadata_table (csv_metadata):
 
@@ -80,6 +125,12 @@ def create_value_metadata_table (csv_metadata):
 
     df['django_field_name'] = [create_django_metadata_col_name(col) for col in df['Parameter abreviation in data file']]
 
+    df['aggregation'] = [aggregation_policies.get(name, 'mean') for name in df['django_field_name']]
+
+    valid_ranges = read_valid_ranges()
+    df['valid_min'] = [valid_ranges.get(name, (None, None))[0] for name in df['django_field_name']]
+    df['valid_max'] = [valid_ranges.get(name, (None, None))[1] for name in df['django_field_name']]
+
     #create database table
     df.to_sql(table_name, engine, index = False, if_exists='replace')
 
@@ -105,15 +156,22 @@ def create_station_metadata(csv_file):
         connection.execute(f"ALTER TABLE {table_name} ADD COLUMN geom geometry(Point, 4326);")
         connection.execute(f"UPDATE {table_name} SET geom = ST_SetSRID(ST_MakePoint(long, lat), 4326);")
 
+stations = []
 for csv_file in os.listdir(csv_directory):
     if csv_file.endswith('_hour_final.csv'):
         csv_path = os.path.join(csv_directory, csv_file)
-        create_table_from_csv(csv_path)
+        stations.append(create_table_from_csv(csv_path))
 
 
 create_value_metadata_table(metadata_file)
 create_station_metadata(station_metadata)
 
+#discharge derived from replaced water level, API hides derived series older than data version until then
+subprocess.run([sys.executable, 'manage.py', 'compute_derived', *stations], cwd=django_directory, check=True)
+
+#quality control of replaced tables, valid ranges are read from values_metadata
+subprocess.run([sys.executable, 'manage.py', 'compute_qc', *stations], cwd=django_directory, check=True)
+
 #dispose the engine connection
 engine.dispose()
 
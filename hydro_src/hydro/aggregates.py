@@ -7,4 +7,39 @@ class Percentile(models.Aggregate): #custom aggregate function for calculating p
     name = "Percentile"
 
     def __init__(self, percentile, expressions, **extra):
-        super().__init__(expressions, percentile=percentile, **extra)
\ No newline at end of file
+        super().__init__(expressions, percentile=percentile, **extra)
+
+class VectorMean(models.Aggregate): #mean direction in degrees (0-360), averages unit vectors so 350 and 10 gives 0 instead of 180
+    arity = 1
+    function = "atan2"
+    template = "degrees(%(function)s(-avg(sin(radians(%(expressions)s))), -avg(cos(radians(%(expressions)s))))) + 180"
+    name = "VectorMean"
+
+    def __init__(self, expressions, **extra):
+        super().__init__(expressions, output_field=models.FloatField(), **extra)
+
+class Last(models.Aggregate): #last non null value of the group ordered by second expression, used for state variables (snow)
+    function = "array_agg"
+    name = "Last"
+
+    def __init__(self, expressions, ordering, **extra):
+        super().__init__(expressions, ordering, output_field=models.FloatField(), **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        value, ordering = self.get_source_expressions()
+        value_sql, value_params = compiler.compile(value)
+        ordering_sql, ordering_params = compiler.compile(ordering)
+        sql = f"({self.function}({value_sql} ORDER BY {ordering_sql} DESC) FILTER (WHERE {value_sql} IS NOT NULL))[1]"
+        return sql, (*value_params, *ordering_params, *value_params)
+
+AGGREGATIONS = { #aggregation policies available in values_metadata.aggregation
+    'mean': lambda field: models.Avg(field),
+    'sum': lambda field: models.Sum(field),
+    'min': lambda field: models.Min(field),
+    'max': lambda field: models.Max(field),
+    'last': lambda field: Last(models.F(field), models.F('date_time')),
+    'vector_mean': lambda field: VectorMean(models.F(field)),
+}
+
+def get_aggregate(aggregation, field):
+    return AGGREGATIONS.get(aggregation, AGGREGATIONS['mean'])(field)
@@ -0,0 +1,61 @@
+import hashlib
+import time
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core import signing
+from lockdown.middleware import LockdownMiddleware, get_lockdown_form
+
+API_TOKEN_COOKIE = 'hydro_api_token'
+
+def is_api_request(request):
+    return request.path.startswith('/api/')
+
+def get_token_salt(): #changing lockdown passwords invalidates issued tokens
+    return 'hydro.api-token:' + hashlib.md5(str(settings.LOCKDOWN_PASSWORDS).encode()).hexdigest()
+
+def get_token_time(request): #time token was issued, None when missing, forged or older than session
+    return get_cookie_token_time(request.COOKIES.get(API_TOKEN_COOKIE))
+
+def get_cookie_token_time(value): #also used by live endpoint which runs outside django middleware
+    try:
+        return signing.loads(value, salt=get_token_salt(), max_age=settings.SESSION_COOKIE_AGE)['issued']
+    except (KeyError, TypeError, signing.BadSignature):
+        return None
+
+def set_token(response):
+    response.set_cookie(API_TOKEN_COOKIE, signing.dumps({'issued': time.time()}, salt=get_token_salt()),
+                        httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE) #browser session cookie like SESSION_EXPIRE_AT_BROWSER_CLOSE
+
+class ApiSessionMiddleware(SessionMiddleware): #api requests never save session, SESSION_SAVE_EVERY_REQUEST would write django_session on every chart call
+    def process_response(self, request, response):
+        if is_api_request(request):
+            return response
+        return super().process_response(request, response)
+
+class ApiLockdownMiddleware(LockdownMiddleware): #unlocked browsers get signed token, api requests carrying it are allowed without reading session
+    def __call__(self, request):
+        if is_api_request(request):
+            issued = get_token_time(request)
+            if issued is not None:
+                response = self.get_response(request)
+                if time.time() - issued > settings.SESSION_COOKIE_AGE / 2: #sliding expiry as session had, renewed by header only
+                    set_token(response)
+                return response
+            if not hasattr(request, 'session'): #API only profile, only lockdown exceptions let request without token through
+                request.session = {}
+            return super().__call__(request) #clients without token (e.g. scripts) fall back to session check
+
+        response = super().__call__(request)
+        if self.is_unlocked(request):
+            set_token(response)
+        return response
+
+    def is_unlocked(self, request): #same check as LockdownMiddleware.process_request does with session token
+        if getattr(settings, 'LOCKDOWN_ENABLED', True) is False:
+            return False
+        form_class = self.form or get_lockdown_form(getattr(settings, 'LOCKDOWN_FORM', 'lockdown.forms.LockdownForm'))
+        form = form_class(data=None, **self.form_kwargs)
+        token = request.session.get(self.session_key)
+        if hasattr(form, 'authenticate'):
+            return form.authenticate(token)
+        return token is True
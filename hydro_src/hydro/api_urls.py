@@ -0,0 +1,17 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import StationMetadataViewSet, yearly_chart_data, ValuesMetadataViewSet, get_percentiles, dataseries, cross_station_dataseries, ingest, overlay
+
+router = DefaultRouter()
+router.register(r'stations', StationMetadataViewSet)
+router.register(r'values', ValuesMetadataViewSet)
+
+urlpatterns = [
+    path('api/', include(router.urls)),
+    path('api/stations/<str:station_id>/<str:field>/<str:year>/yearly-data/', yearly_chart_data, name='chart-data'),
+    path('api/stations/<str:station_id>/<str:field>/percentiles/', get_percentiles, name='get_percentiles'),
+    path('api/stations/<str:station_id>/<str:field>/dataseries/', dataseries, name='get_dataseries'),
+    path('api/stations/<str:station_id>/<str:field>/overlay/', overlay, name='get_overlay'),
+    path('api/values/<str:field>/dataseries/', cross_station_dataseries, name='cross_station_dataseries'),
+    path('api/ingest/', ingest, name='ingest'),
+]
\ No newline at end of file
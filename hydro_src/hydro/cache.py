@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import re
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+try:
+    import brotli
+except ImportError: #brotli is optional, responses are only gzipped without it
+    brotli = None
+
+CACHED_HEADERS = ('X-Data-Version',) #response headers stored together with payload
+STATION_PATH_RE = re.compile(r'^/api/stations/([^/]+)/(?!$)') #station scoped routes, station list itself is not versioned
+
+def get_path_version(path): #data version the payload depends on, ingest bumps it so older entries are never served again
+    from .models import DataVersion
+    match = STATION_PATH_RE.match(path)
+    if match is None: #cross station and metadata routes depend on all stations
+        return 't{}'.format(DataVersion.get_total_version())
+    return DataVersion.get_version(match.group(1))
+
+def get_cache_key(path, ajax=False, accept='*/*', version=None): #ajax header changes format of percentiles and dataseries, accept selects renderer (*/* is what fetch sends)
+    key = 'api:{}:{}'.format(int(ajax), hashlib.md5(f'{accept}|{path}|{settings.HYDRO_YEAR_START_MONTH}'.encode()).hexdigest()) #year boundaries change payloads without data version change
+    return key if version is None else f'{key}:v{version}'
+
+def get_request_cache_key(request):
+    return get_cache_key(request.get_full_path(), request.headers.get('X-Requested-With') == 'XMLHttpRequest', request.headers.get('Accept', ''), get_path_version(request.path))
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.API_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.API_GZIP_LEVEL)
+
+def cached_headers(response):
+    return {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+
+def build_entry(content, content_type, headers=None): #raw payload with its compressed variants, compressed once when stored
+    entry = {'content_type': content_type, 'identity': content, 'headers': headers or {}}
+    entry['etag'] = quote_etag(hashlib.md5(content).hexdigest()) #same payload gives same etag in all workers
+    if len(content) >= settings.API_COMPRESSION_MIN_SIZE:
+        for encoding in available_encodings():
+            entry[encoding] = compress(content, encoding)
+    return entry
+
+def store_entry(key, content, content_type, headers=None):
+    entry = build_entry(content, content_type, headers)
+    cache.set(key, entry, settings.API_CACHE_TIMEOUT)
+    return entry
+
+def get_entry(key):
+    return cache.get(key)
+
+
+_locks = {} #per key locks of this process with number of threads using them
+_locks_guard = threading.Lock()
+
+@contextmanager
+def local_lock(key): #serializes threads of one worker computing the same key, lock is dropped when nobody waits
+    with _locks_guard:
+        lock, users = _locks.get(key, (None, 0))
+        lock = lock or threading.Lock()
+        _locks[key] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _locks_guard:
+            lock, users = _locks[key]
+            if users == 1:
+                del _locks[key]
+            else:
+                _locks[key] = (lock, users - 1)
+
+@contextmanager
+def shared_lock(key, timeout): #short critical section across workers, given up after timeout so a dead holder does not block forever
+    lock_key = f'lock:{key}'
+    deadline = time.monotonic() + timeout
+    acquired = cache.add(lock_key, 1, timeout) #atomic with memcached/redis, file cache only narrows the race
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(settings.API_COALESCE_POLL)
+        acquired = cache.add(lock_key, 1, timeout)
+    try:
+        yield
+    finally:
+        if acquired:
+            cache.delete(lock_key)
+
+def single_flight(key, compute): #concurrent misses of one cacheable key wait for a single computation instead of running the query N times
+    uncacheable_key = f'uncacheable:{key}' #last computation returned nothing to store, waiting for it would only serialize identical requests
+    if cache.get(uncacheable_key) is None:
+        with local_lock(key):
+            entry = get_entry(key) #filled while waiting for local lock
+            if entry is not None:
+                return entry
+            if cache.get(uncacheable_key) is None:
+                return coalesce(key, compute, uncacheable_key)
+    return compute()
+
+def coalesce(key, compute, uncacheable_key):
+    lock_key = f'lock:{key}'
+    deadline = time.monotonic() + settings.API_COALESCE_TIMEOUT
+    acquired = cache.add(lock_key, 1, settings.API_COALESCE_TIMEOUT) #atomic with memcached/redis, file cache only narrows the race
+    while not acquired: #other worker is computing, poll cache for its result
+        time.sleep(settings.API_COALESCE_POLL)
+        entry = get_entry(key)
+        if entry is not None:
+            return entry
+        if time.monotonic() > deadline or cache.get(uncacheable_key) is not None: #leader died, failed or got uncacheable response, compute here
+            break
+        acquired = cache.add(lock_key, 1, settings.API_COALESCE_TIMEOUT)
+    try:
+        entry = compute()
+        if entry is None:
+            cache.set(uncacheable_key, 1, settings.API_COALESCE_TIMEOUT)
+        return entry
+    finally:
+        if acquired:
+            cache.delete(lock_key)
@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from itertools import islice
+import numpy as np
+from django.conf import settings
+from .models import DataVersion
+from .routers import consistent_snapshot
+
+LOAD_CHUNK = 20000
+MANIFEST = 'manifest.json'
+
+def load_columns(model, fields, start=None, end=None, dtype=np.float64): #one pass over station table, hours since epoch and float64 (or dtype) column per field with NaN for nulls
+    queryset = model.objects.order_by('date_time')
+    if start is not None:
+        queryset = queryset.filter(date_time__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date_time__lte=end)
+    iterator = queryset.values_list('date_time', *fields).iterator(chunk_size=LOAD_CHUNK)
+    hours, columns = [], {field: [] for field in fields}
+    while True: #rows are converted chunk by chunk so whole table never exists as python objects
+        rows = list(islice(iterator, LOAD_CHUNK))
+        if not rows:
+            break
+        chunk = list(zip(*rows))
+        hours.append(np.array(chunk[0], dtype='datetime64[h]').astype(np.int64))
+        for field, values in zip(fields, chunk[1:]):
+            columns[field].append(np.array(values, dtype=dtype)) #None becomes NaN
+    if not hours:
+        return np.empty(0, dtype=np.int64), {field: np.empty(0, dtype=dtype) for field in fields}
+    return np.concatenate(hours), {field: np.concatenate(values) for field, values in columns.items()}
+
+def is_enabled():
+    return bool(settings.COLUMNAR_CACHE_DIR)
+
+def station_dir(station):
+    return os.path.join(settings.COLUMNAR_CACHE_DIR, station)
+
+def read_manifest(station):
+    try:
+        with open(os.path.join(station_dir(station), MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def export_station(station, model): #writes new version directory first, manifest is switched atomically at the end
+    fields = [f.name for f in model._meta.fields if f.name != 'date_time']
+    with consistent_snapshot(model) as using: #exported version describes exactly exported rows
+        version = DataVersion.get_version(station, using)
+        hours, columns = load_columns(model, fields)
+
+    directory = station_dir(station)
+    version_dir = os.path.join(directory, str(version))
+    tmp_dir = f'{version_dir}.tmp{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, 'date_time.npy'), hours)
+    for field, values in columns.items():
+        np.save(os.path.join(tmp_dir, f'{field}.npy'), values)
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.rename(tmp_dir, version_dir)
+
+    manifest = {'station': station, 'version': version, 'fields': fields, 'rows': len(hours), 'exported_at': datetime.now().isoformat()}
+    with open(os.path.join(directory, f'{MANIFEST}.tmp'), 'w') as f:
+        json.dump(manifest, f)
+    os.replace(os.path.join(directory, f'{MANIFEST}.tmp'), os.path.join(directory, MANIFEST))
+
+    for name in os.listdir(directory): #workers still mapping old files keep them until they are closed
+        if name.isdigit() and name != str(version):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    return manifest
+
+class MappedStation: #memory mapped columns of one exported version, pages are shared by all workers through page cache
+    def __init__(self, station, version):
+        self.directory = os.path.join(station_dir(station), str(version))
+        self.version = version
+        self.hours = np.load(os.path.join(self.directory, 'date_time.npy'), mmap_mode='r')
+        self.columns = {}
+
+    def get_column(self, field):
+        if field not in self.columns:
+            self.columns[field] = np.load(os.path.join(self.directory, f'{field}.npy'), mmap_mode='r')
+        return self.columns[field]
+
+_mapped = {}
+_mapped_lock = threading.Lock()
+
+def get_mapped_columns(model, field, version): #(hours, values) when exported file matches data version, None otherwise
+    if not is_enabled():
+        return None
+    station = model._meta.db_table
+    with _mapped_lock:
+        mapped = _mapped.get(station)
+        if mapped is None or mapped.version != version:
+            manifest = read_manifest(station)
+            if manifest is None or manifest['version'] != version or field not in manifest['fields']:
+                return None
+            try:
+                mapped = _mapped[station] = MappedStation(station, version)
+            except FileNotFoundError: #removed by newer export between reading manifest and opening files
+                return None
+        try:
+            values = mapped.get_column(field)
+        except FileNotFoundError: #field added to model after export
+            return None
+        if values.dtype != np.float64: #float32 export of older release, served from database until next export
+            return None
+        return mapped.hours, values
@@ -0,0 +1,74 @@
+import numpy as np
+from django.db import connections, transaction
+from hydro.stations.models import derived_models, station_models
+from .columnar import load_columns
+from .models import DataVersion, DerivedSeries, RatingCurve
+from .series_cache import epoch_seconds
+
+STORE_PAGE_SIZE = 5000
+
+def apply_rating_curve(hours, levels, segments): #discharge for every hour, NaN where level is missing or no segment covers it
+    discharge = np.full(len(levels), np.nan) #float64 like station columns
+    levels = np.asarray(levels, dtype=np.float64)
+    seconds = hours * 3600
+    for segment in segments: #few segments, each one is a vectorized pass over whole series
+        mask = levels > segment['h0'] #also drops NaN, power of negative base is undefined
+        if segment['valid_from'] is not None:
+            mask &= seconds >= epoch_seconds(segment['valid_from'])
+        if segment['valid_to'] is not None:
+            mask &= seconds < epoch_seconds(segment['valid_to'])
+        if segment['level_min'] is not None:
+            mask &= levels >= segment['level_min']
+        if segment['level_max'] is not None:
+            mask &= levels < segment['level_max']
+        discharge[mask] = segment['a'] * (levels[mask] - segment['h0']) ** segment['b']
+    return discharge
+
+def ensure_table(model): #derived tables are not touched by import script which recreates station tables
+    connection = connections['default']
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {table} (date_time timestamp PRIMARY KEY)')
+        for field in model._meta.fields:
+            if field.name != 'date_time':
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {connection.ops.quote_name(field.column)} double precision')
+
+def store_column(model, field, hours, values): #upsert of one derived column, NULL overwrites value computed from older data
+    from psycopg2.extras import execute_values
+    connection = connections['default']
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    sql = f'INSERT INTO {table} (date_time, {column}) VALUES %s ON CONFLICT (date_time) DO UPDATE SET {column} = EXCLUDED.{column}'
+    dates = hours.astype('datetime64[h]').tolist()
+    rows = [(date, None if value != value else value) for date, value in zip(dates, values.tolist())]
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, rows, page_size=STORE_PAGE_SIZE)
+
+def derive_discharge(station, start=None, end=None): #applies rating curve to water level, whole series when range is not given, returns number of rows
+    model = station_models[station]
+    derived = derived_models[station]
+    segments = RatingCurve.get_segments(station)
+    hours, columns = load_columns(model, [RatingCurve.LEVEL_FIELD], start, end, np.float64) #float32 level would round discharge
+    discharge = apply_rating_curve(hours, columns[RatingCurve.LEVEL_FIELD], segments)
+    ensure_table(derived)
+    store_column(derived, RatingCurve.DISCHARGE_FIELD, hours, discharge)
+    return len(hours)
+
+def materialize(station): #full recomputation, new data version invalidates everything cached from previous table
+    with transaction.atomic(using='default'):
+        rows = derive_discharge(station)
+        version = DataVersion.bump(station)
+        DerivedSeries.store(station, RatingCurve.DISCHARGE_FIELD, version)
+    return rows, version
+
+def refresh_ingested(station, start, end, fields, version): #called inside ingest transaction after version bump, only series current before ingest are kept in step, returns recomputed fields
+    if not is_derived(station, RatingCurve.DISCHARGE_FIELD) or not DerivedSeries.is_available(station, RatingCurve.DISCHARGE_FIELD, version - 1):
+        return set()
+    DerivedSeries.store(station, RatingCurve.DISCHARGE_FIELD, version)
+    if RatingCurve.LEVEL_FIELD not in fields:
+        return set()
+    derive_discharge(station, start, end)
+    return {RatingCurve.DISCHARGE_FIELD}
+
+def is_derived(station, field):
+    return station in derived_models and derived_models[station].has_field(field)
@@ -0,0 +1,10 @@
+from hydro import models as hydro_models
+from rest_framework_gis.serializers import GeoFeatureModelSerializer
+
+#kept apart from serializers.py so rest_framework_gis is imported only when geo endpoint is used
+
+class StationGeoSerializer(GeoFeatureModelSerializer):
+    class Meta:
+        model = hydro_models.StationMetadata
+        geo_field = 'geom'
+        fields = ['st_name', 'st_label', 'geom']
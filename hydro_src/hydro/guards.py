@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from django.conf import settings
+from django.db import OperationalError, connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from .routers import consistent_snapshot
+
+QUERY_CANCELED = '57014' #postgres error code raised by statement_timeout
+
+RESAMPLE_HOURS = { #approximate length of resample buckets, used only for row estimates
+    None: 1,
+    '1D': 24,
+    '1W': 24 * 7,
+    '1M': 24 * 30,
+    '1Y': 24 * 365,
+}
+
+class GuardException(APIException):
+    def __init__(self, detail):
+        super().__init__()
+        self.detail = detail #kept as is, APIException would turn numbers into strings
+
+class TooManyRows(GuardException): #response would be too large, client should resample or paginate
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = 'too_many_rows'
+
+class QueryTooExpensive(GuardException): #range or planner cost exceeds limits of the endpoint
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_code = 'query_too_expensive'
+
+def get_limits(endpoint):
+    return settings.API_LIMITS.get(endpoint, {})
+
+def as_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time())
+    return value
+
+def suggest_resample(rows, resample, max_rows): #finest coarser resample fitting into max_rows
+    hours = rows * RESAMPLE_HOURS[resample]
+    for candidate, bucket in RESAMPLE_HOURS.items():
+        if bucket > RESAMPLE_HOURS[resample] and hours / bucket <= max_rows:
+            return candidate
+    return None
+
+def choose_resample(start_date, end_date, max_points): #finest resample keeping series within point budget, used by resample=auto
+    hours = (as_datetime(end_date) - as_datetime(start_date)).total_seconds() / 3600 + 1
+    for candidate, bucket in RESAMPLE_HOURS.items():
+        if hours / bucket <= max_points:
+            return candidate
+    return '1Y'
+
+def reject(exception, message, rows, resample, max_rows):
+    detail = {'error': message, 'estimated_rows': int(rows), 'max_rows': max_rows}
+    suggestion = suggest_resample(rows, resample, max_rows) if max_rows else None
+    if suggestion is not None:
+        detail['suggested_resample'] = suggestion
+    detail['hint'] = 'use coarser resample or paginate with limit'
+    raise exception(detail)
+
+def check_range(endpoint, start_date, end_date, resample=None, series=1): #cheap estimate from range length, hourly data has one row per hour
+    limits = get_limits(endpoint)
+    start_date, end_date = as_datetime(start_date), as_datetime(end_date)
+    days = (end_date - start_date).total_seconds() / 86400
+    rows = series * (days * 24 + 1) / RESAMPLE_HOURS[resample]
+    if limits.get('max_range_days') and days > limits['max_range_days']:
+        reject(QueryTooExpensive, f'range longer than {limits["max_range_days"]} days', rows, resample, limits.get('max_rows'))
+    if limits.get('max_rows') and rows > limits['max_rows']:
+        reject(TooManyRows, 'too many rows requested', rows, resample, limits['max_rows'])
+    return rows
+
+def explain(queryset): #planner estimate without running the query, psycopg2 decodes json plan itself (QuerySet.explain would return its str())
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0][0]['Plan']
+    return plan['Plan Rows'], plan['Total Cost']
+
+def check_cost(endpoint, queryset, resample=None):
+    limits = get_limits(endpoint)
+    rows, cost = explain(queryset)
+    if limits.get('max_rows') and rows > limits['max_rows']:
+        reject(TooManyRows, 'too many rows requested', rows, resample, limits['max_rows'])
+    if limits.get('max_cost') and cost > limits['max_cost']:
+        reject(QueryTooExpensive, 'query is too expensive', rows, resample, limits.get('max_rows'))
+    return rows, cost
+
+def is_unusual(endpoint, estimated_rows): #only long requests pay for EXPLAIN round trip
+    explain_rows = get_limits(endpoint).get('explain_rows')
+    return explain_rows is not None and estimated_rows > explain_rows
+
+@contextmanager
+def statement_timeout(endpoint, model): #SET LOCAL lasts until end of transaction, queries have to be evaluated inside the block, yields connection alias for data version
+    timeout = get_limits(endpoint).get('statement_timeout')
+    try:
+        with consistent_snapshot(model) as using:
+            if timeout:
+                with connections[using].cursor() as cursor:
+                    cursor.execute('SET LOCAL statement_timeout = %s', [timeout])
+            yield using
+    except OperationalError as e:
+        if getattr(e.__cause__, 'pgcode', None) != QUERY_CANCELED:
+            raise
+        raise QueryTooExpensive({'error': f'query cancelled after {timeout} ms', 'hint': 'use shorter range or coarser resample'})
@@ -0,0 +1,122 @@
+import fcntl
+import json
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.dateparse import parse_datetime
+from hydro.stations.models import station_models
+from .derived import refresh_ingested
+from .live import notify_new_rows
+from .models import DataVersion
+from .qc import refresh_issues
+from .sketches import update_sketches
+
+logger = logging.getLogger(__name__)
+
+def upsert_rows(model, rows): #rows are {date_time: {field: value}}, one multi-row statement per page, retries of same hour only overwrite it
+    from psycopg2.extras import execute_values
+    connection = connections['default']
+    fields = sorted({field for values in rows.values() for field in values})
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [connection.ops.quote_name(model._meta.get_field(field).column) for field in fields]
+    updates = ', '.join(f'{column} = COALESCE(EXCLUDED.{column}, {table}.{column})' for column in columns) #field missing in record keeps stored value
+    sql = f'INSERT INTO {table} (date_time, {", ".join(columns)}) VALUES %s ON CONFLICT (date_time) DO UPDATE SET {updates}'
+    values = [(date_time, *(row.get(field) for field in fields)) for date_time, row in sorted(rows.items())]
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, values, page_size=settings.INGEST_PAGE_SIZE)
+
+class IngestBuffer: #accepted records are appended to spool file first and written to database in batches
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = {} #station -> {date_time: {field: value}}
+        self.size = 0
+        self.spool = None
+        self.timer = None
+
+    def open_spool(self): #own spool file is locked for process lifetime, unlocked spools belong to dead processes and are taken over
+        os.makedirs(settings.INGEST_SPOOL_DIR, exist_ok=True)
+        path = os.path.join(settings.INGEST_SPOOL_DIR, f'{os.getpid()}.jsonl')
+        self.spool = open(path, 'a+')
+        fcntl.flock(self.spool, fcntl.LOCK_EX)
+        for name in sorted(os.listdir(settings.INGEST_SPOOL_DIR)):
+            other = os.path.join(settings.INGEST_SPOOL_DIR, name)
+            if other == path or not name.endswith('.jsonl'):
+                continue
+            with open(other) as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError: #spool of running process
+                    continue
+                records = [json.loads(line) for line in f if line.strip()]
+                self.append(records)
+                os.remove(other)
+            logger.info('Recovered %s spooled records from %s', len(records), name)
+
+    def close_spool(self): #empty spool is removed while still locked, non empty one is left for next process
+        if self.spool is None:
+            return
+        if not self.rows:
+            os.remove(self.spool.name)
+        self.spool.close()
+        self.spool = None
+
+    def add(self, records): #records are validated dicts with station, date_time and values
+        records = [{'station': r['station'], 'date_time': r['date_time'].isoformat(), 'values': r['values']} for r in records]
+        with self.lock:
+            if self.spool is None:
+                self.open_spool()
+            self.append(records)
+            if self.size >= settings.INGEST_BATCH_SIZE:
+                self.flush_locked()
+            elif self.timer is None and self.size:
+                self.timer = threading.Timer(settings.INGEST_FLUSH_INTERVAL, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def append(self, records):
+        for record in records:
+            self.spool.write(json.dumps(record) + '\n')
+            row = self.rows.setdefault(record['station'], {}).setdefault(parse_datetime(record['date_time']), {})
+            if not row:
+                self.size += 1
+            row.update(record['values'])
+        self.spool.flush()
+        os.fsync(self.spool.fileno()) #record is durable before logger gets its response
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self): #one transaction per station, spool is truncated only after everything is written
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        flushed = 0
+        try:
+            for station, rows in list(self.rows.items()):
+                model = station_models[station]
+                with transaction.atomic(using='default'):
+                    upsert_rows(model, rows)
+                    version = DataVersion.bump(station)
+                    fields = {field for row in rows.values() for field in row}
+                    fields |= refresh_ingested(station, min(rows), max(rows), fields, version) #discharge derived from water level
+                    update_sketches(station, fields, min(rows), max(rows), version) #percentile sketches of touched months
+                    refresh_issues(station, model, min(rows), max(rows)) #quality issues around ingested hours
+                    notify_new_rows(station, min(rows), max(rows), version) #delivered on commit
+                flushed += len(rows)
+                self.size -= len(rows)
+                del self.rows[station]
+        except Exception: #records are spooled, logger does not need to retry
+            logger.exception('Ingest flush failed, %s rows stay spooled', self.size)
+            self.timer = threading.Timer(settings.INGEST_FLUSH_INTERVAL, self.flush) #retry later
+            self.timer.daemon = True
+            self.timer.start()
+        finally:
+            connections.close_all() #timer threads would keep their connections open
+        if not self.rows and self.spool is not None:
+            self.spool.truncate(0)
+        return flushed
+
+ingest_buffer = IngestBuffer()
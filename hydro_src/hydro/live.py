@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django.utils.dateparse import parse_datetime
+from hydro.stations.models import station_models
+from .api_access import API_TOKEN_COOKIE, get_cookie_token_time
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'hydro_new_rows'
+
+def notify_new_rows(station, start, end, version=None, using='default'): #called by ingest after commit, payload has only range because NOTIFY is limited to 8000 bytes
+    payload = json.dumps({'station': station, 'start': start.isoformat(), 'end': end.isoformat(), 'version': version})
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+
+def fetch_rows(model, fields, start, end): #new rows of subscribed fields, runs in sync thread
+    close_old_connections()
+    rows = list(model.objects.filter(date_time__gte=start, date_time__lte=end).order_by('date_time')
+                .values('date_time', *fields)[:settings.LIVE_MAX_ROWS + 1])
+    return [{'date': row.pop('date_time').isoformat(), **row} for row in rows]
+
+class Listener: #one LISTEN connection per process, notifications are read by event loop without a thread
+    def __init__(self):
+        self.subscribers = {} #station -> {queue: fields}
+        self.connection = None
+        self.loop = None
+
+    def subscribe(self, station, fields):
+        self.start()
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(station, {})[queue] = fields
+        return queue
+
+    def unsubscribe(self, station, queue):
+        station_queues = self.subscribers.get(station, {})
+        station_queues.pop(queue, None)
+        if not station_queues:
+            self.subscribers.pop(station, None)
+
+    def start(self):
+        if self.connection is not None:
+            return
+        import psycopg2 #imported here so WSGI workers never load it for live endpoint
+        self.loop = asyncio.get_running_loop()
+        self.connection = psycopg2.connect(**connection.get_connection_params())
+        self.connection.autocommit = True
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        self.loop.add_reader(self.connection.fileno(), self.on_readable)
+
+    def stop(self):
+        if self.connection is None:
+            return
+        self.loop.remove_reader(self.connection.fileno())
+        try:
+            self.connection.close()
+        finally:
+            self.connection = None
+
+    def on_readable(self):
+        try:
+            self.connection.poll()
+        except Exception as e: #connection lost, next subscriber reconnects and clients reload on error event
+            logger.warning('Live listener connection lost: %s', e)
+            self.stop()
+            for station_queues in self.subscribers.values():
+                for queue in station_queues:
+                    queue.put_nowait(None)
+            return
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            self.loop.create_task(self.dispatch(json.loads(notify.payload)))
+
+    async def dispatch(self, notification): #rows are read once per notification and split between subscribers by their fields
+        station_queues = self.subscribers.get(notification['station'])
+        if not station_queues:
+            return
+        fields = sorted(set().union(*station_queues.values()))
+        model = station_models[notification['station']]
+        rows = await sync_to_async(fetch_rows)(model, fields, parse_datetime(notification['start']), parse_datetime(notification['end']))
+        for queue, queue_fields in list(station_queues.items()):
+            if len(rows) > settings.LIVE_MAX_ROWS: #client should refetch range instead
+                queue.put_nowait({'event': 'reload', 'version': notification['version']})
+            else:
+                queue.put_nowait({'event': 'rows', 'version': notification['version'],
+                                  'rows': [{'date': row['date'], **{f: row[f] for f in queue_fields}} for row in rows]})
+
+listener = Listener()
+
+def is_authorized(scope): #same token as /api/ requests get from ApiLockdownMiddleware
+    if getattr(settings, 'LOCKDOWN_ENABLED', True) is False:
+        return True
+    cookie = SimpleCookie()
+    for name, value in scope['headers']:
+        if name == b'cookie':
+            cookie.load(value.decode('latin-1'))
+    token = cookie.get(API_TOKEN_COOKIE)
+    return token is not None and get_cookie_token_time(token.value) is not None
+
+async def send_error(send, status, message):
+    await send({'type': 'http.response.start', 'status': status, 'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps({'error': message}).encode()})
+
+def event(name, data):
+    return f'event: {name}\ndata: {json.dumps(data)}\n\n'.encode()
+
+async def live_app(scope, receive, send): #/live/stations/<station_id>/?fields=a,b, server sent events with new hourly rows
+    parts = scope['path'].strip('/').split('/')
+    if len(parts) != 3 or parts[1] != 'stations':
+        return await send_error(send, 404, 'not found')
+    if not is_authorized(scope):
+        return await send_error(send, 403, 'locked')
+    station = parts[2]
+    model = station_models.get(station)
+    if model is None:
+        return await send_error(send, 404, 'unknown station')
+    query = parse_qs(scope['query_string'].decode())
+    fields = {f for f in ','.join(query.get('fields', [])).split(',') if f}
+    if not fields or not all(model.has_field(f) and f != 'date_time' for f in fields):
+        return await send_error(send, 400, 'invalid fields')
+
+    queue = listener.subscribe(station, fields)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]}) #nginx would buffer stream
+        await send({'type': 'http.response.body', 'body': f'retry: {settings.LIVE_RETRY}\n\n'.encode(), 'more_body': True})
+        while not disconnected.done():
+            get_message = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get_message, disconnected}, timeout=settings.LIVE_KEEPALIVE, return_when=asyncio.FIRST_COMPLETED)
+            if get_message not in done:
+                get_message.cancel()
+                if not disconnected.done():
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True}) #keeps proxies from closing idle stream
+                continue
+            message = get_message.result()
+            if message is None: #listener lost database connection
+                break
+            await send({'type': 'http.response.body', 'body': event(message.pop('event'), message), 'more_body': True})
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        listener.unsubscribe(station, queue)
+        disconnected.cancel()
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+from hydro import models as hydro_models
+from hydro.derived import materialize
+from hydro.stations.models import derived_models
+
+class Command(BaseCommand): #meant to be run after import and after editing rating curves, before compute_percentiles because it bumps data version
+    help = 'Applies rating curves to water level and stores derived discharge of stations without measured discharge'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations with rating curve if omitted')
+        parser.add_argument('--force', action='store_true', help='recompute also stations which are up to date')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        field = hydro_models.RatingCurve.DISCHARGE_FIELD
+        stations = options['stations'] or sorted(set(hydro_models.RatingCurve.objects.values_list('station', flat=True)))
+        computed = skipped = 0
+        for st_name in stations:
+            if st_name not in derived_models:
+                self.stderr.write(f'{st_name}: no water level or discharge is measured, skipped')
+                continue
+            updated_at = hydro_models.RatingCurve.get_updated_at(st_name)
+            if updated_at is None:
+                self.stderr.write(f'{st_name}: no rating curve, skipped')
+                continue
+            stored = hydro_models.DerivedSeries.get(st_name, field)
+            if not options['force'] and stored is not None and stored.version == hydro_models.DataVersion.get_version(st_name) and stored.computed_at >= updated_at:
+                skipped += 1
+                continue
+            station_start = time.perf_counter()
+            try:
+                rows, version = materialize(st_name)
+                computed += 1
+                self.stdout.write(f'{st_name}.{field}: {rows} rows, version {version} in {time.perf_counter() - station_start:.2f}s')
+            except Exception as e: #one broken station should not stop the others
+                self.stderr.write(f'{st_name}: {e}')
+            finally:
+                connections.close_all()
+        self.stdout.write(self.style.SUCCESS(f'{computed} computed, {skipped} up to date in {time.perf_counter() - start:.2f}s'))
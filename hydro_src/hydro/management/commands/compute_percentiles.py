@@ -0,0 +1,78 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from django.db import connections
+from hydro import models as hydro_models
+from hydro.routers import analytical_queries, consistent_snapshot
+from hydro.views import StationMetadataViewSet
+
+def compute(st_name, field): #runs in pool worker with its own database connections, version is read in the same replica snapshot as data
+    start = time.perf_counter()
+    try:
+        model = StationMetadataViewSet.get_field_model(st_name, field)
+        with analytical_queries(), consistent_snapshot(model) as using: #sorting all values is read from replica
+            version = hydro_models.DataVersion.get_version(st_name, using)
+            rows = list(model.calculate_percentiles(field))
+        return st_name, field, version, rows, time.perf_counter() - start
+    finally:
+        connections.close_all()
+
+class Command(BaseCommand): #meant to be run after ingest, results are served by percentiles endpoint while their version matches data_version
+    help = 'Recomputes monthly percentiles of all station parameters in parallel and stores them for percentiles endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations if omitted')
+        parser.add_argument('--workers', type=int, default=4, help='number of parallel workers')
+        parser.add_argument('--pool', choices=['process', 'thread'], default='process', help='process pool also parallelizes python side of computation')
+        parser.add_argument('--force', action='store_true', help='recompute also percentiles which are up to date')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stations = options['stations'] or list(hydro_models.StationMetadata.objects.values_list('st_name', flat=True))
+        tasks, skipped = self.get_tasks(stations, options['force'])
+        self.stdout.write(f'{len(tasks)} parameters to compute, {skipped} up to date')
+
+        computed, failed = 0, []
+        connections.close_all() #forked workers must not share parent connections
+        with self.get_executor(options['pool'], options['workers']) as executor:
+            futures = {executor.submit(compute, st_name, field): (st_name, field) for st_name, field in tasks}
+            for i, future in enumerate(as_completed(futures), 1):
+                st_name, field = futures[future]
+                try:
+                    st_name, field, version, rows, seconds = future.result()
+                    hydro_models.MonthlyPercentile.store(st_name, field, version, rows) #stored one by one so interrupted run resumes where it stopped
+                    computed += 1
+                    self.stdout.write(f'[{i}/{len(tasks)}] {st_name}.{field}: {len(rows)} months in {seconds:.2f}s')
+                except Exception as e: #one broken parameter should not stop the others
+                    failed.append(f'{st_name}.{field}')
+                    self.stderr.write(f'[{i}/{len(tasks)}] {st_name}.{field}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'{computed} computed, {skipped} up to date, {len(failed)} failed in {time.perf_counter() - start:.2f}s'))
+        if failed:
+            self.stderr.write('Failed: ' + ', '.join(failed))
+
+    def get_tasks(self, stations, force): #station fields with stored percentiles older than data version
+        tasks, skipped = [], 0
+        for st_name in stations:
+            try:
+                model = StationMetadataViewSet.get_model_from_table(st_name)
+            except ValueError:
+                self.stderr.write(f'{st_name}: no data table, skipped')
+                continue
+            version = hydro_models.DataVersion.get_version(st_name)
+            fields = list(hydro_models.ValuesMetadata.objects.filter(
+                django_field_name__in=[f.name for f in model._meta.fields]).values_list('django_field_name', flat=True))
+            fields += hydro_models.DerivedSeries.get_fields(st_name, version) #discharge materialized by compute_derived
+            for field in fields:
+                if not force and hydro_models.MonthlyPercentile.get_version(st_name, field) == version:
+                    skipped += 1
+                else:
+                    tasks.append((st_name, field))
+        return tasks, skipped
+
+    @staticmethod
+    def get_executor(pool, workers):
+        if pool == 'thread':
+            return ThreadPoolExecutor(max_workers=workers)
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) #forked workers inherit configured django, spawn would need setup
@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connections
+from hydro import models as hydro_models
+from hydro.qc import find_issues, store_issues
+from hydro.routers import analytical_queries
+from hydro.views import StationMetadataViewSet
+
+class Command(BaseCommand): #meant to be run after ingest, results are served by /api/stations/<id>/qc/
+    help = 'Detects gaps, missing value runs, flat-lined sensors and out of range values in station tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations if omitted')
+        parser.add_argument('--workers', type=int, default=4, help='number of stations processed in parallel')
+
+    def handle(self, *args, **options):
+        stations = options['stations'] or list(hydro_models.StationMetadata.objects.values_list('st_name', flat=True))
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for result in executor.map(self.process, stations):
+                self.stdout.write(result)
+
+    def process(self, st_name):
+        start = time.perf_counter()
+        try:
+            model = StationMetadataViewSet.get_model_from_table(st_name)
+            with analytical_queries(): #full table scan is read from replica
+                issues = find_issues(st_name, model)
+            store_issues(st_name, issues)
+            return f'{st_name}: {len(issues)} issues in {time.perf_counter() - start:.2f}s'
+        except ValueError as e:
+            return f'{st_name}: skipped, {e}'
+        finally:
+            connections.close_all()
@@ -0,0 +1,48 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connections
+from hydro import models as hydro_models
+from hydro.routers import analytical_queries
+from hydro.sketches import compute_field
+from hydro.views import StationMetadataViewSet
+
+class Command(BaseCommand): #meant to be run after import, ingest endpoint keeps sketches up to date afterwards
+    help = 'Builds monthly percentile sketches of all station parameters for percentiles with q, start_year or end_year'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations if omitted')
+        parser.add_argument('--force', action='store_true', help='rebuild also sketches which are up to date')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stations = options['stations'] or list(hydro_models.StationMetadata.objects.values_list('st_name', flat=True))
+        computed = skipped = 0
+        failed = []
+        for st_name in stations:
+            try:
+                model = StationMetadataViewSet.get_model_from_table(st_name)
+            except ValueError:
+                self.stderr.write(f'{st_name}: no data table, skipped')
+                continue
+            version = hydro_models.DataVersion.get_version(st_name) #only skips up to date sketches, computation reads version together with data
+            fields = list(hydro_models.ValuesMetadata.objects.filter(
+                django_field_name__in=[f.name for f in model._meta.fields]).values_list('django_field_name', flat=True))
+            fields += hydro_models.DerivedSeries.get_fields(st_name, version)
+            for field in fields:
+                if not options['force'] and hydro_models.PercentileSketch.get_version(st_name, field) == version:
+                    skipped += 1
+                    continue
+                field_start = time.perf_counter()
+                try:
+                    with analytical_queries(): #full column scan is read from replica
+                        months = compute_field(st_name, field)
+                    computed += 1
+                    self.stdout.write(f'{st_name}.{field}: {months} months in {time.perf_counter() - field_start:.2f}s')
+                except Exception as e: #one broken parameter should not stop the others
+                    failed.append(f'{st_name}.{field}')
+                    self.stderr.write(f'{st_name}.{field}: {e}')
+            connections.close_all()
+
+        self.stdout.write(self.style.SUCCESS(f'{computed} computed, {skipped} up to date, {len(failed)} failed in {time.perf_counter() - start:.2f}s'))
+        if failed:
+            self.stderr.write('Failed: ' + ', '.join(failed))
@@ -0,0 +1,37 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from hydro import models as hydro_models
+from hydro.columnar import export_station, is_enabled
+from hydro.routers import analytical_queries
+from hydro.views import StationMetadataViewSet
+
+class Command(BaseCommand): #meant to be run after ingest, workers switch to new files once version in manifest matches data_version
+    help = 'Exports station tables to memory mapped columnar files in COLUMNAR_CACHE_DIR'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations if omitted')
+        parser.add_argument('--workers', type=int, default=4, help='number of stations exported in parallel')
+
+    def handle(self, *args, **options):
+        if not is_enabled():
+            raise CommandError('COLUMNAR_CACHE_DIR is not set')
+        stations = options['stations'] or list(hydro_models.StationMetadata.objects.values_list('st_name', flat=True))
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for result in executor.map(self.process, stations):
+                self.stdout.write(result)
+        self.stdout.write(self.style.SUCCESS(f'Exported to {settings.COLUMNAR_CACHE_DIR}'))
+
+    def process(self, st_name):
+        start = time.perf_counter()
+        try:
+            model = StationMetadataViewSet.get_model_from_table(st_name)
+            with analytical_queries(): #full table scan is read from replica
+                manifest = export_station(st_name, model)
+            return f"{st_name}: version {manifest['version']}, {manifest['rows']} rows in {time.perf_counter() - start:.2f}s"
+        except ValueError as e:
+            return f'{st_name}: skipped, {e}'
+        finally:
+            connections.close_all()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from hydro.ingest import ingest_buffer
+
+class Command(BaseCommand): #meant to be run after deploy or restart of API workers
+    help = 'Writes ingest records left in spool files of stopped API processes'
+
+    def handle(self, *args, **options):
+        with ingest_buffer.lock:
+            ingest_buffer.open_spool()
+            flushed = ingest_buffer.flush_locked()
+            failed = bool(ingest_buffer.rows)
+            if ingest_buffer.timer is not None:
+                ingest_buffer.timer.cancel()
+                ingest_buffer.timer = None
+            ingest_buffer.close_spool()
+        if failed:
+            raise CommandError(f'Flush failed, {ingest_buffer.size} rows stay spooled')
+        self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} rows'))
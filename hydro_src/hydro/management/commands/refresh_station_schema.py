@@ -0,0 +1,33 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hydro.stations.schema import introspect_schema, write_schema
+
+class Command(BaseCommand): #run after adding a station table or column, workers pick up the new schema on restart
+    help = 'Introspects station tables listed in station_metadata and rewrites the station schema file'
+    requires_system_checks = False #has to run while the schema file is missing
+
+    def handle(self, *args, **options):
+        try:
+            with open(settings.STATION_SCHEMA_FILE) as f:
+                old_schema = json.load(f)
+        except FileNotFoundError:
+            old_schema = {}
+        schema = introspect_schema()
+        write_schema(schema)
+
+        for table in sorted(set(schema) | set(old_schema)):
+            old_fields, new_fields = old_schema.get(table), schema.get(table)
+            if old_fields is None:
+                self.stdout.write(f'+ {table} ({len(new_fields)} fields)')
+            elif new_fields is None:
+                self.stdout.write(f'- {table}')
+            else:
+                for field in new_fields.keys() - old_fields.keys():
+                    self.stdout.write(f'+ {table}.{field}')
+                for field in old_fields.keys() - new_fields.keys():
+                    self.stdout.write(f'- {table}.{field}')
+                for field in new_fields.keys() & old_fields.keys():
+                    if new_fields[field] != old_fields[field]:
+                        self.stdout.write(f'~ {table}.{field} {old_fields[field]["type"]} -> {new_fields[field]["type"]}')
+        self.stdout.write(self.style.SUCCESS(f'{len(schema)} stations written to {settings.STATION_SCHEMA_FILE}'))
@@ -0,0 +1,39 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+#measured in fresh interpreter, time until worker could serve first request (settings, app registry, url conf with views)
+PROBE = """
+import json, os, resource, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+"""
+
+class Command(BaseCommand):
+    help = 'Measures worker startup time and memory for settings profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('profiles', nargs='*', default=['hydro_api.settings', 'hydro_api.settings_api'], help='settings modules to compare')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for profile in options['profiles']:
+            env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+            results = []
+            for _ in range(options['runs']):
+                output = subprocess.run([sys.executable, '-c', PROBE], env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+                if output.returncode != 0:
+                    raise CommandError(f'{profile} failed to start:\n{output.stderr}')
+                results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+            seconds = statistics.median(r['seconds'] for r in results)
+            rss = statistics.median(r['max_rss_kb'] for r in results)
+            self.stdout.write(f'{profile}: {seconds * 1000:.0f} ms, {rss / 1024:.1f} MiB max RSS (median of {len(results)})')
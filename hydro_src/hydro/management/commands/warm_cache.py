@@ -0,0 +1,87 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import resolve
+from hydro import models as hydro_models
+from hydro.cache import cached_headers, get_cache_key, get_path_version, store_entry
+from hydro.views import StationMetadataViewSet
+
+def dataseries_path(st_name, field, max_points): #same query as fetchSeries in scripts.js sends for empty range, cache key is built from full path
+    return f'/api/stations/{st_name}/{field}/dataseries/?start=&end=&resample=auto&max_points={max_points}'
+
+class Command(BaseCommand): #precomputes payloads requested by default page, meant to be run after every ingest
+    help = 'Fills API cache with default page payloads for all stations and their parameters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stations', nargs='*', help='station names (st_name), all stations if omitted')
+        parser.add_argument('--workers', type=int, default=4, help='number of parallel workers')
+        parser.add_argument('--clear', action='store_true', help='clear whole cache before warming')
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory()
+        if options['clear']:
+            cache.clear()
+
+        stations = options['stations'] or list(hydro_models.StationMetadata.objects.values_list('st_name', flat=True))
+        start = time.perf_counter()
+        self.warm('/api/stations/')
+        self.warm('/api/stations/geo/')
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            station_futures = [executor.submit(self.station_paths, st_name) for st_name in stations]
+            futures = []
+            for future in as_completed(station_futures): #field payloads are queued as soon as station years are known
+                futures.extend(executor.submit(self.warm, *item) for item in future.result())
+            for future in as_completed(futures):
+                future.result()
+
+        self.stdout.write(self.style.SUCCESS(f'Cache warmed in {time.perf_counter() - start:.2f}s'))
+
+    def station_paths(self, st_name): #warms station level payloads and returns field level ones
+        try:
+            model = StationMetadataViewSet.get_model_from_table(st_name)
+        except ValueError:
+            self.stderr.write(f'{st_name}: no data table, skipped')
+            return []
+        self.warm(f'/api/stations/{st_name}/values/')
+        years = self.warm(f'/api/stations/{st_name}/years/')
+        fields = list(hydro_models.ValuesMetadata.objects.filter(
+            django_field_name__in=[f.name for f in model._meta.fields]).values_list('django_field_name', flat=True))
+        fields += hydro_models.DerivedSeries.get_fields(st_name, hydro_models.DataVersion.get_version(st_name))
+
+        items = []
+        for field in fields:
+            items.extend((dataseries_path(st_name, field, max_points), True) for max_points in settings.WARM_CACHE_MAX_POINTS) #front end always sends empty range first, budget depends on chart width
+            items.append((f'/api/stations/{st_name}/{field}/percentiles/', True))
+            if years:
+                items.append((f'/api/stations/{st_name}/{field}/{years[-1]}/yearly-data/', False))
+        return items
+
+    def warm(self, path, ajax=False):
+        start = time.perf_counter()
+        headers = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'} if ajax else {}
+        request = self.factory.get(path, **headers)
+        request.cache_warming = True #skips API throttling
+        version = get_path_version(request.path)
+        match = resolve(request.path)
+        try:
+            response = match.func(request, *match.args, **match.kwargs)
+            response.render()
+            if response.status_code != 200:
+                self.stderr.write(f'{path}: status {response.status_code}')
+                return None
+            if response.has_header('X-Data-Version') and response['X-Data-Version'] != str(version): #replica is behind primary, same check as ApiCacheMiddleware
+                self.stderr.write(f'{path}: replica returned version {response["X-Data-Version"]}, expected {version}')
+                return None
+            store_entry(get_cache_key(request.get_full_path(), ajax, version=version), response.content, response['Content-Type'], cached_headers(response))
+            self.stdout.write(f'{path} {time.perf_counter() - start:.2f}s')
+            return response.data
+        except Exception as e: #one broken station or parameter should not stop warming
+            self.stderr.write(f'{path}: {e}')
+            return None
+        finally:
+            connections.close_all()
@@ -0,0 +1,79 @@
+import re
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from .cache import available_encodings, build_entry, cached_headers, get_entry, get_request_cache_key, single_flight, store_entry
+
+ACCEPT_ENCODING_RE = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?')
+PAYLOAD_HEADERS = ('content-type', 'content-length') #set again from compressed entry
+
+def negotiate_encoding(accept_encoding, available): #picks best encoding from Accept-Encoding header, None means identity
+    accepted = {}
+    for match in ACCEPT_ENCODING_RE.finditer(accept_encoding):
+        encoding, quality = match.group(1).lower(), match.group(2)
+        try:
+            accepted[encoding] = float(quality) if quality is not None else 1.0
+        except ValueError:
+            continue
+    candidates = [e for e in available if accepted.get(e, accepted.get('*', 0)) > 0]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda e: accepted.get(e, accepted.get('*', 0))) #available is ordered by preference, max keeps first of equal
+
+class ApiCacheMiddleware: #caches api GET responses together with gzip/brotli variants and serves them by Accept-Encoding
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        if request.method != 'GET':
+            response = self.get_response(request)
+            if response.status_code != 200 or response.streaming or response.has_header('Content-Encoding'):
+                return response
+            return self.compress_response(request, response)
+
+        key = get_request_cache_key(request)
+        entry = get_entry(key)
+        if entry is None:
+            response = None
+            def compute(): #returns None for responses which can not be cached
+                nonlocal response
+                response = self.get_response(request)
+                if response.status_code != 200 or response.streaming or response.has_header('Content-Encoding') or 'no-store' in response.get('Cache-Control', ''):
+                    return None
+                if response.has_header('X-Data-Version') and not key.endswith(f":v{response['X-Data-Version']}"): #replica is behind primary, payload is older than version in key
+                    return None
+                return store_entry(key, response.content, response['Content-Type'], cached_headers(response))
+
+            entry = single_flight(key, compute)
+            if entry is None:
+                if response.status_code != 200 or response.streaming or response.has_header('Content-Encoding'): #errors keep headers like Retry-After or Allow
+                    return response
+                return self.compress_response(request, response) #no-store responses are not cached but still compressed
+        return self.build_response(request, entry)
+
+    def compress_response(self, request, response): #uncached response with all headers and cookies set by view
+        headers = {header: value for header, value in response.items() if header.lower() not in PAYLOAD_HEADERS}
+        built = self.build_response(request, build_entry(response.content, response['Content-Type'], headers))
+        built.cookies = response.cookies
+        return built
+
+    def build_response(self, request, entry):
+        etag = entry.get('etag') #entries cached before etags were added have none
+        if request.method == 'GET' and etag is not None and etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')): #client revalidates copy it already has
+            response = HttpResponseNotModified()
+        else:
+            available = [e for e in available_encodings() if e in entry]
+            encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), available)
+            response = HttpResponse(entry[encoding or 'identity'], content_type=entry['content_type'])
+            if encoding is not None:
+                response['Content-Encoding'] = encoding
+            response['Content-Length'] = str(len(response.content))
+        if etag is not None:
+            response['ETag'] = etag
+        for header, value in entry.get('headers', {}).items():
+            response[header] = value
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding', 'X-Requested-With'))
+        return response
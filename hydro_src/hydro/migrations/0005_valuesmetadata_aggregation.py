@@ -0,0 +1,31 @@
+# Generated by Django 3.1.5 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydro', '0004_auto_20240607_1120'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "ALTER TABLE values_metadata ADD COLUMN IF NOT EXISTS aggregation text NOT NULL DEFAULT 'mean';",
+                "UPDATE values_metadata SET aggregation = 'sum' WHERE django_field_name IN ('p_mm');",
+                "UPDATE values_metadata SET aggregation = 'vector_mean' WHERE django_field_name IN ('wd_deg', 'wd_2_deg');",
+                "UPDATE values_metadata SET aggregation = 'last' WHERE django_field_name IN ('swe_mm', 'swe_1_mm', 'hs_mm', 'hs_2_mm', 'hs_cm', 'hs_laser_cm');",
+                "UPDATE values_metadata SET aggregation = 'max' WHERE django_field_name IN ('wsmax_m_s', 'atmax_2_degc');",
+                "UPDATE values_metadata SET aggregation = 'min' WHERE django_field_name IN ('wsmin_m_s', 'atmin_2_degc');",
+            ],
+            reverse_sql="ALTER TABLE values_metadata DROP COLUMN IF EXISTS aggregation;",
+            state_operations=[
+                migrations.AddField(
+                    model_name='valuesmetadata',
+                    name='aggregation',
+                    field=models.TextField(default='mean'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,144 @@
+# Generated by Django 3.1.5 on 2026-10-19 10:41
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    #station models moved to hydro.stations (generated from station_schema.json), auth/admin/session mirrors removed
+    #all models were unmanaged, so this only changes migration state and leaves tables untouched
+
+    dependencies = [
+        ('hydro', '0005_valuesmetadata_aggregation'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='AntyglPritok',
+        ),
+        migrations.DeleteModel(
+            name='AuthGroup',
+        ),
+        migrations.DeleteModel(
+            name='AuthGroupPermissions',
+        ),
+        migrations.DeleteModel(
+            name='AuthPermission',
+        ),
+        migrations.DeleteModel(
+            name='AuthUser',
+        ),
+        migrations.DeleteModel(
+            name='AuthUserGroups',
+        ),
+        migrations.DeleteModel(
+            name='AuthUserUserPermissions',
+        ),
+        migrations.DeleteModel(
+            name='BreznickyPotok',
+        ),
+        migrations.DeleteModel(
+            name='CernyPotok',
+        ),
+        migrations.DeleteModel(
+            name='CikanskyPotok',
+        ),
+        migrations.DeleteModel(
+            name='DjangoAdminLog',
+        ),
+        migrations.DeleteModel(
+            name='DjangoContentType',
+        ),
+        migrations.DeleteModel(
+            name='DjangoMigrations',
+        ),
+        migrations.DeleteModel(
+            name='DjangoSession',
+        ),
+        migrations.DeleteModel(
+            name='Filipohutsky',
+        ),
+        migrations.DeleteModel(
+            name='HrabeciCesta',
+        ),
+        migrations.DeleteModel(
+            name='HrebecnaMeteo',
+        ),
+        migrations.DeleteModel(
+            name='Javori',
+        ),
+        migrations.DeleteModel(
+            name='JavoriPila',
+        ),
+        migrations.DeleteModel(
+            name='Kremelna',
+        ),
+        migrations.DeleteModel(
+            name='LoseniceRejstejn',
+        ),
+        migrations.DeleteModel(
+            name='ModravaMeteoH7',
+        ),
+        migrations.DeleteModel(
+            name='Modravsky',
+        ),
+        migrations.DeleteModel(
+            name='Netradio1',
+        ),
+        migrations.DeleteModel(
+            name='Netradio2',
+        ),
+        migrations.DeleteModel(
+            name='Netradio3',
+        ),
+        migrations.DeleteModel(
+            name='PrasilskyPot',
+        ),
+        migrations.DeleteModel(
+            name='Ptaci',
+        ),
+        migrations.DeleteModel(
+            name='PtaciSpa',
+        ),
+        migrations.DeleteModel(
+            name='PtaiPotokIsco',
+        ),
+        migrations.DeleteModel(
+            name='RanklovskyPotok',
+        ),
+        migrations.DeleteModel(
+            name='RoklanskyHajenka',
+        ),
+        migrations.DeleteModel(
+            name='RoklanskyPot',
+        ),
+        migrations.DeleteModel(
+            name='Rokytka',
+        ),
+        migrations.DeleteModel(
+            name='SebestianMeteo',
+        ),
+        migrations.DeleteModel(
+            name='SlatinnyKh',
+        ),
+        migrations.DeleteModel(
+            name='SlatinnyPotok',
+        ),
+        migrations.DeleteModel(
+            name='Tmavy',
+        ),
+        migrations.DeleteModel(
+            name='VolynkaMalenice',
+        ),
+        migrations.DeleteModel(
+            name='VolynkaVimperk',
+        ),
+        migrations.DeleteModel(
+            name='ZhureckyPot',
+        ),
+        migrations.DeleteModel(
+            name='ZlatyHubertky',
+        ),
+        migrations.DeleteModel(
+            name='ZlatyMeteoHlad',
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.1.5 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydro', '0006_remove_station_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QualityIssue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.TextField()),
+                ('field', models.TextField(blank=True, null=True)),
+                ('kind', models.TextField(choices=[('gap', 'Missing hours'), ('null_run', 'Missing values'), ('flat', 'Flat-lined sensor'), ('out_of_range', 'Value out of range')])),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('hours', models.IntegerField()),
+                ('computed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'quality_issue',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='qualityissue',
+            index=models.Index(fields=['station', 'start'], name='quality_iss_station_33dccf_idx'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                "ALTER TABLE values_metadata ADD COLUMN IF NOT EXISTS valid_min double precision;",
+                "ALTER TABLE values_metadata ADD COLUMN IF NOT EXISTS valid_max double precision;",
+                "UPDATE values_metadata SET valid_min = 0, valid_max = 100 WHERE django_field_name LIKE 'rh%pct' OR django_field_name LIKE 'sm%pct';",
+                "UPDATE values_metadata SET valid_min = 0, valid_max = 360 WHERE django_field_name LIKE 'wd%deg';",
+                "UPDATE values_metadata SET valid_min = 0, valid_max = 14 WHERE django_field_name = 'ph';",
+                "UPDATE values_metadata SET valid_min = 0 WHERE django_field_name IN ('p_mm', 'ws_m_s', 'ws_2_m_s', 'wsmax_m_s', 'wsmin_m_s', 'q_m3_s', 'swe_mm', 'swe_1_mm');",
+                "UPDATE values_metadata SET valid_min = -50, valid_max = 50 WHERE django_field_name LIKE 'at%degc';",
+            ],
+            reverse_sql=[
+                "ALTER TABLE values_metadata DROP COLUMN IF EXISTS valid_min;",
+                "ALTER TABLE values_metadata DROP COLUMN IF EXISTS valid_max;",
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='valuesmetadata',
+                    name='valid_min',
+                    field=models.FloatField(blank=True, null=True),
+                ),
+                migrations.AddField(
+                    model_name='valuesmetadata',
+                    name='valid_max',
+                    field=models.FloatField(blank=True, null=True),
+                ),
+            ],
+        ),
+    ]
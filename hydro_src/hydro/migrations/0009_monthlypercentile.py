@@ -0,0 +1,37 @@
+# Generated by Django 3.1.5 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydro', '0008_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPercentile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.TextField()),
+                ('field', models.TextField()),
+                ('month', models.IntegerField()),
+                ('q10', models.FloatField(blank=True, null=True)),
+                ('q20', models.FloatField(blank=True, null=True)),
+                ('q30', models.FloatField(blank=True, null=True)),
+                ('q40', models.FloatField(blank=True, null=True)),
+                ('q50', models.FloatField(blank=True, null=True)),
+                ('q60', models.FloatField(blank=True, null=True)),
+                ('q70', models.FloatField(blank=True, null=True)),
+                ('q80', models.FloatField(blank=True, null=True)),
+                ('q90', models.FloatField(blank=True, null=True)),
+                ('version', models.BigIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'monthly_percentile',
+                'unique_together': {('station', 'field', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.1.5 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydro', '0009_monthlypercentile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivedSeries',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.TextField()),
+                ('field', models.TextField()),
+                ('version', models.BigIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'derived_series',
+                'unique_together': {('station', 'field')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingCurve',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.TextField()),
+                ('valid_from', models.DateTimeField(blank=True, null=True)),
+                ('valid_to', models.DateTimeField(blank=True, null=True)),
+                ('level_min', models.FloatField(blank=True, null=True)),
+                ('level_max', models.FloatField(blank=True, null=True)),
+                ('a', models.FloatField()),
+                ('h0', models.FloatField(default=0)),
+                ('b', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rating_curve',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='ratingcurve',
+            index=models.Index(fields=['station', 'valid_from'], name='rating_curv_station_df508a_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.1.5 on 2026-10-19 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hydro', '0010_ratingcurve_derivedseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PercentileSketch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.TextField()),
+                ('field', models.TextField()),
+                ('year', models.IntegerField()),
+                ('month', models.IntegerField()),
+                ('count', models.BigIntegerField()),
+                ('minimum', models.FloatField(blank=True, null=True)),
+                ('maximum', models.FloatField(blank=True, null=True)),
+                ('means', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('version', models.BigIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'percentile_sketch',
+                'unique_together': {('station', 'field', 'year', 'month')},
+            },
+        ),
+    ]
@@ -1,11 +1,55 @@
+from datetime import timedelta
 from django.contrib.gis.db import models
-from django.db.models import F, Func, Max, Min
-from .aggregates import Percentile
+from django.db import connections, router, transaction
+from django.db.models import F, Func, Max, Min, Sum
+from django.db.models.functions import Trunc
+from .aggregates import Percentile, get_aggregate
+from .years import get_month_shift, hydro_year, months_filter
+
+RESAMPLE_KINDS = { #values of resample parameter mapped to date_trunc precision
+    '1D': 'day',
+    '1W': 'week',
+    '1M': 'month',
+    '1Y': 'year',
+}
+
+ROLLING_FUNCTIONS = { #values of rolling parameter function mapped to SQL window aggregates
+    'mean': 'avg',
+    'sum': 'sum',
+    'min': 'min',
+    'max': 'max',
+}
+
+class YearTrunc(Func): #start of hydrological year, date is shifted into calendar year, truncated and shifted back
+    template = "date_trunc('year', %(expressions)s + %(shift)s * interval '1 month') - %(shift)s * interval '1 month'"
+    output_field = models.DateTimeField()
+
+def truncate_date(resample): #expression of resample bucket start, yearly buckets follow HYDRO_YEAR_START_MONTH
+    shift = get_month_shift()
+    if resample == '1Y' and shift:
+        return YearTrunc(F('date_time'), shift=int(shift))
+    return Trunc('date_time', RESAMPLE_KINDS[resample], output_field=models.DateTimeField())
+
+def next_bucket_start(resample, start): #start of bucket following the one starting at start, raw rows from it on belong to later buckets
+    if resample in ('1D', '1W'):
+        return start + timedelta(days=1 if resample == '1D' else 7)
+    month = start.month - 1 + (1 if resample == '1M' else 12) #hydrological year start is kept, buckets are twelve months long
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+class StationManager(models.Manager): #database is chosen when queryset is created, lazy querysets are evaluated after view returns
+    def get_queryset(self):
+        return super().get_queryset().using(router.db_for_read(self.model))
 
 class BaseStationModel(models.Model): #base station class inherited by all station models
+    objects = StationManager()
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def has_field(cls, field):
+        return field in [f.name for f in cls._meta.fields]
+
     @classmethod
     def get_date_range(cls, field): #parameters within station dont have the same date range of measurements
         first_non_null_date = cls.objects.filter(**{f"{field}__isnull": False}).aggregate(min_date=Min('date_time'))['min_date']
@@ -13,12 +57,72 @@ class BaseStationModel(models.Model): #base station class inherited by all stati
         return first_non_null_date, last_non_null_date
 
     @classmethod
-    def get_field_data(cls, field, start_date, end_date):
-        data = cls.objects.filter(date_time__gte=start_date, date_time__lte=end_date).annotate(
-            date=F('date_time'),
-            value=F(field)
-            ).values('date', 'value').order_by('date')
+    def get_field_data(cls, field, start_date, end_date, resample=None):
+        queryset = cls.objects.filter(date_time__gte=start_date, date_time__lte=end_date)
+        if resample is None:
+            data = queryset.annotate(
+                date=F('date_time'),
+                value=F(field)
+                ).values('date', 'value').order_by('date')
+        else: #grouping by truncated date in SQL, aggregation depends on parameter type
+            aggregation = ValuesMetadata.get_aggregation(field)
+            data = (queryset.annotate(date=truncate_date(resample))
+                    .values('date')
+                    .annotate(value=get_aggregate(aggregation, field))
+                    .order_by('date'))
+        return data
+
+    @classmethod
+    def get_years(cls): #loose index scan, one primary key lookup per year instead of reading whole table
+        connection = connections[router.db_for_read(cls)]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        sql = f"""
+            WITH RECURSIVE years(first) AS (
+                SELECT min(date_time) FROM {table}
+                UNION ALL
+                SELECT (SELECT min(date_time) FROM {table}
+                        WHERE date_time >= date_trunc('year', years.first + %s * interval '1 month') + interval '1 year' - %s * interval '1 month')
+                FROM years WHERE years.first IS NOT NULL
+            )
+            SELECT first FROM years WHERE first IS NOT NULL
+        """ #first hour of every year with data, next year starts where shifted calendar year ends
+        shift = get_month_shift()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [shift, shift])
+            return [hydro_year(first.year, first.month) for first, in cursor.fetchall()]
+
+    @classmethod
+    def get_rolling_field_data(cls, field, start_date, end_date, window, function): #window is timedelta, frame is (t - window, t]
+        connection = connections[router.db_for_read(cls)]
+        column = connection.ops.quote_name(cls._meta.get_field(field).column)
+        table = connection.ops.quote_name(cls._meta.db_table)
+        sql = f"""
+            SELECT date, value FROM (
+                SELECT date_time AS date,
+                       {ROLLING_FUNCTIONS[function]}({column}) OVER (ORDER BY date_time RANGE BETWEEN %s PRECEDING AND CURRENT ROW) AS value
+                FROM {table}
+                WHERE date_time >= CAST(%s AS timestamp) - %s AND date_time <= %s
+            ) rolled
+            WHERE date >= %s
+            ORDER BY date
+        """ #inner range starts one window earlier so first values of requested range have full window
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [window - timedelta(microseconds=1), start_date, window, end_date, start_date])
+            return [{'date': date, 'value': value} for date, value in cursor.fetchall()]
+
+    @classmethod
+    def get_resampled_data(cls, resample): #all fields of station, each aggregated by its own policy
+        fields = [f.name for f in cls._meta.fields if f.name != 'date_time']
+        aggregations = ValuesMetadata.get_aggregations(fields)
+        data = (cls.objects.annotate(date=truncate_date(resample))
+                .values('date')
+                .annotate(**{f'agg_{field}': get_aggregate(aggregations.get(field), field) for field in fields}) #annotation can't share name with field
+                .order_by('date'))
         return data
+
+    @staticmethod
+    def format_resampled_data(rows): #same keys as unresampled rows
+        return [{'date_time': row['date'], **{key[4:]: value for key, value in row.items() if key.startswith('agg_')}} for row in rows]
     
     @classmethod
     def calculate_percentiles(cls, field): #aggregating by month and ignoring year, used for yearly chart
@@ -39,650 +143,236 @@ class BaseStationModel(models.Model): #base station class inherited by all stati
 
         return queryset
 
-class AntyglPritok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)
-    wt_wl_degc = models.FloatField(db_column='WT_WL_degC', blank=True, null=True) 
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'antygl_pritok'
-
-
-class AuthGroup(models.Model):
-    name = models.CharField(unique=True, max_length=150)
-
-    class Meta:
-        managed = False
-        db_table = 'auth_group'
-
-
-class AuthGroupPermissions(models.Model):
-    group = models.ForeignKey(AuthGroup, models.DO_NOTHING)
-    permission = models.ForeignKey('AuthPermission', models.DO_NOTHING)
-
-    class Meta:
-        managed = False
-        db_table = 'auth_group_permissions'
-        unique_together = (('group', 'permission'),)
-
-
-class AuthPermission(models.Model):
-    name = models.CharField(max_length=255)
-    content_type = models.ForeignKey('DjangoContentType', models.DO_NOTHING)
-    codename = models.CharField(max_length=100)
-
-    class Meta:
-        managed = False
-        db_table = 'auth_permission'
-        unique_together = (('content_type', 'codename'),)
-
-
-class AuthUser(models.Model):
-    password = models.CharField(max_length=128)
-    last_login = models.DateTimeField(blank=True, null=True)
-    is_superuser = models.BooleanField()
-    username = models.CharField(unique=True, max_length=150)
-    first_name = models.CharField(max_length=150)
-    last_name = models.CharField(max_length=150)
-    email = models.CharField(max_length=254)
-    is_staff = models.BooleanField()
-    is_active = models.BooleanField()
-    date_joined = models.DateTimeField()
-
-    class Meta:
-        managed = False
-        db_table = 'auth_user'
-
-
-class AuthUserGroups(models.Model):
-    user = models.ForeignKey(AuthUser, models.DO_NOTHING)
-    group = models.ForeignKey(AuthGroup, models.DO_NOTHING)
-
-    class Meta:
-        managed = False
-        db_table = 'auth_user_groups'
-        unique_together = (('user', 'group'),)
-
-
-class AuthUserUserPermissions(models.Model):
-    user = models.ForeignKey(AuthUser, models.DO_NOTHING)
-    permission = models.ForeignKey(AuthPermission, models.DO_NOTHING)
-
-    class Meta:
-        managed = False
-        db_table = 'auth_user_user_permissions'
-        unique_together = (('user', 'permission'),)
-
-
-class BreznickyPotok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    wd_deg = models.FloatField(db_column='WD_deg', blank=True, null=True)  
-    rx_mv = models.FloatField(db_column='RX_mV', blank=True, null=True)  
-    wt_rx_degc = models.FloatField(db_column='WT_RX_degC', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    wt_ec_degc = models.FloatField(db_column='WT_EC_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'breznicky_potok'
-
-
-class CernyPotok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    rx_mv = models.FloatField(db_column='RX_mV', blank=True, null=True)  
-    wt_red_degc = models.FloatField(db_column='WT_red_degC', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'cerny_potok'
-
-
-class CikanskyPotok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    wt_ec_degc = models.FloatField(db_column='WT_EC_degC', blank=True, null=True)  
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'cikansky_potok'
-
-
-class DjangoAdminLog(models.Model):
-    action_time = models.DateTimeField()
-    object_id = models.TextField(blank=True, null=True)
-    object_repr = models.CharField(max_length=200)
-    action_flag = models.SmallIntegerField()
-    change_message = models.TextField()
-    content_type = models.ForeignKey('DjangoContentType', models.DO_NOTHING, blank=True, null=True)
-    user = models.ForeignKey(AuthUser, models.DO_NOTHING)
-
-    class Meta:
-        managed = False
-        db_table = 'django_admin_log'
-
-
-class DjangoContentType(models.Model):
-    app_label = models.CharField(max_length=100)
-    model = models.CharField(max_length=100)
-
-    class Meta:
-        managed = False
-        db_table = 'django_content_type'
-        unique_together = (('app_label', 'model'),)
-
-
-class DjangoMigrations(models.Model):
-    app = models.CharField(max_length=255)
-    name = models.CharField(max_length=255)
-    applied = models.DateTimeField()
-
-    class Meta:
-        managed = False
-        db_table = 'django_migrations'
-
-
-class DjangoSession(models.Model):
-    session_key = models.CharField(primary_key=True, max_length=40)
-    session_data = models.TextField()
-    expire_date = models.DateTimeField()
-
-    class Meta:
-        managed = False
-        db_table = 'django_session'
-
-
-class Filipohutsky(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    wt_ec_degc = models.FloatField(db_column='WT_EC_degC', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'filipohutsky'
-
-
-class HrabeciCesta(BaseStationModel):
-    at20_degc = models.FloatField(db_column='AT20_degC', blank=True, null=True)  
-    rh20_pct = models.FloatField(db_column='RH20_pct', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    ws_2_m_s = models.FloatField(db_column='WS_2_m/s', blank=True, null=True)   
-    sm10_pct = models.FloatField(db_column='SM10_pct', blank=True, null=True)  
-    st10_degc = models.FloatField(db_column='ST10_degC', blank=True, null=True)  
-    sm25_pct = models.FloatField(db_column='SM25_pct', blank=True, null=True)  
-    st25_degc = models.FloatField(db_column='ST25_degC', blank=True, null=True)  
-    sm60_pct = models.FloatField(db_column='SM60_pct', blank=True, null=True)  
-    st60_degc = models.FloatField(db_column='ST60_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'hrabeci_cesta'
-
-
-class HrebecnaMeteo(BaseStationModel):
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    hs_mm = models.FloatField(db_column='HS_mm', blank=True, null=True)  
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    wd_deg = models.FloatField(db_column='WD_deg', blank=True, null=True)  
-    gt05_degc = models.FloatField(db_column='GT05_degC', blank=True, null=True)  
-    at50_degc = models.FloatField(db_column='AT50_degC', blank=True, null=True)  
-    at20_degc = models.FloatField(db_column='AT20_degC', blank=True, null=True)  
-    sm_neg60_pct = models.FloatField(db_column='SM60_pct', blank=True, null=True)  
-    sm30_pct = models.FloatField(db_column='SM30_pct', blank=True, null=True)  
-    sm15_pct = models.FloatField(db_column='SM15_pct', blank=True, null=True)  
-    st_neg60_degc = models.FloatField(db_column='ST60_degC', blank=True, null=True)  
-    st30_degc = models.FloatField(db_column='ST30_degC', blank=True, null=True)  
-    st15_degc = models.FloatField(db_column='ST15_degC', blank=True, null=True)  
-    at25_degc = models.FloatField(db_column='AT25_degC', blank=True, null=True)  
-    at75_degc = models.FloatField(db_column='AT75_degC', blank=True, null=True)  
-    at100_degc = models.FloatField(db_column='AT100_degC', blank=True, null=True)  
-    grout_w_m2 = models.FloatField(db_column='GRout_W/m2', blank=True, null=True)   
-    ws_2_m_s = models.FloatField(db_column='WS_2_m/s', blank=True, null=True)   
-    wd_2_deg = models.FloatField(db_column='WD_2_deg', blank=True, null=True)  
-    wsmax_m_s = models.FloatField(db_column='WSmax_m/s', blank=True, null=True)   
-    wsmin_m_s = models.FloatField(db_column='WSmin_m/s', blank=True, null=True)   
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'hrebecna_meteo'
-
-
-class Javori(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    q_m3_s = models.FloatField(db_column='Q_m3/s', blank=True, null=True)   
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    sm_41_pct = models.FloatField(db_column='SM_41_pct', blank=True, null=True)  
-    st_42_degc = models.FloatField(db_column='ST_42_degC', blank=True, null=True)  
-    sm_43_pct = models.FloatField(db_column='SM_43_pct', blank=True, null=True)  
-    st_44_degc = models.FloatField(db_column='ST_44_degC', blank=True, null=True)  
-    sm_45_pct = models.FloatField(db_column='SM_45_pct', blank=True, null=True)  
-    st_46_degc = models.FloatField(db_column='ST_46_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'javori'
-
-
-class JavoriPila(BaseStationModel):
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    swe_mm = models.BigIntegerField(db_column='SWE_mm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    hs_laser_cm = models.FloatField(db_column='HS_laser_cm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'javori_pila'
-
-
-class Kremelna(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'kremelna'
-
-
-class LoseniceRejstejn(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'losenice_rejstejn'
-
-
-class ModravaMeteoH7(BaseStationModel):
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    grout_w_m2 = models.FloatField(db_column='GRout_W/m2', blank=True, null=True)   
-    swe_mm = models.FloatField(db_column='SWE_mm', blank=True, null=True)  
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    wd_deg = models.FloatField(db_column='WD_deg', blank=True, null=True)  
-    ws_2_m_s = models.FloatField(db_column='WS_2_m/s', blank=True, null=True)   
-    wd_2_deg = models.FloatField(db_column='WD_2_deg', blank=True, null=True)  
-    wsmax_m_s = models.FloatField(db_column='WSmax_m/s', blank=True, null=True)   
-    wsmin_m_s = models.FloatField(db_column='WSmin_m/s', blank=True, null=True)   
-    rh_2_pct = models.FloatField(db_column='RH_2_pct', blank=True, null=True)  
-    at_2_degc = models.FloatField(db_column='AT_2_degC', blank=True, null=True)  
-    atmin_2_degc = models.FloatField(db_column='ATmin_2_degC', blank=True, null=True)  
-    atmax_2_degc = models.FloatField(db_column='ATmax_2_degC', blank=True, null=True)  
-    sm10_pct = models.FloatField(db_column='SM10_pct', blank=True, null=True)  
-    st10_degc = models.FloatField(db_column='ST10_degC', blank=True, null=True)  
-    sm25_pct = models.FloatField(db_column='SM25_pct', blank=True, null=True)  
-    st25_degc = models.FloatField(db_column='ST25_degC', blank=True, null=True)  
-    sm60_pct = models.FloatField(db_column='SM60_pct', blank=True, null=True)  
-    st60_degc = models.FloatField(db_column='ST60_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'modrava_meteo_h7'
-
-
-class Modravsky(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    wt_ec_degc = models.FloatField(db_column='WT_EC_degC', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'modravsky'
-
-
-class Netradio1(BaseStationModel):
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    grout_w_m2 = models.FloatField(db_column='GRout_W/m2', blank=True, null=True)   
-    lwin_w_m2 = models.FloatField(db_column='LWin_W/m2', blank=True, null=True)   
-    lwout_w_m2 = models.FloatField(db_column='LWout_W/m2', blank=True, null=True)   
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'netradio_1'
-
-
-class Netradio2(BaseStationModel):
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    grout_w_m2 = models.FloatField(db_column='GRout_W/m2', blank=True, null=True)   
-    lwin_w_m2 = models.FloatField(db_column='LWin_W/m2', blank=True, null=True)   
-    lwout_w_m2 = models.FloatField(db_column='LWout_W/m2', blank=True, null=True)   
-    hs_mm = models.FloatField(db_column='HS_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'netradio_2'
-
-
-class Netradio3(BaseStationModel):
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    grout_w_m2 = models.FloatField(db_column='GRout_W/m2', blank=True, null=True)   
-    lwin_w_m2 = models.FloatField(db_column='LWin_W/m2', blank=True, null=True)   
-    lwout_w_m2 = models.FloatField(db_column='LWout_W/m2', blank=True, null=True)   
-    hs_mm = models.FloatField(db_column='HS_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+class StationMetadata(models.Model):
+    st_name = models.TextField(blank=True, primary_key=True) 
+    st_label = models.TextField(blank=True, null=True)
+    lat = models.FloatField(blank=True, null=True)
+    long = models.FloatField(blank=True, null=True)
+    masl_m_field = models.BigIntegerField(db_column='masl (m)', blank=True, null=True) 
+    geom = models.PointField(blank=True, null=True)
 
     class Meta:
         managed = False
-        db_table = 'netradio_3'
-
+        db_table = 'station_metadata'
 
-class PrasilskyPot(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
 
-    class Meta:
-        managed = False
-        db_table = 'prasilsky_pot'
-
-
-class Ptaci(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    q_m3_s = models.FloatField(db_column='Q_m3/s', blank=True, null=True)   
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    st_neg10_degc = models.FloatField(db_column='ST10_degC', blank=True, null=True)  
-    gt05_degc = models.FloatField(db_column='GT05_degC', blank=True, null=True)  
-    at40_degc = models.FloatField(db_column='AT40_degC', blank=True, null=True)  
-    at80_degc = models.FloatField(db_column='AT80_degC', blank=True, null=True)  
-    at120_degc = models.FloatField(db_column='AT120_degC', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    wl_2_mm = models.FloatField(db_column='WL_2_mm', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'ptaci'
-
-
-class PtaciSpa(BaseStationModel):
-    hs_cm = models.BigIntegerField(db_column='HS_cm', blank=True, null=True)  
-    at120_degc = models.FloatField(db_column='AT120_degC', blank=True, null=True)  
-    at90_degc = models.FloatField(db_column='AT90_degC', blank=True, null=True)  
-    at60_degc = models.FloatField(db_column='AT60_degC', blank=True, null=True)  
-    at30_degc = models.FloatField(db_column='AT30_degC', blank=True, null=True)  
-    gt05_degc = models.FloatField(db_column='GT05_degC', blank=True, null=True)  
-    st10_degc = models.FloatField(db_column='ST10_degC', blank=True, null=True)  
-    swe_mm = models.FloatField(db_column='SWE_mm', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+class ValuesMetadata(models.Model):
+    parameter = models.TextField(db_column='Parameter')  
+    parameter_abreviation_in_data_file = models.TextField(db_column='Parameter abreviation in data file')   
+    unit = models.TextField(db_column='Unit')  
+    django_field_name = models.TextField(primary_key=True)
+    aggregation = models.TextField(default='mean') #policy used when resampling, see aggregates.AGGREGATIONS
+    valid_min = models.FloatField(blank=True, null=True) #physically plausible range used by quality control, null means unchecked
+    valid_max = models.FloatField(blank=True, null=True)
 
     class Meta:
         managed = False
-        db_table = 'ptaci_spa'
-
+        db_table = 'values_metadata'
+        unique_together = (('parameter', 'parameter_abreviation_in_data_file'),)
 
-class PtaiPotokIsco(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def get_aggregation(cls, field):
+        return cls.objects.filter(django_field_name=field).values_list('aggregation', flat=True).first() or 'mean'
 
-    class Meta:
-        managed = False
-        db_table = 'ptaci_potok_isco'
+    @classmethod
+    def get_aggregations(cls, fields):
+        return dict(cls.objects.filter(django_field_name__in=fields).values_list('django_field_name', 'aggregation'))
 
+    @classmethod
+    def get_valid_ranges(cls, fields):
+        return {name: (low, high) for name, low, high in cls.objects.filter(django_field_name__in=fields)
+                .values_list('django_field_name', 'valid_min', 'valid_max')}
 
-class RanklovskyPotok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    do_mg_l = models.FloatField(db_column='DO_mg/l', blank=True, null=True)   
-    wt_do_degc = models.FloatField(db_column='WT_DO_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
 
-    class Meta:
-        managed = False
-        db_table = 'ranklovsky_potok'
+class QualityIssue(models.Model): #data quality findings of station tables, recomputed by manage.py compute_qc and around ingested hours
+    GAP = 'gap'
+    NULL_RUN = 'null_run'
+    FLAT = 'flat'
+    OUT_OF_RANGE = 'out_of_range'
+    KIND_CHOICES = [
+        (GAP, 'Missing hours'),
+        (NULL_RUN, 'Missing values'),
+        (FLAT, 'Flat-lined sensor'),
+        (OUT_OF_RANGE, 'Value out of range'),
+    ]
 
-class RoklanskyHajenka(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    station = models.TextField() #st_name, not a foreign key because station_metadata is recreated by import script
+    field = models.TextField(blank=True, null=True) #empty for gaps, whole rows are missing
+    kind = models.TextField(choices=KIND_CHOICES)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    hours = models.IntegerField()
+    computed_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        managed = False
-        db_table = 'roklansky_hajenka'
+        db_table = 'quality_issue'
+        indexes = [models.Index(fields=['station', 'start'])]
 
-class RoklanskyPot(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    q_m3_s = models.FloatField(db_column='Q_m3/s', blank=True, null=True)   
-    ec_3_micros_cm = models.FloatField(db_column='EC_3_microS/cm', blank=True, null=True)   
-    ec_4_micros_cm = models.FloatField(db_column='EC_4_microS/cm', blank=True, null=True)   
-    ec_5_micros_cm = models.FloatField(db_column='EC_5_microS/cm', blank=True, null=True)   
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
 
-    class Meta:
-        managed = False
-        db_table = 'roklansky_pot'
-
-
-class Rokytka(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    q_m3_s = models.FloatField(db_column='Q_m3/s', blank=True, null=True)   
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    swe_mm = models.FloatField(db_column='SWE_mm', blank=True, null=True)  
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    rx_mv = models.FloatField(db_column='RX_mV', blank=True, null=True)  
-    wt_ecdegc = models.FloatField(db_column='WT_ECdegC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    wd_deg = models.FloatField(db_column='WD_deg', blank=True, null=True)  
-    ws_2_m_s = models.FloatField(db_column='WS_2_m/s', blank=True, null=True)   
-    wd_2_deg = models.FloatField(db_column='WD_2_deg', blank=True, null=True)  
-    wsmax_m_s = models.FloatField(db_column='WSmax_m/s', blank=True, null=True)   
-    wsmin_m_s = models.FloatField(db_column='WSmin_m/s', blank=True, null=True)   
-    date_time = models.DateTimeField(primary_key=True)
+class DataVersion(models.Model): #incremented on every ingest of station table, derived caches compare against it
+    station = models.TextField(primary_key=True) #st_name
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        managed = False
-        db_table = 'rokytka'
-
+        db_table = 'data_version'
 
-class SebestianMeteo(BaseStationModel):
-    ws_m_s = models.FloatField(db_column='WS_m/s', blank=True, null=True)   
-    wd_deg = models.FloatField(db_column='WD_deg', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    gr_w_m2 = models.FloatField(db_column='GR_W/m2', blank=True, null=True)   
-    st10_degc = models.FloatField(db_column='ST10_degC', blank=True, null=True)  
-    gt05_degc = models.FloatField(db_column='GT05_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
-
-    class Meta:
-        managed = False
-        db_table = 'sebestian_meteo'
+    @classmethod
+    def get_version(cls, station, using='default'): #0 for stations never ingested since versioning was added, views read it from replica together with data
+        return cls.objects.using(using).filter(station=station).values_list('version', flat=True).first() or 0
 
+    @classmethod
+    def get_total_version(cls): #grows with every bump of any station, used by routes reading all stations
+        return cls.objects.aggregate(total=Sum('version'))['total'] or 0
 
-class SlatinnyKh(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    wl_2_mm = models.FloatField(db_column='WL_2_mm', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    ec_uncomp_micros_cm = models.FloatField(db_column='EC_uncomp_microS/cm', blank=True, null=True)   
-    ph = models.FloatField(db_column='pH_-', blank=True, null=True)    
-    wt_ph_degc = models.FloatField(db_column='WT_pH_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def bump(cls, station):
+        updated = cls.objects.filter(station=station).update(version=F('version') + 1)
+        if not updated:
+            cls.objects.get_or_create(station=station, defaults={'version': 1})
+        return cls.get_version(station)
+
+
+class MonthlyPercentile(models.Model): #precomputed result of calculate_percentiles, filled by manage.py compute_percentiles
+    QUANTILES = ['q10', 'q20', 'q30', 'q40', 'q50', 'q60', 'q70', 'q80', 'q90']
+
+    station = models.TextField()
+    field = models.TextField()
+    month = models.IntegerField()
+    q10 = models.FloatField(blank=True, null=True)
+    q20 = models.FloatField(blank=True, null=True)
+    q30 = models.FloatField(blank=True, null=True)
+    q40 = models.FloatField(blank=True, null=True)
+    q50 = models.FloatField(blank=True, null=True)
+    q60 = models.FloatField(blank=True, null=True)
+    q70 = models.FloatField(blank=True, null=True)
+    q80 = models.FloatField(blank=True, null=True)
+    q90 = models.FloatField(blank=True, null=True)
+    version = models.BigIntegerField() #DataVersion of station the percentiles were computed from
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'monthly_percentile'
+        unique_together = (('station', 'field', 'month'),)
 
-    class Meta:
-        managed = False
-        db_table = 'slatinny_kh'
+    @classmethod
+    def get_version(cls, station, field): #None when not computed yet
+        return cls.objects.filter(station=station, field=field).values_list('version', flat=True).first()
 
+    @classmethod
+    def get_percentiles(cls, station, field, version): #same rows as BaseStationModel.calculate_percentiles, None when missing or stale
+        rows = list(cls.objects.filter(station=station, field=field, version=version).order_by('month').values('month', *cls.QUANTILES))
+        if not rows:
+            return None
+        return [{'string_date_without_year': f"{row.pop('month'):02d}-01T00:00:00", **row} for row in rows]
 
-class SlatinnyPotok(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def store(cls, station, field, version, rows): #replaces all months of station field in one transaction
+        with transaction.atomic():
+            cls.objects.filter(station=station, field=field).delete()
+            cls.objects.bulk_create([cls(station=station, field=field, version=version, month=int(row['string_date_without_year'][:2]),
+                                         **{q: row[q] for q in cls.QUANTILES}) for row in rows])
 
-    class Meta:
-        managed = False
-        db_table = 'slatinny_potok'
 
+class RatingCurve(models.Model): #one segment of stage-discharge relation Q = a * (h - h0) ** b, edited by hydrologists, applied by manage.py compute_derived
+    LEVEL_FIELD = 'wl_mm'
+    DISCHARGE_FIELD = 'q_m3_s'
 
-class StationMetadata(models.Model):
-    st_name = models.TextField(blank=True, primary_key=True) 
-    st_label = models.TextField(blank=True, null=True)
-    lat = models.FloatField(blank=True, null=True)
-    long = models.FloatField(blank=True, null=True)
-    masl_m_field = models.BigIntegerField(db_column='masl (m)', blank=True, null=True) 
-    geom = models.PointField(blank=True, null=True)
+    station = models.TextField() #st_name
+    valid_from = models.DateTimeField(blank=True, null=True) #null means since beginning of measurements
+    valid_to = models.DateTimeField(blank=True, null=True) #exclusive, null means still valid
+    level_min = models.FloatField(blank=True, null=True) #inclusive, water level in mm like wl_mm, null means unbounded
+    level_max = models.FloatField(blank=True, null=True) #exclusive
+    a = models.FloatField()
+    h0 = models.FloatField(default=0) #water level of zero discharge in mm
+    b = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        managed = False
-        db_table = 'station_metadata'
+        db_table = 'rating_curve'
+        indexes = [models.Index(fields=['station', 'valid_from'])]
 
+    @classmethod
+    def get_segments(cls, station): #later periods are applied last so they win where periods overlap
+        return list(cls.objects.filter(station=station).order_by(F('valid_from').asc(nulls_first=True), 'level_min')
+                    .values('valid_from', 'valid_to', 'level_min', 'level_max', 'a', 'h0', 'b'))
 
-class Tmavy(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    ec_lin_micros_cm = models.FloatField(db_column='EC_lin_microS/cm', blank=True, null=True)   
-    ec_nonlin_micros_cm = models.FloatField(db_column='EC_nonlin_microS/cm', blank=True, null=True)   
-    wt_ec_degc = models.FloatField(db_column='WT_EC_degC', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def get_updated_at(cls, station): #None when station has no curve
+        return cls.objects.filter(station=station).aggregate(updated_at=Max('updated_at'))['updated_at']
 
-    class Meta:
-        managed = False
-        db_table = 'tmavy'
 
-
-class ValuesMetadata(models.Model):
-    parameter = models.TextField(db_column='Parameter')  
-    parameter_abreviation_in_data_file = models.TextField(db_column='Parameter abreviation in data file')   
-    unit = models.TextField(db_column='Unit')  
-    django_field_name = models.TextField(primary_key=True)
+class DerivedSeries(models.Model): #derived parameter materialized in <station>_derived table, API exposes it only while it matches data version
+    station = models.TextField()
+    field = models.TextField()
+    version = models.BigIntegerField() #DataVersion of station the table matches
+    computed_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        managed = False
-        db_table = 'values_metadata'
-        unique_together = (('parameter', 'parameter_abreviation_in_data_file'),)
-
-
-class VolynkaMalenice(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+        db_table = 'derived_series'
+        unique_together = (('station', 'field'),)
 
-    class Meta:
-        managed = False
-        db_table = 'volynka_malenice'
+    @classmethod
+    def get(cls, station, field): #None when not materialized yet
+        return cls.objects.filter(station=station, field=field).first()
 
+    @classmethod
+    def get_fields(cls, station, version): #fields materialized from current data, reimport leaves older ones stale until compute_derived
+        return list(cls.objects.filter(station=station, version=version).values_list('field', flat=True))
 
-class VolynkaVimperk(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def is_available(cls, station, field, version):
+        return cls.objects.filter(station=station, field=field, version=version).exists()
 
-    class Meta:
-        managed = False
-        db_table = 'volynka_vimperk'
+    @classmethod
+    def store(cls, station, field, version):
+        cls.objects.update_or_create(station=station, field=field, defaults={'version': version})
 
 
-class ZhureckyPot(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+class PercentileSketch(models.Model): #mergeable quantile summary of one station field in one month of one year, see hydro.sketches
+    station = models.TextField()
+    field = models.TextField()
+    year = models.IntegerField()
+    month = models.IntegerField()
+    count = models.BigIntegerField() #non null hourly values summarized
+    minimum = models.FloatField(blank=True, null=True)
+    maximum = models.FloatField(blank=True, null=True)
+    means = models.BinaryField() #float64 centroid means sorted ascending
+    weights = models.BinaryField() #float64 number of values of each centroid
+    version = models.BigIntegerField() #DataVersion of station the sketch matches
+    computed_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        managed = False
-        db_table = 'zhurecky_pot'
-
+        db_table = 'percentile_sketch'
+        unique_together = (('station', 'field', 'year', 'month'),)
 
-class ZlatyHubertky(BaseStationModel):
-    swe_1_mm = models.FloatField(db_column='SWE_1_mm', blank=True, null=True)  
-    swe_mm = models.FloatField(db_column='SWE_mm', blank=True, null=True)  
-    hs_mm = models.FloatField(db_column='HS_mm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    hs_2_mm = models.FloatField(db_column='HS_2_mm', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def get_version(cls, station, field): #None when not computed yet or when months have different versions
+        versions = list(cls.objects.filter(station=station, field=field).values_list('version', flat=True).distinct()[:2])
+        return versions[0] if len(versions) == 1 else None
 
-    class Meta:
-        managed = False
-        db_table = 'zlaty_hubertky'
+    @classmethod
+    def get_rows(cls, station, field, version, start_year=None, end_year=None): #None when missing or stale, years follow HYDRO_YEAR_START_MONTH
+        if cls.get_version(station, field) != version:
+            return None
+        rows = cls.objects.filter(months_filter(start_year, end_year), station=station, field=field)
+        return list(rows.values('year', 'month', 'count', 'minimum', 'maximum', 'means', 'weights'))
 
+    @classmethod
+    def get_fields(cls, station, version): #fields whose sketches match version
+        return list(cls.objects.filter(station=station, version=version).values_list('field', flat=True).distinct())
 
-class ZlatyMeteoHlad(BaseStationModel):
-    wl_mm = models.FloatField(db_column='WL_mm', blank=True, null=True)  
-    p_mm = models.FloatField(db_column='P_mm', blank=True, null=True)  
-    hs_cm = models.FloatField(db_column='HS_cm', blank=True, null=True)  
-    at_degc = models.FloatField(db_column='AT_degC', blank=True, null=True)  
-    rh_pct = models.FloatField(db_column='RH_pct', blank=True, null=True)  
-    wt_degc = models.FloatField(db_column='WT_degC', blank=True, null=True)  
-    date_time = models.DateTimeField(primary_key=True)
+    @classmethod
+    def store(cls, station, field, version, rows, months=None): #replaces given (year, month) pairs or all months of station field
+        with transaction.atomic():
+            existing = cls.objects.filter(station=station, field=field)
+            if months is None:
+                existing.delete()
+            else:
+                for year, month in months:
+                    existing.filter(year=year, month=month).delete()
+            cls.objects.bulk_create([cls(station=station, field=field, version=version, **row) for row in rows])
 
-    class Meta:
-        managed = False
-        db_table = 'zlaty_meteo_hlad'
+    @classmethod
+    def set_version(cls, station, field, old_version, version): #months untouched by ingest stay valid for new version
+        cls.objects.filter(station=station, field=field, version=old_version).update(version=version)
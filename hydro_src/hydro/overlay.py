@@ -0,0 +1,38 @@
+from datetime import datetime
+from functools import reduce
+from operator import or_
+import numpy as np
+from django.db.models import Q
+from .series_cache import to_python
+from .years import get_start_month, year_bounds
+
+LEAP_YEAR = 2000 #columns follow leap year calendar so 1 March is the same column in every year
+MARCH_DAY = 59 #zero based day of year of 1 March in common year
+
+def years_filter(years): #consecutive years are merged into one date_time range so the scan stays on primary key index
+    ranges = []
+    for year in sorted(years):
+        if ranges and ranges[-1][1] == year - 1:
+            ranges[-1][1] = year
+        else:
+            ranges.append([year, year])
+    return reduce(or_, [Q(date_time__gte=year_bounds(first)[0], date_time__lte=year_bounds(last)[1]) for first, last in ranges])
+
+def overlay_matrix(dates, values, years, daily=False): #year x hour (or day) matrix, NaN where year has no value, 29 February stays empty in common years
+    dates = np.asarray(dates, dtype='datetime64[h]')
+    values = np.asarray(values, dtype=np.float64)
+    calendar_years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+    days = (dates.astype('datetime64[D]') - dates.astype('datetime64[Y]')).astype(np.int64)
+    leap = (calendar_years % 4 == 0) & ((calendar_years % 100 != 0) | (calendar_years % 400 == 0))
+    days += ~leap & (days >= MARCH_DAY)
+    start_day = (np.datetime64(datetime(LEAP_YEAR, get_start_month(), 1), 'D') - np.datetime64(f'{LEAP_YEAR}-01-01')).astype(np.int64)
+    rows = calendar_years + (days >= start_day) * (start_day > 0) #hydrological year is named by calendar year it ends in
+    days = (days - start_day) % 366 #first column is first day of year
+    columns = days if daily else days * 24 + (dates - dates.astype('datetime64[D]')).astype(np.int64)
+
+    years = np.asarray(years, dtype=np.int64)
+    index = np.searchsorted(years, rows)
+    selected = (index < len(years)) & (years[np.minimum(index, len(years) - 1)] == rows) if len(years) else np.zeros(len(rows), dtype=bool)
+    matrix = np.full((len(years), 366 if daily else 366 * 24), np.nan)
+    matrix[index[selected], columns[selected]] = values[selected]
+    return [to_python(row) for row in matrix]
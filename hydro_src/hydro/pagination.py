@@ -0,0 +1,74 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from .models import next_bucket_start
+
+class DateTimeKeysetPagination(BasePagination): #seek pagination on date_time, each page is an index range scan instead of OFFSET
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+
+    def is_requested(self, request): #pagination is opt-in so front end keeps getting whole series
+        return self.cursor_query_param in request.GET or self.limit_query_param in request.GET
+
+    def paginate_queryset(self, queryset, request, view=None, ordering='date_time', key='date', resample=None): #key is name of row date in results, resample of grouped rows
+        self.request = request
+        self.key = key
+        limit = self.get_limit(request)
+        after = self.decode_cursor(request)
+        if after is not None: #always sought on raw date_time, truncated bucket date is not covered by primary key index
+            if resample is None:
+                queryset = queryset.filter(date_time__gt=after)
+            else: #cursor is start of last bucket on page, next page starts with raw rows of following bucket
+                queryset = queryset.filter(date_time__gte=next_bucket_start(resample, after))
+        rows = list(queryset.order_by(ordering)[:limit + 1]) #one extra row tells if there is next page
+        self.has_next = len(rows) > limit
+        self.page = rows[:limit]
+        return self.page
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET.get(self.limit_query_param, api_settings.PAGE_SIZE))
+        except ValueError:
+            raise ValidationError('error: Invalid limit')
+        if limit < 1:
+            raise ValidationError('error: Invalid limit')
+        return min(limit, settings.API_MAX_PAGE_SIZE)
+
+    def decode_cursor(self, request):
+        cursor = request.GET.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            after = parse_datetime(urlsafe_b64decode(cursor.encode()).decode())
+        except (Base64Error, UnicodeDecodeError, ValueError):
+            after = None
+        if after is None:
+            raise ValidationError('error: Invalid cursor')
+        return after
+
+    def encode_cursor(self, value):
+        return urlsafe_b64encode(value.isoformat().encode()).decode()
+
+    def get_next_cursor(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1][self.key])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data, **meta): #same envelope for all paginated routes, meta are route specific keys like date range of dataseries
+        return Response({
+            **meta,
+            'next': self.get_next_link(),
+            'results': data
+        })
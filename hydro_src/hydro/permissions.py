@@ -0,0 +1,10 @@
+import hmac
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+class HasIngestToken(BasePermission): #loggers send Authorization: Token <token>, tokens are configured in INGEST_TOKENS
+    def has_permission(self, request, view):
+        scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+        if scheme != 'Token' or not token:
+            return False
+        return any(hmac.compare_digest(token, allowed) for allowed in settings.INGEST_TOKENS)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max, Min
+from hydro.models import QualityIssue, ValuesMetadata
+
+HOUR = timedelta(hours=1)
+
+class RunTracker: #collects consecutive hourly rows satisfying a condition into issues
+    def __init__(self, station, field, kind, min_hours):
+        self.station, self.field, self.kind, self.min_hours = station, field, kind, min_hours
+        self.start = self.end = self.value = None
+        self.issues = []
+
+    def extend(self, date_time, value=None):
+        if self.start is None:
+            self.start, self.value = date_time, value
+        self.end = date_time
+
+    def close(self):
+        if self.start is not None:
+            hours = int((self.end - self.start) / HOUR) + 1
+            if hours >= self.min_hours:
+                self.issues.append(QualityIssue(station=self.station, field=self.field, kind=self.kind, start=self.start, end=self.end, hours=hours))
+        self.start = self.end = self.value = None
+
+def find_issues(st_name, model, start=None, end=None): #single LEAD() window pass over the table or its range, runs are tracked while streaming the rows
+    connection = connections[router.db_for_read(model)]
+    fields = [f for f in model._meta.fields if f.name != 'date_time']
+    ranges = ValuesMetadata.get_valid_ranges([f.name for f in fields])
+    aggregations = ValuesMetadata.get_aggregations([f.name for f in fields])
+    columns = ''.join(f', {connection.ops.quote_name(f.column)}' for f in fields)
+    where, params = ('WHERE date_time BETWEEN %s AND %s', [start, end]) if start is not None else ('', [])
+    sql = f'SELECT date_time, LEAD(date_time) OVER (ORDER BY date_time){columns} FROM {connection.ops.quote_name(model._meta.db_table)} {where} ORDER BY date_time'
+
+    gaps = []
+    null_runs = [RunTracker(st_name, f.name, QualityIssue.NULL_RUN, settings.QC_MIN_NULL_HOURS) for f in fields]
+    flat_runs = [RunTracker(st_name, f.name, QualityIssue.FLAT, settings.QC_MIN_FLAT_HOURS) for f in fields]
+    range_runs = [RunTracker(st_name, f.name, QualityIssue.OUT_OF_RANGE, 1) for f in fields]
+    bounds = [ranges.get(f.name, (None, None)) for f in fields]
+    flat_checked = [aggregations.get(f.name) not in ('sum', 'last') for f in fields] #precipitation and snow legitimately stay at zero for days
+
+    with connection.chunked_cursor() as cursor: #server side cursor, table is not loaded into memory at once
+        cursor.execute(sql, params)
+        for date_time, next_date_time, *values in cursor:
+            if next_date_time is not None and next_date_time - date_time > HOUR:
+                hours = int((next_date_time - date_time) / HOUR) - 1
+                gaps.append(QualityIssue(station=st_name, kind=QualityIssue.GAP, start=date_time + HOUR, end=next_date_time - HOUR, hours=hours))
+
+            for value, null_run, flat_run, range_run, (low, high), check_flat in zip(values, null_runs, flat_runs, range_runs, bounds, flat_checked):
+                if value is None:
+                    null_run.extend(date_time)
+                    flat_run.close()
+                    range_run.close()
+                    continue
+                null_run.close()
+
+                if check_flat:
+                    if flat_run.start is not None and value != flat_run.value:
+                        flat_run.close()
+                    flat_run.extend(date_time, value)
+
+                if (low is not None and value < low) or (high is not None and value > high):
+                    range_run.extend(date_time)
+                else:
+                    range_run.close()
+
+            if next_date_time is not None and next_date_time - date_time > HOUR: #runs don't continue across missing rows
+                for run in (*null_runs, *flat_runs, *range_runs):
+                    run.close()
+
+    issues = gaps
+    for run in (*null_runs, *flat_runs, *range_runs):
+        run.close()
+        issues.extend(run.issues)
+    return issues
+
+def store_issues(st_name, issues): #replaces previous results of the station
+    with transaction.atomic():
+        QualityIssue.objects.filter(station=st_name).delete()
+        QualityIssue.objects.bulk_create(issues, batch_size=1000)
+
+def refresh_issues(st_name, model, start, end): #called inside ingest transaction, rescans ingested range widened so no run changed by it is cut
+    margin = HOUR * max(settings.QC_MIN_NULL_HOURS, settings.QC_MIN_FLAT_HOURS) #shorter runs next to range were not stored but can grow into issues
+    low, high = start - margin, end + margin
+    stored = QualityIssue.objects.filter(station=st_name, start__lte=high, end__gte=low).aggregate(start=Min('start'), end=Max('end'))
+    if stored['start'] is not None: #issues reaching into window are recomputed whole, one row outside of them ends the runs
+        low, high = min(low, stored['start'] - HOUR), max(high, stored['end'] + HOUR)
+    issues = [issue for issue in find_issues(st_name, model, low, high) if low < issue.start and issue.end < high] #runs touching window edge may be truncated
+    QualityIssue.objects.filter(station=st_name, start__gt=low, end__lt=high).delete()
+    QualityIssue.objects.bulk_create(issues, batch_size=1000)
+    return len(issues)
@@ -0,0 +1,19 @@
+from uuid import uuid4
+from rest_framework import renderers
+
+class RawJSON: #already serialized JSON value, e.g. rows of cached series that never exist as python dicts
+    def __init__(self, text):
+        self.text = text
+
+class JSONRenderer(renderers.JSONRenderer): #RawJSON at top level or as value of top level dict is copied into output as is
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, RawJSON):
+            return data.text.encode()
+        raw = {key: value.text for key, value in data.items() if isinstance(value, RawJSON)} if isinstance(data, dict) else {}
+        if not raw:
+            return super().render(data, accepted_media_type, renderer_context)
+        placeholders = {key: f'raw-{uuid4().hex}' for key in raw}
+        content = super().render({**data, **placeholders}, accepted_media_type, renderer_context)
+        for key, placeholder in placeholders.items():
+            content = content.replace(f'"{placeholder}"'.encode(), raw[key].encode())
+        return content
@@ -0,0 +1,47 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from django.db import connections, router, transaction
+from hydro.models import BaseStationModel
+
+_analytical = ContextVar('analytical', default=False)
+
+@contextmanager
+def analytical_queries(): #station data read inside this block goes to replica
+    token = _analytical.set(True)
+    try:
+        yield
+    finally:
+        _analytical.reset(token)
+
+def analytical(view): #decorator for views with long range or aggregating queries
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with analytical_queries():
+            return view(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def consistent_snapshot(model): #one repeatable read transaction on connection station data is read from, data version read inside describes exactly these rows
+    using = router.db_for_read(model)
+    outermost = not connections[using].in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost: #isolation can be set only before first query of transaction
+            with connections[using].cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+        yield using
+
+class AnalyticsRouter: #metadata and all writes stay on primary, only analytical reads of station tables use replica
+    def db_for_read(self, model, **hints):
+        if _analytical.get() and issubclass(model, BaseStationModel):
+            return 'replica'
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
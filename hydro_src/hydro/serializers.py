@@ -1,12 +1,6 @@
+from django.utils import timezone
 from rest_framework import serializers
 from hydro import models as hydro_models
-from rest_framework_gis.serializers import GeoFeatureModelSerializer
-
-class StationGeoSerializer(GeoFeatureModelSerializer):
-    class Meta:
-        model = hydro_models.StationMetadata
-        geo_field = 'geom'
-        fields = ['st_name', 'st_label', 'geom']
 
 class StationMetadataSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,3 +11,31 @@ class ValuesMetadataSerializer(serializers.ModelSerializer):
     class Meta:
         model = hydro_models.ValuesMetadata
         fields = ['django_field_name', 'parameter', 'unit']
+
+class QualityIssueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = hydro_models.QualityIssue
+        fields = ['field', 'kind', 'start', 'end', 'hours']
+
+class LocalDateTimeField(serializers.DateTimeField): #station tables store naive local time (TIME_ZONE), DRF would convert aware values to naive UTC
+    def enforce_timezone(self, value):
+        if timezone.is_aware(value):
+            return timezone.make_naive(value)
+        return value
+
+class IngestRecordSerializer(serializers.Serializer): #one hourly record pushed by logger, values are validated against station model fields
+    station = serializers.CharField()
+    date_time = LocalDateTimeField()
+    values = serializers.DictField(child=serializers.FloatField(allow_null=True), allow_empty=False)
+
+    def validate(self, data):
+        from hydro.stations.models import station_models #stations app is loaded after hydro
+        model = station_models.get(data['station'])
+        if model is None:
+            raise serializers.ValidationError({'station': 'Unknown station'})
+        unknown = [field for field in data['values'] if field == 'date_time' or not model.has_field(field)]
+        if unknown:
+            raise serializers.ValidationError({'values': 'Unknown parameters: {}'.format(', '.join(unknown))})
+        if data['date_time'].minute or data['date_time'].second or data['date_time'].microsecond:
+            raise serializers.ValidationError({'date_time': 'Timestamp has to be on the hour'})
+        return data
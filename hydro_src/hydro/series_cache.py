@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from django.conf import settings
+from django.db import models
+from .cache import local_lock
+from .columnar import get_mapped_columns, is_enabled as is_columnar_enabled, load_columns
+from .models import DataVersion
+from .renderers import RawJSON
+
+class Series: #one field of station as two contiguous arrays, hours since epoch sorted ascending and float64 values (exactly what SQL returns) with NaN for nulls
+    def __init__(self, hours, values, version=0, integer=False):
+        self.hours = hours
+        self.values = values
+        self.version = version
+        self.integer = integer #integer column is serialized as ints like in SQL path
+        self.loaded_at = time.monotonic()
+
+    @property
+    def nbytes(self):
+        return self.hours.nbytes + self.values.nbytes
+
+    @classmethod
+    def load(cls, model, field, version=0):
+        hours, columns = load_columns(model, [field])
+        return cls(hours, columns[field], version, is_integer(model, field))
+
+    def date_range(self): #same as BaseStationModel.get_date_range, first and last non null value
+        present = np.flatnonzero(~np.isnan(self.values))
+        if len(present) == 0:
+            return None, None
+        return to_datetime(self.hours[present[0]]), to_datetime(self.hours[present[-1]])
+
+    def slice(self, start_date, end_date): #rows with start <= date_time <= end found by binary search, serialized straight from arrays to same JSON as get_field_data
+        start = -(-epoch_seconds(start_date) // 3600) #first whole hour not before start
+        end = epoch_seconds(end_date) // 3600
+        lo = np.searchsorted(self.hours, start, side='left')
+        hi = np.searchsorted(self.hours, end, side='right')
+        dates = np.datetime_as_string(self.hours[lo:hi].astype('datetime64[h]'), unit='s').tolist()
+        values = to_python(self.values[lo:hi], self.integer)
+        return RawJSON('[' + ','.join([f'{{"date":"{date}","value":{"null" if value is None else repr(value)}}}' for date, value in zip(dates, values)]) + ']') #compact separators of JSONRenderer
+
+    def monthly_percentiles(self, quantiles): #same rows as BaseStationModel.calculate_percentiles, linear interpolation like percentile_cont
+        months = self.hours.astype('datetime64[h]').astype('datetime64[M]').astype(np.int64) % 12
+        rows = []
+        for month in np.unique(months):
+            values = self.values[months == month]
+            values = values[~np.isnan(values)]
+            results = np.quantile(values, quantiles) if len(values) else [np.nan] * len(quantiles)
+            row = {'string_date_without_year': f'{month + 1:02d}-01T00:00:00'}
+            row.update(zip([f'q{round(q * 100)}' for q in quantiles], to_python(np.asarray(results, dtype=np.float64))))
+            rows.append(row)
+        return rows
+
+class SeriesCache: #least recently used series are evicted when byte budget is exceeded
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, version=0):
+        with self.lock:
+            series = self.entries.get(key)
+            if series is None:
+                return None
+            if series.version != version or time.monotonic() - series.loaded_at > settings.SERIES_CACHE_TIMEOUT: #data was reloaded since
+                self.remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return series
+
+    def put(self, key, series):
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            if series.nbytes > settings.SERIES_CACHE_BYTES:
+                return
+            self.entries[key] = series
+            self.size += series.nbytes
+            while self.size > settings.SERIES_CACHE_BYTES:
+                self.remove(next(iter(self.entries)))
+
+    def remove(self, key):
+        self.size -= self.entries.pop(key).nbytes
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+series_cache = SeriesCache()
+
+def is_enabled():
+    return settings.SERIES_CACHE_BYTES > 0
+
+def get_series(model, field, version=None): #memory mapped export when it matches data version, then in-process cache, None when both are disabled
+    if not (is_columnar_enabled() or is_enabled()):
+        return None
+    if version is None:
+        version = DataVersion.get_version(model._meta.db_table)
+    mapped = get_mapped_columns(model, field, version)
+    if mapped is not None:
+        return Series(*mapped, version, is_integer(model, field))
+    if not is_enabled():
+        return None
+    key = (model._meta.db_table, field)
+    series = series_cache.get(key, version)
+    if series is None:
+        with local_lock(f'series:{key}'): #concurrent requests of one worker load series only once
+            series = series_cache.get(key, version)
+            if series is None:
+                series = Series.load(model, field, version)
+                series_cache.put(key, series)
+    return series
+
+def epoch_seconds(value): #date or naive datetime
+    return int(np.datetime64(value, 's').astype(np.int64))
+
+def to_datetime(hour):
+    return np.int64(hour).astype('datetime64[h]').item()
+
+def is_integer(model, field):
+    return isinstance(model._meta.get_field(field), models.IntegerField) #BigIntegerField and SmallIntegerField too
+
+def to_python(values, integer=False): #NaN back to null, float64 is serialized with the same repr as values read by SQL
+    return [None if value != value else int(value) if integer else value for value in values.tolist()]
@@ -0,0 +1,118 @@
+import numpy as np
+from django.conf import settings
+from hydro.stations.models import derived_models, station_models
+from .columnar import load_columns
+from .models import DataVersion, PercentileSketch
+from .routers import consistent_snapshot
+from .series_cache import get_series, to_python
+from .years import hydro_year
+
+class QuantileSketch: #t-digest like summary, centroids (mean, weight) sorted by mean, any quantile of merged months is read without raw values
+    def __init__(self, means, weights, minimum=None, maximum=None):
+        self.means = means
+        self.weights = weights
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def count(self):
+        return int(self.weights.sum())
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.sort(values[~np.isnan(values)].astype(np.float64))
+        if not len(values):
+            return cls(values, values)
+        return cls.compress(values, np.ones(len(values)), values[0], values[-1])
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(np.frombuffer(row['means'], dtype='<f8'), np.frombuffer(row['weights'], dtype='<f8'), row['minimum'], row['maximum'])
+
+    @classmethod
+    def merge(cls, sketches):
+        sketches = [sketch for sketch in sketches if len(sketch.means)]
+        if not sketches:
+            return cls(np.empty(0), np.empty(0))
+        means = np.concatenate([sketch.means for sketch in sketches])
+        weights = np.concatenate([sketch.weights for sketch in sketches])
+        order = np.argsort(means, kind='stable')
+        return cls.compress(means[order], weights[order], min(s.minimum for s in sketches), max(s.maximum for s in sketches))
+
+    @classmethod
+    def compress(cls, means, weights, minimum, maximum): #neighbours within one unit of k(q) = compression / 2pi * asin(2q - 1) are merged, so tails keep small centroids
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(settings.PERCENTILE_SKETCH_COMPRESSION / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        return cls(np.add.reduceat(means * weights, starts) / merged_weights, merged_weights, minimum, maximum)
+
+    def quantiles(self, quantiles): #linear interpolation between centroid centres, minimum and maximum anchor the tails
+        if not len(self.means):
+            return np.full(len(quantiles), np.nan)
+        positions = np.cumsum(self.weights) - self.weights / 2
+        total = self.weights.sum()
+        return np.interp(np.asarray(quantiles) * total, np.r_[0, positions, total], np.r_[self.minimum, self.means, self.maximum])
+
+    def to_row(self, year, month):
+        return {'year': year, 'month': month, 'count': self.count, 'minimum': self.minimum, 'maximum': self.maximum,
+                'means': self.means.astype('<f8').tobytes(), 'weights': self.weights.astype('<f8').tobytes()}
+
+def build_sketches(hours, values): #{(year, month): sketch} of sorted hourly series, months are contiguous runs
+    months = hours.astype('datetime64[h]').astype('datetime64[M]').astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]]) if len(months) else []
+    ends = np.r_[starts[1:], len(months)] if len(months) else []
+    sketches = {}
+    for start, end in zip(starts, ends):
+        month = int(months[start])
+        sketches[(1970 + month // 12, month % 12 + 1)] = QuantileSketch.from_values(values[start:end])
+    return sketches
+
+def get_field_model(station, field): #measured field or derived discharge
+    model = station_models[station]
+    return model if model.has_field(field) else derived_models[station]
+
+def compute_field(station, field): #all months of one field from a single scan, replaces stored sketches
+    model = get_field_model(station, field)
+    with consistent_snapshot(model) as using: #stored version describes exactly scanned rows
+        version = DataVersion.get_version(station, using)
+        hours, columns = load_columns(model, [field])
+    rows = [sketch.to_row(*key) for key, sketch in build_sketches(hours, columns[field]).items()]
+    PercentileSketch.store(station, field, version, rows)
+    return len(rows)
+
+def update_sketches(station, fields, start, end, version): #called inside ingest transaction after version bump, only months touched by ingest are rebuilt
+    first, last = np.datetime64(start, 'M'), np.datetime64(end, 'M')
+    for field in PercentileSketch.get_fields(station, version - 1): #sketches which were current before ingest
+        if field in fields:
+            hours, columns = load_columns(get_field_model(station, field), [field], first.astype('datetime64[h]').item(), ((last + 1).astype('datetime64[h]') - 1).item())
+            sketches = build_sketches(hours, columns[field])
+            months = [(1970 + month // 12, month % 12 + 1) for month in np.arange(first, last + 1).astype(np.int64).tolist()]
+            PercentileSketch.store(station, field, version, [sketch.to_row(*key) for key, sketch in sketches.items()], months)
+        PercentileSketch.set_version(station, field, version - 1, version)
+
+def monthly_percentiles(station, field, model, version, quantiles, start_year=None, end_year=None): #same rows as calculate_percentiles for any quantiles and years
+    rows = PercentileSketch.get_rows(station, field, version, start_year, end_year)
+    if rows is not None:
+        sketches = {(row['year'], row['month']): QuantileSketch.from_row(row) for row in rows}
+    else: #not computed yet or stale, built from one pass over raw values
+        series = get_series(model, field, version)
+        if series is not None:
+            hours, values = series.hours, series.values
+        else:
+            hours, columns = load_columns(model, [field])
+            values = columns[field]
+        sketches = {key: sketch for key, sketch in build_sketches(hours, values).items()
+                    if (start_year is None or hydro_year(*key) >= start_year) and (end_year is None or hydro_year(*key) <= end_year)}
+
+    results = []
+    for month in sorted({month for _, month in sketches}):
+        merged = QuantileSketch.merge(sketch for (_, m), sketch in sketches.items() if m == month)
+        row = {'string_date_without_year': f'{month:02d}-01T00:00:00'}
+        row.update(zip([quantile_key(q) for q in quantiles], to_python(merged.quantiles(quantiles))))
+        results.append(row)
+    return results
+
+def quantile_key(quantile): #0.1 -> q10, 0.025 -> q2.5
+    return 'q' + format(quantile * 100, 'g')
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.core import checks
+
+
+class StationsConfig(AppConfig): #station data models generated from station_schema.json, app has no migrations on purpose
+    name = 'hydro.stations'
+    label = 'stations'
+
+    def ready(self):
+        from .schema import check_schema_file
+        checks.register(check_schema_file)
@@ -0,0 +1,14 @@
+from hydro.models import RatingCurve
+from .schema import create_station_model, load_schema
+
+station_models = {} #db_table -> model, registry used by views
+derived_models = {} #db_table -> model of <db_table>_derived, stations measuring water level but not discharge
+
+for table, fields in load_schema().items():
+    model = create_station_model(table, fields)
+    globals()[model.__name__] = model
+    station_models[table] = model
+    if RatingCurve.LEVEL_FIELD in fields and RatingCurve.DISCHARGE_FIELD not in fields:
+        derived = create_station_model(f'{table}_derived', {RatingCurve.DISCHARGE_FIELD: {'column': RatingCurve.DISCHARGE_FIELD, 'type': 'double precision'}})
+        globals()[derived.__name__] = derived
+        derived_models[table] = derived
@@ -0,0 +1,76 @@
+import json
+import logging
+import os
+from django.conf import settings
+from django.core.checks import Error
+from django.db import connection
+from django.contrib.gis.db import models
+from hydro.models import BaseStationModel
+
+logger = logging.getLogger(__name__)
+
+FIELD_TYPES = { #information_schema data_type -> field class, pandas writes float columns as double precision and int ones as bigint
+    'double precision': models.FloatField,
+    'real': models.FloatField,
+    'numeric': models.FloatField, #schema file keeps no precision, values were read as float before too
+    'integer': models.IntegerField,
+    'bigint': models.BigIntegerField,
+    'smallint': models.SmallIntegerField,
+}
+
+def field_name_from_column(column): #same conversion as create_django_metadata_col_name in databaze_skripty/database_insert.py
+    return column.replace('[', '').replace(']', '').replace('%', 'pct').replace(' ', '_').replace('(', '').replace(')', '').replace('/', '_').replace('-', '').rstrip('_').lower()
+
+def model_name_from_table(table):
+    return ''.join(part.capitalize() for part in table.split('_'))
+
+def introspect_schema(): #single pass over information_schema for all tables listed in station_metadata
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.table_name, c.column_name, c.data_type
+            FROM information_schema.columns c
+            JOIN station_metadata s ON s.st_name = c.table_name
+            WHERE c.table_schema = current_schema()
+              AND c.column_name <> 'date_time'
+              AND c.data_type IN %s
+            ORDER BY c.table_name, c.ordinal_position
+        """, [tuple(FIELD_TYPES)])
+        rows = cursor.fetchall()
+
+    schema = {}
+    for table, column, data_type in rows:
+        fields = schema.setdefault(table, {})
+        name = field_name_from_column(column)
+        if name in fields: #two columns differing only in stripped characters
+            name = f'{name}_{len(fields)}'
+        fields[name] = {'column': column, 'type': data_type}
+    return schema
+
+def write_schema(schema):
+    with open(settings.STATION_SCHEMA_FILE, 'w') as f:
+        json.dump(schema, f, indent=4)
+        f.write('\n')
+
+def load_schema(): #cached file keeps startup free of introspection queries
+    try:
+        with open(settings.STATION_SCHEMA_FILE) as f:
+            return json.load(f)
+    except FileNotFoundError: #reported by check_schema_file, refresh_station_schema itself has to start without station models
+        logger.error('Station schema file %s is missing, run manage.py refresh_station_schema', settings.STATION_SCHEMA_FILE)
+        return {}
+
+def check_schema_file(app_configs, **kwargs):
+    if os.path.exists(settings.STATION_SCHEMA_FILE):
+        return []
+    return [Error(
+        f'Station schema file {settings.STATION_SCHEMA_FILE} is missing, no station models are registered.',
+        hint='Run manage.py refresh_station_schema against the station database.',
+        id='stations.E001',
+    )]
+
+def create_station_model(table, fields):
+    attrs = {name: FIELD_TYPES[field['type']](db_column=field['column'], blank=True, null=True) for name, field in fields.items()}
+    attrs['date_time'] = models.DateTimeField(primary_key=True)
+    attrs['__module__'] = 'hydro.stations.models'
+    attrs['Meta'] = type('Meta', (), {'managed': False, 'db_table': table})
+    return type(model_name_from_table(table), (BaseStationModel,), attrs)
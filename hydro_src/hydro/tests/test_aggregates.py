@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from unittest import mock
+from django.contrib.gis.db import models
+from django.test import SimpleTestCase
+from hydro.aggregates import Last, VectorMean, get_aggregate
+from hydro.models import BaseStationModel
+
+class TestStation(BaseStationModel): #never queried, only compiled
+    date_time = models.DateTimeField(primary_key=True)
+    wl_mm = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        app_label = 'hydro'
+        managed = False
+        db_table = 'test_station'
+
+def resampled_sql(aggregation):
+    with mock.patch('hydro.models.ValuesMetadata.get_aggregation', return_value=aggregation):
+        return str(TestStation.get_field_data('wl_mm', datetime(2020, 1, 1), datetime(2020, 12, 31), '1M').query)
+
+class GetAggregateTests(SimpleTestCase):
+    def test_policy_selects_aggregate(self):
+        self.assertIsInstance(get_aggregate('sum', 'p_mm'), models.Sum)
+        self.assertIsInstance(get_aggregate('last', 'hs_cm'), Last)
+        self.assertIsInstance(get_aggregate('vector_mean', 'wd_deg'), VectorMean)
+
+    def test_unknown_or_missing_policy_is_mean(self):
+        self.assertIsInstance(get_aggregate(None, 'wl_mm'), models.Avg)
+        self.assertIsInstance(get_aggregate('median', 'wl_mm'), models.Avg)
+
+class ResampledFieldDataTests(SimpleTestCase):
+    def test_rows_are_grouped_by_truncated_date(self):
+        sql = resampled_sql('mean')
+        self.assertIn('GROUP BY', sql)
+        self.assertIn('AVG("test_station"."wl_mm")', sql)
+
+    def test_last_takes_latest_non_null_value(self):
+        sql = resampled_sql('last')
+        self.assertIn('(array_agg("test_station"."wl_mm" ORDER BY "test_station"."date_time" DESC) FILTER (WHERE "test_station"."wl_mm" IS NOT NULL))[1]', sql)
+
+    def test_vector_mean_averages_unit_vectors(self):
+        sql = resampled_sql('vector_mean')
+        self.assertIn('atan2(-avg(sin(radians("test_station"."wl_mm"))), -avg(cos(radians("test_station"."wl_mm"))))', sql)
+
+class RollingFieldDataTests(SimpleTestCase): #window aggregates over (t - window, t]
+    @mock.patch('hydro.models.connections')
+    def test_window_frame_and_warm_up_range(self, connections):
+        connection = connections.__getitem__.return_value
+        connection.ops.quote_name = lambda name: f'"{name}"'
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(datetime(2020, 1, 2), 3.0)]
+        rows = TestStation.get_rolling_field_data('wl_mm', datetime(2020, 1, 2), datetime(2020, 1, 3), timedelta(days=1), 'sum')
+        sql, params = cursor.execute.call_args[0]
+        self.assertIn('sum("wl_mm") OVER (ORDER BY date_time RANGE BETWEEN %s PRECEDING AND CURRENT ROW)', sql)
+        self.assertEqual(params, [timedelta(days=1) - timedelta(microseconds=1), datetime(2020, 1, 2), timedelta(days=1), datetime(2020, 1, 3), datetime(2020, 1, 2)])
+        self.assertEqual(rows, [{'date': datetime(2020, 1, 2), 'value': 3.0}])
@@ -0,0 +1,79 @@
+import time
+from unittest import mock
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from hydro.api_access import API_TOKEN_COOKIE, ApiLockdownMiddleware, ApiSessionMiddleware, set_token
+
+def token(issued=None):
+    response = HttpResponse()
+    with mock.patch('hydro.api_access.time.time', return_value=issued or time.time()):
+        set_token(response)
+    return response.cookies[API_TOKEN_COOKIE].value
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies', SESSION_SAVE_EVERY_REQUEST=True)
+class ApiSessionTests(SimpleTestCase):
+    def view(self, request):
+        request.session['seen'] = True
+        return HttpResponse('data')
+
+    def call(self, path):
+        return ApiSessionMiddleware(self.view)(RequestFactory().get(path))
+
+    def test_api_request_does_not_save_session(self):
+        self.assertNotIn('sessionid', self.call('/api/stations/').cookies)
+
+    def test_page_request_saves_session(self):
+        self.assertIn('sessionid', self.call('/').cookies)
+
+@override_settings(LOCKDOWN_ENABLED=True, LOCKDOWN_PASSWORDS=('secret',), SESSION_COOKIE_AGE=3600)
+class ApiTokenTests(SimpleTestCase):
+    def setUp(self):
+        self.get_response = mock.Mock(side_effect=lambda request: HttpResponse('data'))
+        self.middleware = ApiLockdownMiddleware(self.get_response)
+
+    def request(self, cookie):
+        request = RequestFactory().get('/api/stations/') #no session attribute, reading it would fail
+        request.COOKIES[API_TOKEN_COOKIE] = cookie
+        return request
+
+    def test_token_passes_without_session(self):
+        response = self.middleware(self.request(token()))
+        self.assertEqual(response.content, b'data')
+        self.assertNotIn(API_TOKEN_COOKIE, response.cookies)
+
+    def test_old_token_is_renewed(self): #sliding expiry like SESSION_SAVE_EVERY_REQUEST had
+        response = self.middleware(self.request(token(time.time() - 2000)))
+        self.assertIn(API_TOKEN_COOKIE, response.cookies)
+
+    def test_expired_or_forged_token_falls_back_to_session(self):
+        for cookie in (token(time.time() - 4000), token() + 'x'):
+            request = self.request(cookie)
+            request.session = {}
+            self.middleware(request)
+        self.get_response.assert_not_called()
+
+    def test_unlocked_page_issues_token(self):
+        request = RequestFactory().get('/')
+        request.session = {self.middleware.session_key: 'secret'}
+        with mock.patch.object(ApiLockdownMiddleware, 'is_unlocked', return_value=True), mock.patch('lockdown.middleware.LockdownMiddleware.__call__', return_value=HttpResponse('page')):
+            self.assertIn(API_TOKEN_COOKIE, self.middleware(request).cookies)
+
+@override_settings(LOCKDOWN_ENABLED=True, LOCKDOWN_PASSWORDS=('secret',), LOCKDOWN_URL_EXCEPTIONS=(r'^/api/ingest/',))
+class ApiOnlyLockdownTests(SimpleTestCase): #requests of API only profile have no session
+    def setUp(self):
+        self.get_response = mock.Mock(return_value=HttpResponse('data'))
+        self.middleware = ApiLockdownMiddleware(self.get_response)
+        self.factory = RequestFactory()
+
+    def test_request_without_token_is_locked(self):
+        response = self.middleware(self.factory.get('/api/stations/'))
+        self.get_response.assert_not_called()
+        self.assertIn(b'form', response.content)
+
+    def test_request_with_token_passes(self):
+        request = self.factory.get('/api/stations/')
+        request.COOKIES[API_TOKEN_COOKIE] = token()
+        self.assertEqual(self.middleware(request).content, b'data')
+
+    def test_url_exception_passes_without_token(self):
+        self.assertEqual(self.middleware(self.factory.post('/api/ingest/')).content, b'data')
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from unittest import mock
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from hydro.cache import get_cache_key, get_path_version, local_lock, shared_lock, single_flight
+from hydro.throttling import HeavyRouteThrottle
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class CacheKeyTests(SimpleTestCase):
+    @mock.patch('hydro.models.DataVersion.get_version', return_value=3)
+    def test_station_route_uses_station_version(self, get_version):
+        self.assertEqual(get_path_version('/api/stations/tmavy/wl_mm/dataseries/'), 3)
+        get_version.assert_called_once_with('tmavy')
+
+    @mock.patch('hydro.models.DataVersion.get_total_version', side_effect=[10, 11])
+    def test_cross_station_route_changes_with_any_station(self, get_total_version):
+        path = '/api/values/wl_mm/dataseries/'
+        before = get_cache_key(path, version=get_path_version(path))
+        after = get_cache_key(path, version=get_path_version(path))
+        self.assertNotEqual(before, after)
+
+    @mock.patch('hydro.models.DataVersion.get_total_version', return_value=5)
+    def test_station_list_is_versioned(self, get_total_version):
+        self.assertEqual(get_path_version('/api/stations/'), 't5')
+        self.assertEqual(get_path_version('/api/stations/geo/'), 't5')
+
+@override_settings(CACHES=LOCMEM)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cacheable_result_is_computed_under_lock(self):
+        with mock.patch('hydro.cache.local_lock', wraps=local_lock) as locked:
+            self.assertEqual(single_flight('api:key', lambda: {'etag': '"a"'}), {'etag': '"a"'})
+        locked.assert_called_once_with('api:key')
+
+    def test_uncacheable_key_is_not_serialized(self): #no-store or error response, identical requests run in parallel
+        single_flight('api:key', lambda: None)
+        with mock.patch('hydro.cache.local_lock') as locked:
+            self.assertIsNone(single_flight('api:key', lambda: None))
+        locked.assert_not_called()
+
+    def test_waiting_request_stops_polling_after_uncacheable_result(self):
+        cache.add('lock:api:key', 1) #leader of other worker
+        def leader_finished(seconds):
+            cache.set('uncacheable:api:key', 1)
+        with mock.patch('hydro.cache.time.sleep', side_effect=leader_finished):
+            self.assertEqual(single_flight('api:key', lambda: 'computed'), 'computed')
+
+@override_settings(CACHES=LOCMEM, API_THROTTLE_RATES={'heavy': (1.0, 2)})
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def allow(self):
+        return HeavyRouteThrottle().allow_request(RequestFactory().get('/api/stations/tmavy/wl_mm/dataseries/'), SimpleNamespace())
+
+    @mock.patch('hydro.throttling.time.time', return_value=1000.0)
+    def test_burst_then_throttled(self, time):
+        self.assertEqual([self.allow() for _ in range(3)], [True, True, False])
+
+    def test_bucket_update_holds_shared_lock(self): #get and set of parallel workers do not interleave
+        with mock.patch('hydro.throttling.shared_lock', wraps=shared_lock) as locked:
+            self.allow()
+        locked.assert_called_once()
+        self.assertIsNone(cache.get(f'lock:{locked.call_args[0][0]}')) #released
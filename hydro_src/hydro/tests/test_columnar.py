@@ -0,0 +1,56 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from hydro import columnar
+from hydro.columnar import export_station, get_mapped_columns, read_manifest
+
+HOURS = np.arange(3, dtype=np.int64) + np.datetime64('2020-01-01T00', 'h').astype(np.int64)
+MODEL = SimpleNamespace(_meta=SimpleNamespace(db_table='tmavy', fields=[SimpleNamespace(name=name) for name in ('date_time', 'wl_mm', 'p_mm')]))
+
+def load_columns(model, fields, *args):
+    return HOURS, {field: np.array([1.0, np.nan, float(index)]) for index, field in enumerate(fields)}
+
+@contextmanager
+def snapshot(model): #repeatable read transaction is postgres only
+    yield 'replica'
+
+@mock.patch('hydro.columnar.load_columns', load_columns)
+@mock.patch('hydro.columnar.consistent_snapshot', snapshot)
+class ExportTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(COLUMNAR_CACHE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        columnar._mapped.clear()
+
+    def export(self, version):
+        with mock.patch('hydro.models.DataVersion.get_version', return_value=version) as get_version:
+            manifest = export_station('tmavy', MODEL)
+        get_version.assert_called_once_with('tmavy', 'replica') #version is read in the same snapshot as exported rows
+        return manifest
+
+    def test_export_is_mapped_at_its_version(self):
+        manifest = self.export(3)
+        self.assertEqual((manifest['version'], manifest['fields'], manifest['rows']), (3, ['wl_mm', 'p_mm'], 3))
+        hours, values = get_mapped_columns(MODEL, 'p_mm', 3)
+        np.testing.assert_array_equal(hours, HOURS)
+        np.testing.assert_array_equal(values, [1.0, np.nan, 1.0])
+        self.assertIsInstance(values, np.memmap) #shared page cache instead of per worker copy
+
+    def test_other_version_or_field_is_not_served(self): #ingest bumped version after export, database is used
+        self.export(3)
+        self.assertIsNone(get_mapped_columns(MODEL, 'wl_mm', 4))
+        self.assertIsNone(get_mapped_columns(MODEL, 'at_degc', 3))
+
+    def test_new_export_replaces_old_version(self):
+        self.export(3)
+        self.export(4)
+        self.assertEqual(read_manifest('tmavy')['version'], 4)
+        self.assertEqual(sorted(os.listdir(columnar.station_dir('tmavy'))), ['4', 'manifest.json'])
+        self.assertIsNotNone(get_mapped_columns(MODEL, 'wl_mm', 4))
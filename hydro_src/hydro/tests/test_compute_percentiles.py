@@ -0,0 +1,58 @@
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
+from hydro.management.commands import compute_percentiles
+from hydro.management.commands.compute_percentiles import Command
+from hydro.models import MonthlyPercentile
+
+MODEL = SimpleNamespace(_meta=SimpleNamespace(fields=[SimpleNamespace(name=name) for name in ('date_time', 'wl_mm', 'p_mm')]))
+
+def get_model_from_table(table):
+    if table != 'tmavy':
+        raise ValueError(table)
+    return MODEL
+
+@mock.patch('hydro.models.DerivedSeries.get_fields', return_value=['q_m3s'])
+@mock.patch('hydro.views.StationMetadataViewSet.get_model_from_table', side_effect=get_model_from_table)
+@mock.patch('hydro.models.DataVersion.get_version', return_value=7)
+@mock.patch('hydro.models.ValuesMetadata.objects')
+class ComputePercentilesTests(SimpleTestCase):
+    def setUp(self):
+        self.command = Command(stdout=StringIO(), stderr=StringIO())
+
+    def stored_versions(self, objects, versions):
+        objects.filter.return_value.values_list.return_value = ['wl_mm', 'p_mm'] #parameters of station table
+        return mock.patch('hydro.models.MonthlyPercentile.get_version', side_effect=lambda station, field: versions[field])
+
+    def test_only_stale_fields_are_computed(self, objects, get_version, get_model, get_fields):
+        with self.stored_versions(objects, {'wl_mm': 7, 'p_mm': 6, 'q_m3s': 6}):
+            self.assertEqual(self.command.get_tasks(['tmavy', 'no_table'], False), ([('tmavy', 'p_mm'), ('tmavy', 'q_m3s')], 1)) #derived discharge has percentiles too
+            self.assertEqual(self.command.get_tasks(['tmavy'], True), ([('tmavy', 'wl_mm'), ('tmavy', 'p_mm'), ('tmavy', 'q_m3s')], 0))
+        self.assertIn('no_table: no data table', self.command.stderr.getvalue())
+
+    @mock.patch('hydro.models.MonthlyPercentile.store')
+    def test_results_are_stored_with_version_read_by_worker(self, store, objects, get_version, get_model, get_fields):
+        get_fields.return_value = []
+        def compute(st_name, field):
+            if field == 'p_mm':
+                raise ValueError('broken')
+            return st_name, field, 7, [{'string_date_without_year': '01-01T00:00:00'}], 0.1
+        with self.stored_versions(objects, {'wl_mm': None, 'p_mm': None}), mock.patch.object(compute_percentiles, 'compute', compute), \
+                mock.patch('hydro.management.commands.compute_percentiles.connections'):
+            self.command.handle(stations=['tmavy'], workers=2, pool='thread', force=False)
+        store.assert_called_once_with('tmavy', 'wl_mm', 7, [{'string_date_without_year': '01-01T00:00:00'}])
+        self.assertIn('Failed: tmavy.p_mm', self.command.stderr.getvalue()) #one broken parameter does not stop the others
+
+class MonthlyPercentileTests(SimpleTestCase):
+    @mock.patch('hydro.models.MonthlyPercentile.objects')
+    def test_stored_rows_have_format_of_calculate_percentiles(self, objects):
+        objects.filter.return_value.order_by.return_value.values.return_value = [{'month': 3, **{q: 1.0 for q in MonthlyPercentile.QUANTILES}}]
+        rows = MonthlyPercentile.get_percentiles('tmavy', 'wl_mm', 7)
+        objects.filter.assert_called_once_with(station='tmavy', field='wl_mm', version=7) #stale rows are not served
+        self.assertEqual(rows, [{'string_date_without_year': '03-01T00:00:00', **{q: 1.0 for q in MonthlyPercentile.QUANTILES}}])
+
+    @mock.patch('hydro.models.MonthlyPercentile.objects')
+    def test_missing_rows(self, objects):
+        objects.filter.return_value.order_by.return_value.values.return_value = []
+        self.assertIsNone(MonthlyPercentile.get_percentiles('tmavy', 'wl_mm', 7))
@@ -0,0 +1,44 @@
+from unittest import mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from hydro.middleware import ApiCacheMiddleware
+from hydro.views import versioned
+
+@mock.patch('hydro.models.DataVersion.get_version', return_value=7)
+class DataVersionCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.get_response = mock.Mock(side_effect=lambda request: versioned(HttpResponse(b'[1, 2]', content_type='application/json'), 7))
+        self.middleware = ApiCacheMiddleware(self.get_response)
+
+    def test_cached_payload_keeps_version_and_etag(self, get_version):
+        first = self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/'))
+        second = self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/'))
+        self.get_response.assert_called_once()
+        self.assertEqual(second['X-Data-Version'], '7')
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_returns_not_modified(self, get_version):
+        etag = self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/'))['ETag']
+        response = self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Data-Version'], '7')
+
+    def test_changed_etag_returns_payload(self, get_version):
+        self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/'))
+        response = self.middleware(RequestFactory().get('/api/stations/st/field/2020/yearly-data/', HTTP_IF_NONE_MATCH='"stale"'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'[1, 2]')
+
+    def test_no_store_response_is_not_cached(self, get_version): #version endpoint has to reach database every time
+        def view(request):
+            response = HttpResponse(b'{"version": 7}', content_type='application/json')
+            response['Cache-Control'] = 'no-store'
+            return response
+        middleware = ApiCacheMiddleware(mock.Mock(side_effect=view))
+        for _ in range(2):
+            response = middleware(RequestFactory().get('/api/stations/st/version/'))
+        self.assertEqual(middleware.get_response.call_count, 2)
+        self.assertEqual(response['Cache-Control'], 'no-store')
@@ -0,0 +1,67 @@
+from datetime import datetime
+from unittest import mock
+import numpy as np
+from django.test import SimpleTestCase
+from hydro.derived import apply_rating_curve, derive_discharge, refresh_ingested
+from hydro.views import StationMetadataViewSet
+
+def segment(a, h0, b, valid_from=None, valid_to=None, level_min=None, level_max=None):
+    return {'a': a, 'h0': h0, 'b': b, 'valid_from': valid_from, 'valid_to': valid_to, 'level_min': level_min, 'level_max': level_max}
+
+def hours(*dates):
+    return np.array(dates, dtype='datetime64[h]').astype(np.int64)
+
+class ApplyRatingCurveTests(SimpleTestCase):
+    def test_level_ranges_select_segment(self):
+        segments = [segment(1.0, 100, 1, level_max=500), segment(2.0, 0, 1, level_min=500)]
+        discharge = apply_rating_curve(hours('2020-01-01T00', '2020-01-01T01'), np.array([300.0, 600.0]), segments)
+        np.testing.assert_allclose(discharge, [200.0, 1200.0])
+
+    def test_later_period_wins_and_periods_end(self):
+        segments = [segment(1.0, 0, 1), segment(3.0, 0, 1, valid_from=datetime(2020, 1, 1, 1), valid_to=datetime(2020, 1, 1, 2))]
+        discharge = apply_rating_curve(hours('2020-01-01T00', '2020-01-01T01', '2020-01-01T02'), np.array([10.0, 10.0, 10.0]), segments)
+        np.testing.assert_allclose(discharge, [10.0, 30.0, 10.0])
+
+    def test_missing_level_and_level_below_h0_are_nan(self):
+        discharge = apply_rating_curve(hours('2020-01-01T00', '2020-01-01T01'), np.array([np.nan, 50.0]), [segment(1.0, 100, 1.5)])
+        self.assertTrue(np.isnan(discharge).all())
+
+    def test_power_is_computed_in_double_precision(self):
+        level = 1234.567
+        discharge = apply_rating_curve(hours('2020-01-01T00'), np.array([level]), [segment(0.0123, 17.5, 1.87)])
+        self.assertEqual(discharge[0], 0.0123 * (level - 17.5) ** 1.87)
+
+class DeriveDischargeTests(SimpleTestCase):
+    @mock.patch('hydro.derived.store_column')
+    @mock.patch('hydro.derived.ensure_table')
+    @mock.patch('hydro.models.RatingCurve.get_segments', return_value=[segment(1.0, 0, 1)])
+    @mock.patch('hydro.derived.derived_models', {'tmavy': None})
+    @mock.patch('hydro.derived.station_models', {'tmavy': None})
+    def test_level_is_loaded_in_double_precision(self, get_segments, ensure_table, store_column):
+        with mock.patch('hydro.derived.load_columns', return_value=(hours('2020-01-01T00'), {'wl_mm': np.array([1234.567])})) as load_columns:
+            derive_discharge('tmavy')
+        self.assertIs(load_columns.call_args[0][4], np.float64)
+        self.assertEqual(store_column.call_args[0][3][0], 1234.567)
+
+class StaleDerivedSeriesTests(SimpleTestCase):
+    station = mock.Mock(**{'has_field.return_value': False})
+    derived = mock.Mock(**{'has_field.return_value': True})
+
+    @mock.patch('hydro.models.DataVersion.get_version', return_value=7)
+    def test_derived_table_is_used_only_at_current_version(self, get_version):
+        with mock.patch('hydro.views.station_models', {'tmavy': self.station}), mock.patch('hydro.views.derived_models', {'tmavy': self.derived}), \
+                mock.patch('hydro.models.DerivedSeries.is_available', side_effect=lambda station, field, version: version == 6) as is_available:
+            self.assertIs(StationMetadataViewSet.get_field_model('tmavy', 'q_m3_s'), self.station) #stored at 6, reimport bumped to 7
+        is_available.assert_called_once_with('tmavy', 'q_m3_s', 7)
+
+    @mock.patch('hydro.derived.derive_discharge')
+    @mock.patch('hydro.models.DerivedSeries.store')
+    @mock.patch('hydro.derived.is_derived', return_value=True)
+    def test_ingest_keeps_only_current_series_in_step(self, is_derived, store, derive_discharge):
+        with mock.patch('hydro.models.DerivedSeries.is_available', return_value=False) as is_available:
+            self.assertEqual(refresh_ingested('tmavy', None, None, {'wl_mm'}, 8), set())
+        is_available.assert_called_once_with('tmavy', 'q_m3_s', 7) #version before ingest bump
+        store.assert_not_called()
+        with mock.patch('hydro.models.DerivedSeries.is_available', return_value=True):
+            self.assertEqual(refresh_ingested('tmavy', None, None, {'wl_mm'}, 8), {'q_m3_s'})
+        store.assert_called_once_with('tmavy', 'q_m3_s', 8)
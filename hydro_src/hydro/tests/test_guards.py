@@ -0,0 +1,106 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from unittest import mock
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+from hydro.guards import QueryTooExpensive, TooManyRows, check_cost, check_range, choose_resample, explain, statement_timeout
+
+class ChooseResampleTests(SimpleTestCase):
+    def test_finest_resample_within_budget(self):
+        self.assertIsNone(choose_resample(datetime(2020, 1, 1), datetime(2020, 1, 31), 2000)) #744 hours
+        self.assertEqual(choose_resample(datetime(2020, 1, 1), datetime(2020, 12, 31), 2000), '1D')
+        self.assertEqual(choose_resample(date(1990, 1, 1), date(2020, 1, 1), 2000), '1W')
+        self.assertEqual(choose_resample(date(1990, 1, 1), date(2020, 1, 1), 100), '1Y')
+
+    def test_coarsest_resample_when_nothing_fits(self):
+        self.assertEqual(choose_resample(date(1900, 1, 1), date(2020, 1, 1), 10), '1Y')
+
+@override_settings(API_LIMITS={'dataseries': {'max_rows': 1000, 'max_range_days': 400}})
+class CheckRangeTests(SimpleTestCase):
+    def test_range_within_limits_returns_estimate(self):
+        self.assertEqual(check_range('dataseries', datetime(2020, 1, 1), datetime(2020, 1, 2)), 25)
+        self.assertEqual(check_range('other', date(1990, 1, 1), date(2020, 1, 1)), 262969)
+
+    def test_too_many_rows_suggests_resample(self):
+        with self.assertRaises(TooManyRows) as raised:
+            check_range('dataseries', date(2020, 1, 1), date(2020, 3, 1))
+        self.assertEqual(raised.exception.detail['suggested_resample'], '1D')
+        self.assertEqual(raised.exception.status_code, 413)
+
+    def test_resample_reduces_rows(self):
+        self.assertLess(check_range('dataseries', date(2020, 1, 1), date(2020, 3, 1), '1D'), 1000)
+
+    def test_long_range_is_too_expensive(self):
+        with self.assertRaises(QueryTooExpensive) as raised:
+            check_range('dataseries', date(2000, 1, 1), date(2020, 1, 1), '1Y')
+        self.assertEqual(raised.exception.status_code, 422)
+
+@contextmanager
+def snapshot(model):
+    yield 'replica'
+
+class PostgresError(Exception):
+    pgcode = '57014'
+
+def canceled_query(): #psycopg2 error is cause of django OperationalError
+    error = OperationalError()
+    error.__cause__ = PostgresError()
+    return error
+
+@override_settings(API_LIMITS={'dataseries': {'statement_timeout': 500}})
+@mock.patch('hydro.guards.consistent_snapshot', snapshot)
+@mock.patch('hydro.guards.connections')
+class StatementTimeoutTests(SimpleTestCase):
+    def test_timeout_is_set_inside_snapshot(self, connections):
+        with statement_timeout('dataseries', None) as using:
+            self.assertEqual(using, 'replica')
+        connections.__getitem__.assert_called_once_with('replica')
+        cursor = connections.__getitem__.return_value.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with('SET LOCAL statement_timeout = %s', [500])
+
+    def test_endpoint_without_timeout(self, connections):
+        with statement_timeout('other', None) as using:
+            self.assertEqual(using, 'replica')
+        connections.__getitem__.assert_not_called()
+
+    def test_canceled_query_is_too_expensive(self, connections):
+        with self.assertRaises(QueryTooExpensive):
+            with statement_timeout('dataseries', None):
+                raise canceled_query()
+        with self.assertRaises(OperationalError): #other database errors are not hidden
+            with statement_timeout('dataseries', None):
+                raise OperationalError()
+
+def planned(rows, cost): #queryset whose EXPLAIN returns plan decoded by psycopg2
+    queryset = mock.Mock(db='replica')
+    queryset.query.get_compiler.return_value.as_sql.return_value = ('SELECT date_time FROM "tmavy" WHERE date_time >= %s', ('2020-01-01',))
+    connection = mock.MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = ([{'Plan': {'Node Type': 'Index Scan', 'Plan Rows': rows, 'Total Cost': cost}}],)
+    return queryset, cursor, connection
+
+@override_settings(API_LIMITS={'data': {'max_rows': 1000, 'max_cost': 5000}})
+class CheckCostTests(SimpleTestCase):
+    def test_explain_reads_decoded_plan(self):
+        queryset, cursor, connection = planned(10, 12.5)
+        with mock.patch('hydro.guards.connections', {'replica': connection}):
+            self.assertEqual(explain(queryset), (10, 12.5))
+        cursor.execute.assert_called_once_with('EXPLAIN (FORMAT JSON) SELECT date_time FROM "tmavy" WHERE date_time >= %s', ('2020-01-01',))
+        queryset.query.get_compiler.assert_called_once_with('replica')
+
+    def check(self, rows, cost):
+        queryset, _, connection = planned(rows, cost)
+        with mock.patch('hydro.guards.connections', {'replica': connection}):
+            return check_cost('data', queryset)
+
+    def test_cheap_query_passes(self):
+        self.assertEqual(self.check(100, 10.0), (100, 10.0))
+
+    def test_too_many_planned_rows(self):
+        with self.assertRaises(TooManyRows):
+            self.check(5000, 10.0)
+
+    def test_too_expensive_plan(self):
+        with self.assertRaises(QueryTooExpensive) as raised:
+            self.check(100, 10000.0)
+        self.assertEqual(raised.exception.detail['estimated_rows'], 100)
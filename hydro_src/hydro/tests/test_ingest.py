@@ -0,0 +1,21 @@
+from datetime import datetime
+from django.test import SimpleTestCase
+from hydro.serializers import IngestRecordSerializer
+
+class IngestRecordSerializerTests(SimpleTestCase):
+    def validated(self, date_time):
+        serializer = IngestRecordSerializer(data={'station': 'antygl_pritok', 'date_time': date_time, 'values': {'wl_mm': 1.5}})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['date_time']
+
+    def test_aware_timestamp_is_stored_in_local_time(self): #station tables hold naive Europe/Prague time
+        self.assertEqual(self.validated('2024-05-01T08:00:00Z'), datetime(2024, 5, 1, 10))
+        self.assertEqual(self.validated('2024-01-15T10:00:00+01:00'), datetime(2024, 1, 15, 10))
+
+    def test_naive_timestamp_is_kept(self):
+        self.assertEqual(self.validated('2024-05-01T10:00:00'), datetime(2024, 5, 1, 10))
+
+    def test_timestamp_has_to_be_on_the_hour(self):
+        serializer = IngestRecordSerializer(data={'station': 'antygl_pritok', 'date_time': '2024-05-01T10:30:00', 'values': {'wl_mm': 1.5}})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('date_time', serializer.errors)
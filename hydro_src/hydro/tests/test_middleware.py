@@ -0,0 +1,89 @@
+from unittest import mock
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from hydro.cache import build_entry
+from hydro.middleware import ApiCacheMiddleware, negotiate_encoding
+
+def data_response(version, content=b'{"data": []}'):
+    response = HttpResponse(content, content_type='application/json')
+    response['X-Data-Version'] = str(version)
+    return response
+
+@mock.patch('hydro.middleware.get_entry', return_value=None)
+@mock.patch('hydro.middleware.get_request_cache_key', return_value='api:0:hash:v5')
+class CacheStoreTests(SimpleTestCase):
+    def request(self, response):
+        with mock.patch('hydro.middleware.store_entry', wraps=lambda key, *args: None) as store_entry:
+            served = ApiCacheMiddleware(lambda request: response)(RequestFactory().get('/api/stations/tmavy/wl_mm/dataseries/'))
+        return served, store_entry
+
+    def test_payload_of_key_version_is_stored(self, get_request_cache_key, get_entry):
+        _, store_entry = self.request(data_response(5))
+        store_entry.assert_called_once()
+
+    def test_payload_of_lagging_replica_is_not_stored(self, get_request_cache_key, get_entry):
+        served, store_entry = self.request(data_response(4))
+        store_entry.assert_not_called()
+        self.assertEqual(served['X-Data-Version'], '4')
+
+class NegotiateEncodingTests(SimpleTestCase):
+    def test_preferred_available_encoding(self):
+        self.assertEqual(negotiate_encoding('gzip, br', ['br', 'gzip']), 'br')
+        self.assertEqual(negotiate_encoding('gzip;q=1.0, br;q=0.5', ['br', 'gzip']), 'gzip')
+
+    def test_refused_or_missing_encoding_is_identity(self):
+        self.assertIsNone(negotiate_encoding('', ['br', 'gzip']))
+        self.assertIsNone(negotiate_encoding('gzip;q=0, deflate', ['gzip']))
+        self.assertEqual(negotiate_encoding('*', ['gzip']), 'gzip')
+
+@override_settings(API_COMPRESSION_MIN_SIZE=10)
+class BuildResponseTests(SimpleTestCase):
+    def setUp(self): #settings override applies to test methods, not to class body
+        self.entry = build_entry(b'{"data": [1, 2, 3, 4, 5]}', 'application/json', {'X-Data-Version': '5'})
+
+    def build(self, **headers):
+        return ApiCacheMiddleware(None).build_response(RequestFactory().get('/api/stations/', **headers), self.entry)
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.build(HTTP_IF_NONE_MATCH=self.entry['etag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], self.entry['etag'])
+        self.assertEqual(response['X-Data-Version'], '5')
+
+    def test_other_etag_gets_payload(self):
+        response = self.build(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.entry['identity'])
+
+    def test_compressed_variant_is_served(self):
+        response = self.build(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response.content, self.entry['gzip'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+@mock.patch('hydro.middleware.get_entry', return_value=None)
+@mock.patch('hydro.middleware.get_request_cache_key', return_value='api:0:hash:v5')
+class UncachedResponseTests(SimpleTestCase):
+    def call(self, response, method='get'):
+        return ApiCacheMiddleware(lambda request: response)(getattr(RequestFactory(), method)('/api/stations/', HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_throttled_response_is_returned_unchanged(self, get_request_cache_key, get_entry):
+        response = HttpResponse(b'{"detail": "Request was throttled."}', status=429)
+        response['Retry-After'] = '30'
+        self.assertIs(self.call(response), response)
+
+    def test_method_not_allowed_is_returned_unchanged(self, get_request_cache_key, get_entry):
+        response = HttpResponse(b'{"detail": "Method not allowed."}', status=405)
+        response['Allow'] = 'GET, HEAD, OPTIONS'
+        self.assertIs(self.call(response, 'post'), response)
+
+    @override_settings(API_COMPRESSION_MIN_SIZE=10)
+    def test_no_store_response_keeps_headers_and_cookies(self, get_request_cache_key, get_entry):
+        response = data_response(5)
+        response['Cache-Control'] = 'no-store'
+        response['X-Custom'] = 'kept'
+        response.set_cookie('name', 'value')
+        served = self.call(response)
+        self.assertEqual(served['Content-Encoding'], 'gzip')
+        self.assertEqual((served['Cache-Control'], served['X-Custom']), ('no-store', 'kept'))
+        self.assertEqual(served.cookies['name'].value, 'value')
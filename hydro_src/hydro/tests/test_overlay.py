@@ -0,0 +1,59 @@
+from datetime import datetime
+from unittest import mock
+from django.db.models import Q
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+from hydro.overlay import overlay_matrix, years_filter
+from hydro.views import overlay
+
+class OverlayMatrixTests(SimpleTestCase):
+    def test_columns_follow_leap_year(self):
+        matrix = overlay_matrix([datetime(2019, 3, 1), datetime(2020, 2, 29, 5)], [1.0, 2.0], [2019, 2020])
+        self.assertEqual(len(matrix[0]), 366 * 24)
+        self.assertEqual(matrix[0][60 * 24], 1.0) #1 March has the same column in common year
+        self.assertIsNone(matrix[0][59 * 24]) #29 February stays empty
+        self.assertEqual(matrix[1][59 * 24 + 5], 2.0)
+
+    def test_only_requested_years_are_rows(self):
+        matrix = overlay_matrix([datetime(2018, 1, 2), datetime(2020, 1, 2)], [1.0, 2.0], [2020], daily=True)
+        self.assertEqual(len(matrix), 1)
+        self.assertEqual(matrix[0][1], 2.0)
+        self.assertEqual(overlay_matrix([], [], []), [])
+
+    def test_consecutive_years_are_merged(self):
+        self.assertEqual(years_filter([2019, 2017, 2018, 2021]),
+                         Q(date_time__gte=datetime(2017, 1, 1), date_time__lte=datetime(2019, 12, 31, 23)) |
+                         Q(date_time__gte=datetime(2021, 1, 1), date_time__lte=datetime(2021, 12, 31, 23)))
+
+@mock.patch('hydro.views.statement_timeout') #SET statement_timeout is postgres only
+@mock.patch('hydro.views.get_series', return_value=None)
+@mock.patch('hydro.models.DataVersion.get_version', return_value=3)
+class OverlayViewTests(SimpleTestCase):
+    def get(self, model, query=''):
+        with mock.patch('hydro.views.StationMetadataViewSet.get_field_model', return_value=model):
+            return overlay(APIRequestFactory().get(f'/api/stations/tmavy/wl_mm/overlay/?{query}'), station_id='tmavy', field='wl_mm')
+
+    def test_years_of_station_from_one_query(self, get_version, get_series, statement_timeout):
+        model = mock.Mock()
+        model.get_date_range.return_value = (datetime(2019, 5, 1), datetime(2020, 2, 1))
+        model.get_field_data.return_value.filter.return_value = [{'date': datetime(2019, 5, 1), 'value': 1.0}, {'date': datetime(2020, 1, 1, 1), 'value': 2.0}]
+        response = self.get(model)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['years'], [2019, 2020])
+        self.assertEqual(response.data['values'][0][121 * 24], 1.0) #1 May is day 121 of leap year
+        self.assertEqual(response.data['values'][1][1], 2.0)
+        self.assertEqual(response['X-Data-Version'], '3')
+        model.get_field_data.assert_called_once_with('wl_mm', datetime(2019, 1, 1), datetime(2020, 12, 31, 23), None)
+        model.get_field_data.return_value.filter.assert_called_once_with(years_filter([2019, 2020]))
+
+    def test_selected_years_and_daily_values(self, get_version, get_series, statement_timeout):
+        model = mock.Mock()
+        model.get_field_data.return_value.filter.return_value = [{'date': datetime(2015, 1, 3), 'value': 5.0}]
+        response = self.get(model, 'years=2015,2010&resample=1D')
+        self.assertEqual(response.data['years'], [2010, 2015])
+        self.assertEqual(len(response.data['values'][1]), 366)
+        self.assertEqual(response.data['values'][1][2], 5.0)
+        model.get_date_range.assert_not_called()
+
+    def test_unsupported_resample(self, get_version, get_series, statement_timeout):
+        self.assertEqual(self.get(mock.Mock(), 'resample=1M').status_code, 400)
@@ -0,0 +1,51 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime
+from unittest import mock
+from django.test import RequestFactory, SimpleTestCase
+from hydro.models import next_bucket_start
+from hydro.pagination import DateTimeKeysetPagination
+
+def cursor(value):
+    return urlsafe_b64encode(value.isoformat().encode()).decode()
+
+class NextBucketStartTests(SimpleTestCase):
+    def test_fixed_length_buckets(self):
+        self.assertEqual(next_bucket_start('1D', datetime(2020, 2, 28)), datetime(2020, 2, 29))
+        self.assertEqual(next_bucket_start('1W', datetime(2020, 12, 28)), datetime(2021, 1, 4))
+
+    def test_calendar_buckets(self):
+        self.assertEqual(next_bucket_start('1M', datetime(2020, 12, 1)), datetime(2021, 1, 1))
+        self.assertEqual(next_bucket_start('1Y', datetime(2020, 1, 1)), datetime(2021, 1, 1))
+        self.assertEqual(next_bucket_start('1Y', datetime(2019, 11, 1)), datetime(2020, 11, 1)) #hydrological year
+
+class PaginateQuerysetTests(SimpleTestCase):
+    def paginate(self, rows, after=None, **kwargs):
+        queryset = mock.MagicMock()
+        queryset.filter.return_value = queryset
+        queryset.order_by.return_value.__getitem__.return_value = rows
+        params = {'limit': 2, **({'cursor': cursor(after)} if after else {})}
+        paginator = DateTimeKeysetPagination()
+        page = paginator.paginate_queryset(queryset, RequestFactory().get('/api/stations/tmavy/wl_mm/dataseries/', params), **kwargs)
+        return paginator, page, queryset
+
+    def test_raw_rows_are_sought_after_cursor(self):
+        _, _, queryset = self.paginate([], datetime(2020, 1, 1, 5))
+        queryset.filter.assert_called_once_with(date_time__gt=datetime(2020, 1, 1, 5))
+
+    def test_resampled_rows_are_sought_on_raw_date(self): #truncated date is not covered by index
+        _, _, queryset = self.paginate([], datetime(2020, 3, 1), ordering='date', resample='1M')
+        queryset.filter.assert_called_once_with(date_time__gte=datetime(2020, 4, 1))
+        queryset.order_by.assert_called_once_with('date')
+
+    def test_envelope_is_shared_by_routes(self):
+        rows = [{'date': datetime(2020, 1, 1, hour), 'value': hour} for hour in range(3)]
+        paginator, page, _ = self.paginate(rows)
+        response = paginator.get_paginated_response(page, resample=None)
+        self.assertEqual(list(response.data), ['resample', 'next', 'results'])
+        self.assertEqual(response.data['results'], rows[:2])
+        self.assertEqual(paginator.get_next_cursor(), cursor(rows[1]['date']))
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_last_page_has_no_next(self):
+        paginator, page, _ = self.paginate([{'date': datetime(2020, 1, 1), 'value': 0}])
+        self.assertIsNone(paginator.get_paginated_response(page).data['next'])
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from hydro.models import QualityIssue
+from hydro.qc import find_issues, refresh_issues
+
+HOUR = timedelta(hours=1)
+START = datetime(2024, 1, 1)
+
+def table(values): #rows of single column table like LEAD() query returns them, 'missing' hour has no row
+    hours = [START + i * HOUR for i, value in enumerate(values) if value != 'missing']
+    rows = {START + i * HOUR: value for i, value in enumerate(values) if value != 'missing'}
+    return [(hour, following, rows[hour]) for hour, following in zip(hours, [*hours[1:], None])]
+
+@override_settings(QC_MIN_NULL_HOURS=3, QC_MIN_FLAT_HOURS=3)
+class FindIssuesTests(SimpleTestCase):
+    model = SimpleNamespace(_meta=SimpleNamespace(db_table='tmavy', fields=[SimpleNamespace(name='date_time', column='date_time'), SimpleNamespace(name='wl_mm', column='wl_mm')]))
+
+    def find(self, values, valid_range=(None, None), aggregation='mean'):
+        connection = mock.MagicMock()
+        connection.chunked_cursor.return_value.__enter__.return_value.__iter__.return_value = iter(table(values))
+        with mock.patch('hydro.qc.connections', {'default': connection}), \
+                mock.patch('hydro.qc.router.db_for_read', return_value='default'), \
+                mock.patch('hydro.models.ValuesMetadata.get_valid_ranges', return_value={'wl_mm': valid_range}), \
+                mock.patch('hydro.models.ValuesMetadata.get_aggregations', return_value={'wl_mm': aggregation}):
+            return [(issue.kind, issue.start, issue.end, issue.hours) for issue in find_issues('tmavy', self.model)]
+
+    def test_gap(self):
+        self.assertEqual(self.find([1, 2, 'missing', 'missing', 3]), [(QualityIssue.GAP, START + 2 * HOUR, START + 3 * HOUR, 2)])
+
+    def test_null_run_does_not_continue_across_gap(self):
+        issues = self.find([None, None, 'missing', None, None, 1])
+        self.assertNotIn(QualityIssue.NULL_RUN, [kind for kind, *_ in issues])
+
+    def test_null_run(self):
+        self.assertIn((QualityIssue.NULL_RUN, START + HOUR, START + 3 * HOUR, 3), self.find([1, None, None, None, 2]))
+
+    def test_flat_run(self):
+        self.assertEqual(self.find([1, 5, 5, 5, 2]), [(QualityIssue.FLAT, START + HOUR, START + 3 * HOUR, 3)])
+
+    def test_flat_run_of_accumulated_field_is_not_reported(self):
+        self.assertEqual(self.find([0, 0, 0, 0], aggregation='sum'), [])
+
+    def test_out_of_range(self):
+        self.assertEqual(self.find([1, -1, -2, 1, 3], valid_range=(0, None)),
+                         [(QualityIssue.OUT_OF_RANGE, START + HOUR, START + 2 * HOUR, 2)])
+
+@override_settings(QC_MIN_NULL_HOURS=3, QC_MIN_FLAT_HOURS=3)
+class RefreshIssuesTests(SimpleTestCase):
+    def refresh(self, stored, found):
+        objects = mock.MagicMock()
+        objects.filter.return_value.aggregate.return_value = stored
+        with mock.patch('hydro.qc.QualityIssue.objects', objects), mock.patch('hydro.qc.find_issues', return_value=found) as find:
+            refresh_issues('tmavy', None, START + 10 * HOUR, START + 12 * HOUR)
+        return find.call_args[0][2:], objects.filter.call_args_list[-1][1], objects.bulk_create.call_args[0][0]
+
+    def test_window_is_widened_by_run_length(self):
+        window, deleted, _ = self.refresh({'start': None, 'end': None}, [])
+        self.assertEqual(window, (START + 7 * HOUR, START + 15 * HOUR))
+        self.assertEqual(deleted, {'station': 'tmavy', 'start__gt': START + 7 * HOUR, 'end__lt': START + 15 * HOUR})
+
+    def test_stored_issues_reaching_into_window_are_rescanned_whole(self):
+        window, _, _ = self.refresh({'start': START, 'end': START + 20 * HOUR}, [])
+        self.assertEqual(window, (START - HOUR, START + 21 * HOUR))
+
+    def test_issues_touching_window_edge_are_not_stored(self):
+        inside = QualityIssue(station='tmavy', kind=QualityIssue.GAP, start=START + 9 * HOUR, end=START + 11 * HOUR, hours=3)
+        edge = QualityIssue(station='tmavy', kind=QualityIssue.FLAT, field='wl_mm', start=START + 7 * HOUR, end=START + 9 * HOUR, hours=3)
+        self.assertEqual(self.refresh({'start': None, 'end': None}, [inside, edge])[2], [inside])
@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from unittest import mock
+from django.test import SimpleTestCase
+from hydro.models import StationMetadata
+from hydro.routers import AnalyticsRouter, analytical, analytical_queries, consistent_snapshot
+from hydro.tests.test_aggregates import TestStation
+
+router = AnalyticsRouter()
+
+class AnalyticsRouterTests(SimpleTestCase):
+    def test_station_reads_go_to_replica_only_in_analytical_block(self):
+        self.assertEqual(router.db_for_read(TestStation), 'default')
+        with analytical_queries():
+            self.assertEqual(router.db_for_read(TestStation), 'replica')
+            self.assertEqual(router.db_for_read(StationMetadata), 'default') #metadata stays on primary
+            self.assertEqual(router.db_for_write(TestStation), 'default')
+        self.assertEqual(router.db_for_read(TestStation), 'default')
+
+    def test_context_is_reset_when_view_fails(self):
+        @analytical
+        def view():
+            raise ValueError
+        with self.assertRaises(ValueError):
+            view()
+        self.assertEqual(router.db_for_read(TestStation), 'default')
+
+    def test_copied_context_routes_worker_threads(self): #cross-station queries run in thread pool
+        with analytical_queries(), ThreadPoolExecutor(max_workers=1) as executor:
+            copied = executor.submit(copy_context().run, router.db_for_read, TestStation).result()
+            plain = executor.submit(router.db_for_read, TestStation).result()
+        self.assertEqual((copied, plain), ('replica', 'default'))
+
+    def test_station_queryset_keeps_database_chosen_at_creation(self): #lazy queryset evaluated after view returns
+        with analytical_queries():
+            queryset = TestStation.objects.all()
+        self.assertEqual(queryset.db, 'replica')
+
+@mock.patch('hydro.routers.transaction')
+@mock.patch('hydro.routers.connections')
+class ConsistentSnapshotTests(SimpleTestCase):
+    def test_outermost_block_sets_repeatable_read_on_data_connection(self, connections, transaction):
+        connections.__getitem__.return_value.in_atomic_block = False
+        with analytical_queries(), consistent_snapshot(TestStation) as using:
+            self.assertEqual(using, 'replica') #data version is read from the same connection
+        transaction.atomic.assert_called_once_with(using='replica')
+        cursor = connections.__getitem__.return_value.cursor.return_value.__enter__.return_value
+        cursor.execute.assert_called_once_with('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+
+    def test_nested_block_keeps_isolation_of_outer_transaction(self, connections, transaction):
+        connections.__getitem__.return_value.in_atomic_block = True
+        with consistent_snapshot(TestStation) as using:
+            self.assertEqual(using, 'default')
+        connections.__getitem__.return_value.cursor.assert_not_called()
@@ -0,0 +1,36 @@
+from unittest import mock
+from django.db import models
+from django.test import SimpleTestCase, override_settings
+from hydro.stations.models import station_models
+from hydro.stations.schema import check_schema_file, create_station_model, load_schema
+
+class CreateStationModelTests(SimpleTestCase):
+    def test_field_class_follows_column_type(self):
+        model = create_station_model('test_schema_station', {
+            'wl_mm': {'column': 'WL_mm', 'type': 'double precision'},
+            'hs_cm': {'column': 'HS_cm', 'type': 'bigint'},
+            'n': {'column': 'N', 'type': 'integer'},
+        })
+        self.assertIsInstance(model._meta.get_field('wl_mm'), models.FloatField)
+        self.assertIsInstance(model._meta.get_field('hs_cm'), models.BigIntegerField)
+        self.assertIsInstance(model._meta.get_field('n'), models.IntegerField)
+        self.assertEqual(model._meta.get_field('hs_cm').column, 'HS_cm')
+
+    def test_integer_columns_of_schema_file_stay_integer(self): #were BigIntegerField in the hand written models
+        self.assertIsInstance(station_models['javori_pila']._meta.get_field('swe_mm'), models.BigIntegerField)
+        self.assertIsInstance(station_models['ptaci_spa']._meta.get_field('hs_cm'), models.BigIntegerField)
+        self.assertIsInstance(station_models['ptaci_spa']._meta.get_field('at_degc'), models.FloatField)
+
+@override_settings(STATION_SCHEMA_FILE='/nonexistent/station_schema.json')
+class MissingSchemaFileTests(SimpleTestCase):
+    def test_missing_file_does_not_query_database(self):
+        with mock.patch('hydro.stations.schema.introspect_schema') as introspect_schema, self.assertLogs('hydro.stations.schema', 'ERROR'):
+            self.assertEqual(load_schema(), {})
+        introspect_schema.assert_not_called()
+
+    def test_missing_file_fails_system_check(self):
+        self.assertEqual([error.id for error in check_schema_file(None)], ['stations.E001'])
+
+    def test_present_file_passes_system_check(self):
+        with override_settings(STATION_SCHEMA_FILE=__file__):
+            self.assertEqual(check_schema_file(None), [])
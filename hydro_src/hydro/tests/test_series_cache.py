@@ -0,0 +1,30 @@
+import json
+from datetime import datetime, timedelta
+import numpy as np
+from django.test import SimpleTestCase
+from hydro.renderers import JSONRenderer
+from hydro.series_cache import Series
+
+def series(values, integer=False):
+    hours = np.arange(len(values), dtype=np.int64) + np.datetime64('2020-01-01T00', 'h').astype(np.int64)
+    return Series(hours, np.array(values, dtype=np.float64), integer=integer)
+
+def sql_rows(values, start=datetime(2020, 1, 1)): #rows as get_field_data returns them
+    return [{'date': start + timedelta(hours=hour), 'value': value} for hour, value in enumerate(values)]
+
+class SliceTests(SimpleTestCase):
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_slice_renders_same_bytes_as_sql_rows(self): #cached and database path share ETag and cache key
+        values = [0.1, 1234.5678901, None, -3.0]
+        sliced = series([np.nan if value is None else value for value in values]).slice(datetime(2020, 1, 1), datetime(2020, 1, 1, 3))
+        self.assertEqual(self.render({'resample': None, 'data': sliced}), self.render({'resample': None, 'data': sql_rows(values)}))
+
+    def test_integer_column_renders_ints(self):
+        sliced = series([5, np.nan], integer=True).slice(datetime(2020, 1, 1), datetime(2020, 1, 1, 1))
+        self.assertEqual(self.render(sliced), self.render(sql_rows([5, None])))
+
+    def test_slice_bounds_are_inclusive_whole_hours(self):
+        sliced = series([1.0, 2.0, 3.0, 4.0]).slice(datetime(2020, 1, 1, 0, 30), datetime(2020, 1, 1, 2))
+        self.assertEqual([row['value'] for row in json.loads(self.render(sliced))], [2.0, 3.0])
@@ -0,0 +1,42 @@
+import numpy as np
+from django.test import SimpleTestCase
+from hydro.sketches import QuantileSketch, build_sketches, quantile_key
+
+class QuantileSketchTests(SimpleTestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(1).normal(100, 20, 20000)
+
+    def test_quantiles_are_close_to_exact(self):
+        sketch = QuantileSketch.from_values(self.values)
+        self.assertLess(len(sketch.means), len(self.values) / 10)
+        np.testing.assert_allclose(sketch.quantiles([0.1, 0.5, 0.9]), np.quantile(self.values, [0.1, 0.5, 0.9]), atol=1.0)
+        np.testing.assert_allclose(sketch.quantiles([0, 1]), [self.values.min(), self.values.max()])
+
+    def test_merge_matches_sketch_of_all_values(self):
+        parts = np.array_split(np.sort(self.values), 4) #worst case, every part covers different range
+        merged = QuantileSketch.merge(QuantileSketch.from_values(part) for part in parts)
+        self.assertEqual(merged.count, len(self.values))
+        np.testing.assert_allclose(merged.quantiles([0.1, 0.5, 0.9]), np.quantile(self.values, [0.1, 0.5, 0.9]), atol=1.0)
+
+    def test_missing_values_are_ignored(self):
+        sketch = QuantileSketch.from_values(np.array([np.nan, 1.0, 2.0, 3.0, np.nan]))
+        self.assertEqual(sketch.count, 3)
+        self.assertEqual(sketch.quantiles([0.5])[0], 2.0)
+
+    def test_empty_sketches(self):
+        self.assertTrue(np.isnan(QuantileSketch.from_values(np.array([np.nan])).quantiles([0.5])).all())
+        self.assertTrue(np.isnan(QuantileSketch.merge([]).quantiles([0.5])).all())
+
+    def test_row_round_trip(self):
+        sketch = QuantileSketch.from_values(self.values)
+        restored = QuantileSketch.from_row(sketch.to_row(2020, 1))
+        np.testing.assert_array_equal(restored.quantiles([0.25, 0.75]), sketch.quantiles([0.25, 0.75]))
+
+class BuildSketchesTests(SimpleTestCase):
+    def test_months_are_split(self):
+        hours = np.arange(np.datetime64('2020-01-31T22', 'h'), np.datetime64('2020-02-01T02', 'h')).astype(np.int64)
+        sketches = build_sketches(hours, np.array([1.0, 2.0, 3.0, 4.0]))
+        self.assertEqual({key: sketch.count for key, sketch in sketches.items()}, {(2020, 1): 2, (2020, 2): 2})
+
+    def test_quantile_key(self):
+        self.assertEqual((quantile_key(0.1), quantile_key(0.025), quantile_key(0.5)), ('q10', 'q2.5', 'q50'))
@@ -0,0 +1,35 @@
+from datetime import date, datetime, timedelta
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework.exceptions import ValidationError
+from hydro.utils import parse_date_param, parse_resample_param, parse_rolling_param, parse_years_param
+
+def request(**params):
+    return RequestFactory().get('/api/stations/tmavy/wl_mm/dataseries/', params)
+
+class ParseParamTests(SimpleTestCase):
+    def test_date_param(self):
+        self.assertEqual(parse_date_param(request(start='2020-01-31'), 'start'), date(2020, 1, 31))
+        self.assertEqual(parse_date_param(request(start='2020-01-31T05:00:00'), 'start'), datetime(2020, 1, 31, 5))
+        self.assertIsNone(parse_date_param(request(), 'start'))
+        with self.assertRaises(ValidationError):
+            parse_date_param(request(start='2020-02-30'), 'start')
+
+    def test_resample_param(self):
+        self.assertEqual(parse_resample_param(request(resample='1M')), '1M')
+        self.assertIsNone(parse_resample_param(request(resample='')))
+        with self.assertRaises(ValidationError):
+            parse_resample_param(request(resample='1H'))
+
+    def test_rolling_param(self):
+        self.assertEqual(parse_rolling_param(request(rolling='24h:sum')), (timedelta(hours=24), 'sum'))
+        self.assertEqual(parse_rolling_param(request(rolling='7d:max')), (timedelta(days=7), 'max'))
+        self.assertIsNone(parse_rolling_param(request()))
+        for rolling in ('0h:sum', '24h:median', '2w:mean', 'sum'):
+            with self.assertRaises(ValidationError):
+                parse_rolling_param(request(rolling=rolling))
+
+    def test_years_param(self):
+        self.assertEqual(parse_years_param(request(years='2020,2019,2020')), [2019, 2020])
+        self.assertIsNone(parse_years_param(request()))
+        with self.assertRaises(ValidationError):
+            parse_years_param(request(years='2019,20'))
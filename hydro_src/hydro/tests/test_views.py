@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest import mock
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+from hydro.views import cross_station_dataseries
+
+class StationModel: #stands in for generated station model, rows as get_field_data returns them
+    def __init__(self, fields, rows=()):
+        self.fields = fields
+        self.rows = list(rows)
+
+    def has_field(self, field):
+        return field in self.fields
+
+    def get_field_data(self, field, start_date, end_date, *args):
+        return self.rows
+
+def row(hour, value):
+    return {'date': datetime(2020, 1, 1, hour), 'value': value}
+
+@mock.patch('hydro.views.statement_timeout') #SET statement_timeout is postgres only
+@mock.patch('hydro.models.StationMetadata.objects')
+@mock.patch('hydro.models.ValuesMetadata.objects')
+class CrossStationDataseriesTests(SimpleTestCase):
+    def get(self, query='start=2020-01-01&end=2020-01-02'):
+        return cross_station_dataseries(APIRequestFactory().get(f'/api/values/wl_mm/dataseries/?{query}'), field='wl_mm')
+
+    def test_stations_are_aligned_on_common_dates(self, values_objects, station_objects, statement_timeout):
+        models = {
+            'tmavy': StationModel(['wl_mm'], [row(0, 1.0), row(2, 3.0)]),
+            'ptaci': StationModel(['wl_mm'], [row(1, 2.0), row(2, 4.0)]),
+            'lucni': StationModel(['p_mm'], [row(0, 9.0)]), #does not measure parameter
+        }
+        def get_model_from_table(table):
+            if table not in models:
+                raise ValueError(table)
+            return models[table]
+        station_objects.values_list.return_value = ['tmavy', 'ptaci', 'lucni', 'no_table']
+        with mock.patch('hydro.views.StationMetadataViewSet.get_model_from_table', side_effect=get_model_from_table):
+            response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['dates'], [datetime(2020, 1, 1, hour) for hour in range(3)])
+        self.assertEqual(response.data['stations'], {'tmavy': [1.0, None, 3.0], 'ptaci': [None, 2.0, 4.0]})
+
+    def test_unknown_parameter(self, values_objects, station_objects, statement_timeout):
+        values_objects.filter.return_value.exists.return_value = False
+        self.assertEqual(self.get().status_code, 404)
+
+    def test_range_is_required(self, values_objects, station_objects, statement_timeout):
+        self.assertEqual(self.get('start=2020-01-01').status_code, 400)
+        self.assertEqual(self.get('start=2020-01-01&end=2020-02-30').status_code, 400)
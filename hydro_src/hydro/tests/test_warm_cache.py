@@ -0,0 +1,72 @@
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from hydro.management.commands.warm_cache import Command, dataseries_path
+from hydro.middleware import ApiCacheMiddleware
+
+@api_view(['GET'])
+def dataseries_view(request, station_id, field):
+    return Response({'data': [], 'max_points': int(request.GET['max_points'])}, headers={'X-Data-Version': '5'})
+
+@api_view(['GET'])
+def failing_view(request, station_id, field):
+    return Response({'detail': 'error'}, status=500)
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}, WARM_CACHE_MAX_POINTS=[2000])
+@mock.patch('hydro.models.DataVersion.get_version', return_value=5)
+class WarmCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.command = Command(stdout=StringIO(), stderr=StringIO())
+        self.command.factory = RequestFactory()
+
+    def warm(self, path, view=dataseries_view):
+        with mock.patch('hydro.management.commands.warm_cache.resolve', return_value=SimpleNamespace(func=view, args=(), kwargs={'station_id': 'tmavy', 'field': 'wl_mm'})), \
+                mock.patch('hydro.management.commands.warm_cache.connections'):
+            return self.command.warm(path, True)
+
+    def front_end_request(self): #fetchSeries of scripts.js
+        return RequestFactory().get('/api/stations/tmavy/wl_mm/dataseries/?start=&end=&resample=auto&max_points=2000',
+                                    HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_ACCEPT='*/*')
+
+    def test_warmed_dataseries_is_hit_by_front_end_request(self, get_version):
+        self.warm(dataseries_path('tmavy', 'wl_mm', 2000))
+        response = ApiCacheMiddleware(mock.Mock(side_effect=AssertionError('cache miss')))(self.front_end_request())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Data-Version'], '5')
+
+    def test_payload_of_other_version_is_not_warmed(self, get_version):
+        get_version.return_value = 6
+        self.assertIsNone(self.warm(dataseries_path('tmavy', 'wl_mm', 2000)))
+
+    def test_payload_of_other_version_is_missed(self, get_version): #ingest bumped version after warming
+        self.warm(dataseries_path('tmavy', 'wl_mm', 2000))
+        get_version.return_value = 6
+        get_response = mock.Mock(return_value=HttpResponse(b'{}', content_type='application/json'))
+        ApiCacheMiddleware(get_response)(self.front_end_request())
+        get_response.assert_called_once()
+
+    def test_failed_payload_is_not_stored(self, get_version):
+        self.assertIsNone(self.warm(dataseries_path('tmavy', 'wl_mm', 2000), failing_view))
+        self.assertIn('status 500', self.command.stderr.getvalue())
+
+    @mock.patch('hydro.views.StationMetadataViewSet.get_model_from_table', return_value=SimpleNamespace(_meta=SimpleNamespace(fields=[SimpleNamespace(name='wl_mm')])))
+    @mock.patch('hydro.models.DerivedSeries.get_fields', return_value=['q_m3s'])
+    def test_station_paths_use_front_end_query(self, get_fields, get_model_from_table, get_version):
+        self.command.warm = mock.Mock(return_value=[2019, 2020])
+        with mock.patch('hydro.models.ValuesMetadata.objects') as objects:
+            objects.filter.return_value.values_list.return_value = ['wl_mm']
+            items = self.command.station_paths('tmavy')
+        self.assertEqual(items, [
+            ('/api/stations/tmavy/wl_mm/dataseries/?start=&end=&resample=auto&max_points=2000', True),
+            ('/api/stations/tmavy/wl_mm/percentiles/', True),
+            ('/api/stations/tmavy/wl_mm/2020/yearly-data/', False),
+            ('/api/stations/tmavy/q_m3s/dataseries/?start=&end=&resample=auto&max_points=2000', True), #derived discharge is shown on default page too
+            ('/api/stations/tmavy/q_m3s/percentiles/', True),
+            ('/api/stations/tmavy/q_m3s/2020/yearly-data/', False),
+        ])
@@ -0,0 +1,55 @@
+from datetime import datetime
+import numpy as np
+from django.db.models import Q
+from django.test import SimpleTestCase, override_settings
+from hydro.cache import get_cache_key
+from hydro.overlay import overlay_matrix
+from hydro.years import hydro_year, month_order, months_filter, sort_months, year_bounds
+
+@override_settings(HYDRO_YEAR_START_MONTH=1)
+class CalendarYearTests(SimpleTestCase):
+    def test_year_helpers(self):
+        self.assertEqual(year_bounds(2020), (datetime(2020, 1, 1), datetime(2020, 12, 31, 23)))
+        self.assertEqual((hydro_year(2019, 11), hydro_year(2020, 1)), (2019, 2020))
+        self.assertEqual(month_order(), list(range(1, 13)))
+
+    def test_overlay_columns_follow_leap_year(self):
+        matrix = overlay_matrix(['2019-03-01T00', '2020-02-29T05', '2020-12-31T23'], [1.0, 2.0, 3.0], [2019, 2020])
+        self.assertEqual(matrix[0][60 * 24], 1.0) #1 March has the same column in common year
+        self.assertIsNone(matrix[0][59 * 24]) #29 February stays empty
+        self.assertEqual(matrix[1][59 * 24 + 5], 2.0)
+        self.assertEqual(matrix[1][366 * 24 - 1], 3.0)
+
+@override_settings(HYDRO_YEAR_START_MONTH=11)
+class HydrologicalYearTests(SimpleTestCase):
+    def test_year_helpers(self):
+        self.assertEqual(year_bounds(2020), (datetime(2019, 11, 1), datetime(2020, 10, 31, 23)))
+        self.assertEqual((hydro_year(2019, 10), hydro_year(2019, 11), hydro_year(2020, 10)), (2019, 2020, 2020))
+        self.assertEqual(month_order()[:3], [11, 12, 1])
+
+    def test_sort_months(self):
+        rows = [{'string_date_without_year': f'{month:02d}-01T00:00:00'} for month in range(1, 13)]
+        self.assertEqual([row['string_date_without_year'][:2] for row in sort_months(rows)][:3], ['11', '12', '01'])
+
+    def test_months_filter(self):
+        self.assertEqual(months_filter(2020), Q(year__gte=2020) | Q(year=2019, month__gte=11))
+        self.assertEqual(months_filter(end_year=2020), Q(year__lt=2020) | Q(year=2020, month__lt=11))
+
+    def test_overlay_rows_and_columns_start_in_november(self):
+        matrix = overlay_matrix(['2019-10-31T23', '2019-11-01T00', '2020-03-01T00', '2020-10-31T23'], [1.0, 2.0, 3.0, 4.0], [2019, 2020])
+        self.assertEqual(matrix[0][366 * 24 - 1], 1.0)
+        self.assertEqual(matrix[1][0], 2.0)
+        self.assertEqual(matrix[1][(30 + 31 + 31 + 29) * 24], 3.0) #November to February of leap calendar
+        self.assertEqual(matrix[1][366 * 24 - 1], 4.0)
+
+    def test_daily_overlay(self):
+        matrix = overlay_matrix(np.array(['2019-11-02'], dtype='datetime64[D]'), [5.0], [2020], daily=True)
+        self.assertEqual(matrix[0][1], 5.0)
+
+class YearStartCacheKeyTests(SimpleTestCase):
+    def test_year_start_is_part_of_cache_key(self):
+        with self.settings(HYDRO_YEAR_START_MONTH=1):
+            calendar = get_cache_key('/api/stations/tmavy/wl_mm/2020/yearly-data/', version=3)
+        with self.settings(HYDRO_YEAR_START_MONTH=11):
+            hydrological = get_cache_key('/api/stations/tmavy/wl_mm/2020/yearly-data/', version=3)
+        self.assertNotEqual(calendar, hydrological)
@@ -0,0 +1,36 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+from .cache import local_lock, shared_lock
+
+LOCK_TIMEOUT = 1 #seconds, bucket update takes two cache round trips
+
+class TokenBucketThrottle(BaseThrottle): #per client token bucket, state is kept in shared cache so all workers count together
+    scope = None
+
+    def allow_request(self, request, view):
+        if getattr(request, 'cache_warming', False): #warm_cache calls views directly and must not be limited
+            return True
+        rate, burst = settings.API_THROTTLE_RATES[self.scope] #tokens per second, bucket size
+        key = f'throttle:{self.scope}:{self.get_ident(request)}'
+        timeout = int(burst / rate) + 1 #full bucket does not need to be stored
+        with local_lock(key), shared_lock(key, LOCK_TIMEOUT): #get and set of parallel requests of one client must not interleave
+            now = time.time()
+            tokens, updated = cache.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens < 1:
+                self.wait_time = (1 - tokens) / rate
+                cache.set(key, (tokens, now), timeout)
+                return False
+            cache.set(key, (tokens - 1, now), timeout)
+            return True
+
+    def wait(self):
+        return self.wait_time
+
+class HeavyRouteThrottle(TokenBucketThrottle): #dataseries, percentiles, yearly data and data export
+    scope = 'heavy'
+
+class CrossStationThrottle(TokenBucketThrottle): #one request queries every station measuring the parameter
+    scope = 'cross-station'
@@ -1,22 +1,115 @@
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from .models import RESAMPLE_KINDS, ROLLING_FUNCTIONS
+from .years import last_day, month_order, sort_months
+
+RESAMPLE_AUTO = 'auto' #resample chosen by server from range and max_points
+
+MAX_QUANTILES = 20 #quantiles of one percentiles request
+
+ROLLING_RE = re.compile(r'^(\d+)([hd]):(\w+)$')
+ROLLING_UNITS = {'h': 'hours', 'd': 'days'}
+
 def prepare_data_for_chart(results): #cleanest way render monthly percentiles to yearly chart, moves values to middle of month and adds data to start and end of the year
+    results = sort_months(results)
     for result in results:
         month = result['string_date_without_year'][:2]
         result['string_date_without_year'] = f"{month}-15T00:00:00"
 
-    #find December and January results
-    dec_result = next((result for result in results if result['string_date_without_year'].startswith('12-')), None)
-    jan_result = next((result for result in results if result['string_date_without_year'].startswith('01-')), None)
+    #find results of last and first month of year (December and January for calendar year)
+    months = month_order()
+    last_result = next((result for result in results if result['string_date_without_year'].startswith(f'{months[-1]:02d}-')), None)
+    first_result = next((result for result in results if result['string_date_without_year'].startswith(f'{months[0]:02d}-')), None)
+
+    #add last month to first day of year
+    if last_result:
+        last_result_prev_year = last_result.copy()
+        last_result_prev_year['string_date_without_year'] = f'{months[0]:02d}-01T00:00:00'
+        results.insert(0, last_result_prev_year)
+
+    #add first month to last day of year
+    if first_result:
+        first_result_next_year = first_result.copy()
+        first_result_next_year['string_date_without_year'] = f'{months[-1]:02d}-{last_day(months[-1]):02d}T00:00:00'
+        results.append(first_result_next_year)
+
+    return results
+
+def parse_date_param(request, name): #validates start/end query parameters instead of passing raw strings to the database
+    value = request.GET.get(name, '')
+    if value == '':
+        return None
+    try:
+        parsed = parse_datetime(value) or parse_date(value)
+    except ValueError: #well formatted but not an existing date
+        parsed = None
+    if parsed is None:
+        raise ValidationError(f'error: Invalid date in parameter {name}')
+    return parsed
+
+
+def parse_resample_param(request, allow_auto=False): #None means raw hourly data
+    resample = request.GET.get('resample', '')
+    if resample == '':
+        return None
+    if allow_auto and resample == RESAMPLE_AUTO:
+        return resample
+    if resample not in RESAMPLE_KINDS:
+        choices = [*RESAMPLE_KINDS, RESAMPLE_AUTO] if allow_auto else RESAMPLE_KINDS
+        raise ValidationError('error: Invalid resample, use one of {}'.format(', '.join(choices)))
+    return resample
+
+
+def parse_max_points_param(request): #point budget of resample=auto, capped so every response stays bounded
+    max_points = request.GET.get('max_points', '')
+    if max_points == '':
+        return settings.API_DEFAULT_POINTS
+    if not max_points.isdigit() or int(max_points) == 0:
+        raise ValidationError('error: Invalid max_points, use positive integer')
+    return min(int(max_points), settings.API_MAX_POINTS)
+
+
+def parse_rolling_param(request): #e.g. 24h:sum or 7d:max, returns (timedelta, function) or None
+    rolling = request.GET.get('rolling', '')
+    if rolling == '':
+        return None
+    match = ROLLING_RE.match(rolling)
+    if match is None or match.group(3) not in ROLLING_FUNCTIONS or int(match.group(1)) == 0:
+        raise ValidationError('error: Invalid rolling, use <length><h|d>:<{}>'.format('|'.join(ROLLING_FUNCTIONS)))
+    window = timedelta(**{ROLLING_UNITS[match.group(2)]: int(match.group(1))})
+    return window, match.group(3)
+
+
+def parse_quantiles_param(request): #e.g. q=0.05,0.5,0.95, None means default deciles
+    value = request.GET.get('q', '')
+    if value == '':
+        return None
+    try:
+        quantiles = sorted({float(q) for q in value.split(',')})
+    except ValueError:
+        quantiles = None
+    if not quantiles or len(quantiles) > MAX_QUANTILES or not all(0 <= q <= 1 for q in quantiles):
+        raise ValidationError(f'error: Invalid q, use up to {MAX_QUANTILES} comma separated numbers between 0 and 1')
+    return quantiles
+
 
-    #add December as '01-01T00:00:00'
-    if dec_result:
-        dec_result_prev_year = dec_result.copy()
-        dec_result_prev_year['string_date_without_year'] = '01-01T00:00:00'
-        results.insert(0, dec_result_prev_year)
+def parse_year_param(request, name):
+    value = request.GET.get(name, '')
+    if value == '':
+        return None
+    if not value.isdigit() or len(value) != 4:
+        raise ValidationError(f'error: Invalid year in parameter {name}')
+    return int(value)
 
-    #add January as '12-31T00:00:00'
-    if jan_result:
-        jan_result_next_year = jan_result.copy()
-        jan_result_next_year['string_date_without_year'] = '12-31T00:00:00'
-        results.append(jan_result_next_year)
 
-    return results
\ No newline at end of file
+def parse_years_param(request): #e.g. years=2019,2020, None means all years of station
+    value = request.GET.get('years', '')
+    if value == '':
+        return None
+    years = value.split(',')
+    if not all(year.isdigit() and len(year) == 4 for year in years):
+        raise ValidationError('error: Invalid years, use comma separated years')
+    return sorted({int(year) for year in years})
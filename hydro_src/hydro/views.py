@@ -1,15 +1,33 @@
 from rest_framework import viewsets
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes, throttle_classes
+from rest_framework import status
 from rest_framework.response import Response
-from django.db.models.functions import ExtractYear
-from .serializers import StationMetadataSerializer, ValuesMetadataSerializer, StationGeoSerializer
+from .serializers import StationMetadataSerializer, ValuesMetadataSerializer, QualityIssueSerializer, IngestRecordSerializer
 from hydro import models as hydro_models
-from django.apps import apps
+from hydro.stations.models import derived_models, station_models
 from django.shortcuts import render
-from datetime import date
-from rest_framework.exceptions import ValidationError
-from .utils import prepare_data_for_chart
-from django.utils.html import escape
+from rest_framework.exceptions import ValidationError, NotFound
+from .pagination import DateTimeKeysetPagination
+from .utils import RESAMPLE_AUTO, prepare_data_for_chart, parse_date_param, parse_max_points_param, parse_quantiles_param, parse_resample_param, parse_rolling_param, parse_year_param, parse_years_param
+from django.db import connections
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from .routers import analytical
+from .guards import check_cost, check_range, choose_resample, is_unusual, statement_timeout
+from .throttling import CrossStationThrottle, HeavyRouteThrottle
+from .series_cache import get_series
+from .sketches import monthly_percentiles
+from .overlay import LEAP_YEAR, overlay_matrix, years_filter
+from .years import hydro_year, sort_months, year_bounds
+from .ingest import ingest_buffer
+from .permissions import HasIngestToken
+
+PERCENTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9] #same as BaseStationModel.calculate_percentiles
+
+def versioned(response, version): #data version of station the payload was built from (read in same snapshot as data), used by clients as cache key
+    response['X-Data-Version'] = str(version)
+    return response
 
 class ValuesMetadataViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = hydro_models.ValuesMetadata.objects.all()
@@ -24,84 +42,292 @@ class StationMetadataViewSet(viewsets.ReadOnlyModelViewSet):
         station = self.get_object()
         model = self.get_model_from_table(station.st_name)
         fields = [field.name for field in model._meta.fields]
+        if station.st_name in derived_models: #materialized derived parameters are listed like measured ones
+            fields += hydro_models.DerivedSeries.get_fields(station.st_name, hydro_models.DataVersion.get_version(station.st_name))
         values = hydro_models.ValuesMetadata.objects.filter(django_field_name__in=fields)
         serializer = ValuesMetadataSerializer(values, many=True)
         return Response(serializer.data)
 
     @action(detail=True, methods=['get']) #returns all years of selected station measurements to keep number of requests lower
+    @analytical
     def years(self, request, pk=None):
         station = self.get_object()
         model = self.get_model_from_table(station.st_name)
-        years = sorted(model.objects.annotate(year=ExtractYear('date_time')).values_list('year', flat=True).distinct())
+        years = model.get_years() #hydrological years when HYDRO_YEAR_START_MONTH is not january
         return Response(years)
     
+    @action(detail=True, methods=['get']) #returns stored data quality issues, optionally filtered by field and kind
+    def qc(self, request, pk=None):
+        station = self.get_object()
+        issues = hydro_models.QualityIssue.objects.filter(station=station.st_name).order_by('start')
+        if request.GET.get('field'):
+            issues = issues.filter(field=request.GET['field'])
+        if request.GET.get('kind'):
+            issues = issues.filter(kind=request.GET['kind'])
+        serializer = QualityIssueSerializer(issues, many=True)
+        response = Response(serializer.data)
+        response['Cache-Control'] = 'no-store' #issues are replaced by compute_qc without data version change
+        return response
+
+    @action(detail=True, methods=['get']) #returns data version of station, not cached so clients can check their stored series cheaply
+    def version(self, request, pk=None):
+        station = self.get_object()
+        response = Response({'station': station.st_name, 'version': hydro_models.DataVersion.get_version(station.st_name)})
+        response['Cache-Control'] = 'no-store'
+        return response
+
     @action(detail=False, methods=['get']) #returns geojson
     def geo(self, request):
+        from .geo_serializers import StationGeoSerializer #lazy import, API workers load GIS serializers only when needed
         serializer = StationGeoSerializer(self.queryset, many=True)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['get']) #returns all data for selected stations (/api/stations/<station_id>/data/), not used in front end currently
+    @action(detail=True, methods=['get'], throttle_classes=[HeavyRouteThrottle]) #returns all data for selected stations (/api/stations/<station_id>/data/), not used in front end currently
+    @analytical
     def data(self, request, pk=None):
         station = self.get_object()
         model = self.get_model_from_table(station.st_name)
-        data = model.objects.values()
+        resample = parse_resample_param(request)
+        if resample is None:
+            data = model.objects.values()
+            ordering = key = 'date_time'
+        else:
+            data = model.get_resampled_data(resample)
+            ordering = key = 'date'
+
+        paginator = DateTimeKeysetPagination()
+        with statement_timeout('data', model):
+            if paginator.is_requested(request):
+                data = paginator.paginate_queryset(data, request, ordering=ordering, key=key, resample=resample)
+            else: #whole table export, planner estimate decides if it is allowed
+                check_cost('data', data, resample)
+                data = list(data)
+        if resample is not None:
+            data = model.format_resampled_data(data)
+        if paginator.is_requested(request):
+            return paginator.get_paginated_response(data)
         return Response(data)
 
     @staticmethod
     def get_model_from_table(table_name):
-        for model in apps.get_models():
-            if model._meta.db_table == table_name:
-                return model
-        raise ValueError('No model found with db_table {}!'.format(table_name))
+        try:
+            return station_models[table_name]
+        except KeyError:
+            raise ValueError('No model found with db_table {}!'.format(table_name))
+
+    @staticmethod
+    def get_field_model(table_name, field): #derived parameters (discharge from rating curve) are stored in separate table of station
+        model = StationMetadataViewSet.get_model_from_table(table_name)
+        derived = derived_models.get(table_name)
+        if not model.has_field(field) and derived is not None and derived.has_field(field) \
+                and hydro_models.DerivedSeries.is_available(table_name, field, hydro_models.DataVersion.get_version(table_name)): #stale table is hidden like missing one
+            return derived
+        return model
 
 @api_view(['GET'])
+@throttle_classes([HeavyRouteThrottle])
+@analytical
 def yearly_chart_data(request, station_id, field, year):
-    model = StationMetadataViewSet.get_model_from_table(station_id)
-    year = int(year)
-    start_date = date(year, 1, 1)
-    end_date = date(year, 12, 31)
+    model = StationMetadataViewSet.get_field_model(station_id, field)
+    start_date, end_date = year_bounds(int(year)) #first and last hour, year starts in HYDRO_YEAR_START_MONTH
     data = model.get_field_data(field, start_date, end_date)
-    return Response(data)
+    paginator = DateTimeKeysetPagination()
+    with statement_timeout('yearly-data', model) as using:
+        version = hydro_models.DataVersion.get_version(station_id, using) #same snapshot as data
+        if paginator.is_requested(request):
+            return versioned(paginator.get_paginated_response(paginator.paginate_queryset(data, request)), version)
+        series = get_series(model, field, version) if model.has_field(field) else None
+        data = series.slice(start_date, end_date) if series is not None else list(data)
+    return versioned(Response(data), version)
 
 @api_view(['GET'])
+@throttle_classes([HeavyRouteThrottle])
+@analytical
 def get_percentiles(request, station_id, field):
-    model = StationMetadataViewSet.get_model_from_table(station_id)
+    model = StationMetadataViewSet.get_field_model(station_id, field)
     if field not in [f.name for f in model._meta.fields]:  #mitigating SQL injection risks because custom expression with actual SQL is used
         raise ValidationError('error: Invalid field')
     is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
 
-    data = model.calculate_percentiles(field)
+    quantiles = parse_quantiles_param(request)
+    start_year = parse_year_param(request, 'start_year')
+    end_year = parse_year_param(request, 'end_year')
 
-    results = list(data)
+    with statement_timeout('percentiles', model) as using:
+        version = hydro_models.DataVersion.get_version(station_id, using) #same snapshot as data
+        if quantiles is not None or start_year is not None or end_year is not None: #merged monthly sketches, approximate but without sorting raw values
+            results = monthly_percentiles(station_id, field, model, version, quantiles or PERCENTILES, start_year, end_year)
+        else:
+            results = hydro_models.MonthlyPercentile.get_percentiles(station_id, field, version) #precomputed by manage.py compute_percentiles
+        if results is None:
+            series = get_series(model, field, version)
+            results = series.monthly_percentiles(PERCENTILES) if series is not None else list(model.calculate_percentiles(field))
+    results = sort_months(results) #months in order of year starting in HYDRO_YEAR_START_MONTH
     if is_ajax:  #if request is ajax it means data will used to render chart, therefore reformatting is needed
         results = prepare_data_for_chart(results)
 
-    return Response(results)
+    return versioned(Response(results), version)
 
 @api_view(['GET'])
+@throttle_classes([HeavyRouteThrottle])
+@analytical
 def dataseries(request, station_id, field):
-    model = StationMetadataViewSet.get_model_from_table(station_id)
+    model = StationMetadataViewSet.get_field_model(station_id, field)
     is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
-    start_date = escape(request.GET.get('start')) #date from date picker, using django utils to escape (used in custom query)
-    end_date = escape(request.GET.get('end') )
+    start_date = parse_date_param(request, 'start') #date from date picker, validated before it is used in query
+    end_date = parse_date_param(request, 'end')
+    resample = parse_resample_param(request, allow_auto=True)
+    max_points = parse_max_points_param(request)
+    rolling = parse_rolling_param(request)
+    paginator = DateTimeKeysetPagination()
+    if rolling is not None and (resample is not None or paginator.is_requested(request)):
+        raise ValidationError('error: Parameter rolling can not be combined with resample or pagination')
+    if not model.has_field(field):
+        raise ValidationError('error: Invalid field')
 
-    first_non_null_date, last_non_null_date = model.get_date_range(field)
+    with statement_timeout('dataseries', model) as using:
+        version = hydro_models.DataVersion.get_version(station_id, using) #same snapshot as data
+        series = get_series(model, field, version) if resample in (None, RESAMPLE_AUTO) and rolling is None and not paginator.is_requested(request) else None #raw ranges are sliced from in-process cache when enabled
+        if series is not None:
+            first_non_null_date, last_non_null_date = series.date_range()
+        else:
+            first_non_null_date, last_non_null_date = model.get_date_range(field)
 
-    if (is_ajax) and (start_date != '' and end_date != ''): #request is ajax and date range is specified
-        data = model.get_field_data(field, start_date, end_date)
-    else:
-        data = model.get_field_data(field, first_non_null_date, last_non_null_date)
+        if not ((is_ajax) and (start_date is not None and end_date is not None)): #date range is specified only by ajax requests
+            start_date, end_date = first_non_null_date, last_non_null_date
+        is_auto = resample == RESAMPLE_AUTO
+        if is_auto: #overview of long range is coarse, zoomed window gets finer resolution
+            resample = choose_resample(start_date, end_date, max_points)
+
+        if paginator.is_requested(request): #pages are bounded by limit, no need to estimate size
+            data = model.get_field_data(field, start_date, end_date, resample)
+            data = paginator.paginate_queryset(data, request, ordering='date_time' if resample is None else 'date', resample=resample)
+        elif rolling is not None:
+            check_range('dataseries', start_date, end_date)
+            data = model.get_rolling_field_data(field, start_date, end_date, *rolling)
+        else:
+            estimated_rows = check_range('dataseries', start_date, end_date, resample)
+            if series is not None and resample is None:
+                data = series.slice(start_date, end_date)
+            else:
+                data = model.get_field_data(field, start_date, end_date, resample)
+                if is_unusual('dataseries', estimated_rows):
+                    check_cost('dataseries', data, resample)
+                data = list(data)
 
     min_date = first_non_null_date.strftime('%d-%m-%Y') #format used by date picker in JS
     max_date = last_non_null_date.strftime('%d-%m-%Y')
 
-    response_data = {
+    meta = {
         "min_date": min_date,
         "max_date": max_date,
-        "data": data
+        "resample": resample, #resolution of data, null for hourly values
+    }
+    if is_auto:
+        meta["max_points"] = max_points #granted budget, requested one may be capped by API_MAX_POINTS
+    if paginator.is_requested(request): #rows under results like on other paginated routes
+        return versioned(paginator.get_paginated_response(data, **meta), version)
+
+    return versioned(Response({**meta, "data": data}), version)
+
+@api_view(['GET'])
+@throttle_classes([HeavyRouteThrottle])
+@analytical
+def overlay(request, station_id, field): #all or selected years of field aligned on day of year, one matrix row per year
+    model = StationMetadataViewSet.get_field_model(station_id, field)
+    if not model.has_field(field):
+        raise ValidationError('error: Invalid field')
+    resample = parse_resample_param(request)
+    if resample not in (None, '1D'):
+        raise ValidationError('error: Overlay supports only hourly values or resample=1D')
+    years = parse_years_param(request)
+
+    with statement_timeout('overlay', model) as using:
+        version = hydro_models.DataVersion.get_version(station_id, using) #same snapshot as data
+        series = get_series(model, field, version) if resample is None else None
+        if years is None:
+            first_non_null_date, last_non_null_date = series.date_range() if series is not None else model.get_date_range(field)
+            years = list(range(hydro_year(first_non_null_date.year, first_non_null_date.month), hydro_year(last_non_null_date.year, last_non_null_date.month) + 1)) if first_non_null_date is not None else []
+        check_range('overlay', *year_bounds(LEAP_YEAR), resample, series=len(years))
+        if not years:
+            dates, values = [], []
+        elif series is not None:
+            dates, values = series.hours.astype('datetime64[h]'), series.values
+        else: #single scan of selected years, daily values aggregated in SQL by parameter policy
+            rows = list(model.get_field_data(field, year_bounds(years[0])[0], year_bounds(years[-1])[1], resample).filter(years_filter(years)))
+            dates, values = [row['date'] for row in rows], [row['value'] for row in rows]
+
+    response_data = {
+        "field": field,
+        "resample": resample,
+        "years": years,
+        "values": overlay_matrix(dates, values, years, daily=resample is not None) #column is hour (day) of leap year starting in HYDRO_YEAR_START_MONTH
+    }
+
+    return versioned(Response(response_data), version)
+
+@api_view(['GET'])
+@throttle_classes([CrossStationThrottle])
+@analytical
+def cross_station_dataseries(request, field): #same parameter for all stations measuring it, aligned on common timestamps
+    if not hydro_models.ValuesMetadata.objects.filter(django_field_name=field).exists():
+        raise NotFound('error: Unknown parameter')
+    start_date = parse_date_param(request, 'start')
+    end_date = parse_date_param(request, 'end')
+    if start_date is None or end_date is None:
+        raise ValidationError('error: Parameters start and end are required')
+    resample = parse_resample_param(request)
+
+    stations = []
+    for st_name in hydro_models.StationMetadata.objects.values_list('st_name', flat=True):
+        try:
+            model = StationMetadataViewSet.get_model_from_table(st_name)
+        except ValueError: #station metadata without data table
+            continue
+        if model.has_field(field):
+            stations.append((st_name, model))
+    check_range('cross-station', start_date, end_date, resample, series=len(stations))
+
+    def fetch(station): #runs in worker thread, every thread opens its own connections
+        st_name, model = station
+        try:
+            with statement_timeout('cross-station', model):
+                return st_name, list(model.get_field_data(field, start_date, end_date, resample))
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=settings.CROSS_STATION_WORKERS) as executor:
+        series = list(executor.map(lambda station: copy_context().run(fetch, station), stations)) #context carries replica routing into threads
+
+    dates = sorted({row['date'] for _, rows in series for row in rows})
+    index = {d: i for i, d in enumerate(dates)}
+    columns = {}
+    for st_name, rows in series: #columnar response, None where station has no row for the timestamp
+        column = [None] * len(dates)
+        for row in rows:
+            column[index[row['date']]] = row['value']
+        columns[st_name] = column
+
+    response_data = {
+        "field": field,
+        "dates": dates,
+        "stations": columns
     }
 
     return Response(response_data)
 
+@api_view(['POST'])
+@permission_classes([HasIngestToken])
+def ingest(request): #loggers push hourly records, accepted records are spooled and written in batches
+    records = request.data.get('records') if isinstance(request.data, dict) else None
+    if not isinstance(records, list) or not records:
+        raise ValidationError('error: Body has to contain non empty list records')
+    if len(records) > settings.INGEST_MAX_RECORDS:
+        raise ValidationError(f'error: At most {settings.INGEST_MAX_RECORDS} records per request')
+    serializer = IngestRecordSerializer(data=records, many=True)
+    serializer.is_valid(raise_exception=True)
+    ingest_buffer.add(serializer.validated_data)
+    return Response({'accepted': len(records)}, status=status.HTTP_202_ACCEPTED)
+
 def site(request):
-    return render(request, 'site_template.html')
\ No newline at end of file
+    return render(request, 'site_template.html', {'year_start_month': settings.HYDRO_YEAR_START_MONTH}) #front end places months of yearly chart by it
\ No newline at end of file
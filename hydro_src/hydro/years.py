@@ -0,0 +1,38 @@
+from calendar import monthrange
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+
+def get_start_month(): #1 means calendar year, 11 hydrological year November - October
+    return settings.HYDRO_YEAR_START_MONTH
+
+def get_month_shift(): #months added to date so that its calendar year is the hydrological year
+    return (13 - get_start_month()) % 12
+
+def hydro_year(year, month): #years are named by calendar year they end in
+    return year + 1 if get_start_month() > 1 and month >= get_start_month() else year
+
+def year_bounds(year): #first and last hour of year
+    start_month = get_start_month()
+    first = datetime(year - 1, start_month, 1) if start_month > 1 else datetime(year, 1, 1)
+    next_first = datetime(year, start_month, 1) if start_month > 1 else datetime(year + 1, 1, 1)
+    return first, next_first - timedelta(hours=1)
+
+def month_order(): #months in order of year, e.g. 11, 12, 1, ..., 10
+    return [(get_start_month() - 1 + i) % 12 + 1 for i in range(12)]
+
+def sort_months(rows): #percentile rows keyed by string_date_without_year
+    order = {month: i for i, month in enumerate(month_order())}
+    return sorted(rows, key=lambda row: order[int(row['string_date_without_year'][:2])])
+
+def last_day(month): #of common year, chart end is the same every year
+    return monthrange(2001, month)[1]
+
+def months_filter(start_year=None, end_year=None): #Q over calendar year and month columns matching years
+    start_month = get_start_month()
+    q = Q()
+    if start_year is not None:
+        q &= Q(year__gte=start_year) | Q(year=start_year - 1, month__gte=start_month) if start_month > 1 else Q(year__gte=start_year)
+    if end_year is not None:
+        q &= Q(year__lt=end_year) | Q(year=end_year, month__lt=start_month) if start_month > 1 else Q(year__lte=end_year)
+    return q
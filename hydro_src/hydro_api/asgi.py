@@ -4,4 +4,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hydro_api.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from hydro.live import live_app #needs configured django
+
+async def application(scope, receive, send): #live data streams are served directly, everything else by django
+    if scope['type'] == 'http' and scope['path'].startswith('/live/'):
+        return await live_app(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.gis',
     'hydro',
+    'hydro.stations.apps.StationsConfig',
     'leaflet',
     'rest_framework',
     'rest_framework_gis',
@@ -34,13 +35,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'hydro.api_access.ApiSessionMiddleware', #session is not saved for /api/ requests
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'lockdown.middleware.LockdownMiddleware',
+    'hydro.api_access.ApiLockdownMiddleware', #/api/ requests are allowed by signed token instead of session
+    'hydro.middleware.ApiCacheMiddleware', #after lockdown so cached responses are not served to locked out clients
 ]
 
 ROOT_URLCONF = 'hydro_api.urls'
@@ -70,10 +72,23 @@ DATABASES = {
         'USER': env('POSTGRES_USER'),
         'PASSWORD': env('POSTGRES_PASS'),
         'HOST': env('PG_HOST'), #host.docker.internal x localhost (windows x linux)
-        'PORT': env('PG_PORT'),
-    }
+        'PORT': env('PG_PORT'), #no statement_timeout here, ingest and management commands run unlimited, API queries are limited by API_LIMITS
+    },
+    'replica': { #analytical and long range queries, falls back to primary when no replica is configured
+        'ENGINE': 'django.contrib.gis.db.backends.postgis',
+        'NAME': env('POSTGRES_DB'),
+        'USER': env('POSTGRES_USER'),
+        'PASSWORD': env('POSTGRES_PASS'),
+        'HOST': env('PG_REPLICA_HOST', default=env('PG_HOST')),
+        'PORT': env('PG_REPLICA_PORT', default=env('PG_PORT')),
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+DATABASE_ROUTERS = ['hydro.routers.AnalyticsRouter']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,10 +106,71 @@ AUTH_PASSWORD_VALIDATORS = [
 
 LOCKDOWN_PASSWORDS = env('LOCKDOWN_PASS')
 LOCKDOWN_ENABLED = env.bool('LOCKDOWN')
+LOCKDOWN_URL_EXCEPTIONS = (r'^/api/ingest/',) #loggers authenticate by INGEST_TOKENS
 SESSION_COOKIE_AGE = 3600
 SESSION_SAVE_EVERY_REQUEST = True
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+STATION_SCHEMA_FILE = BASE_DIR / 'station_schema.json' #generated by manage.py refresh_station_schema
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='filecache:///tmp/hydro_api_cache'), #shared between workers and management commands
+}
+API_CACHE_TIMEOUT = env.int('API_CACHE_TIMEOUT', default=3600)
+API_COMPRESSION_MIN_SIZE = env.int('API_COMPRESSION_MIN_SIZE', default=1024) #smaller responses are sent uncompressed
+API_GZIP_LEVEL = env.int('API_GZIP_LEVEL', default=6)
+API_BROTLI_QUALITY = env.int('API_BROTLI_QUALITY', default=5)
+
+REST_FRAMEWORK = {
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=5000), #default limit of keyset paginated series
+    'DEFAULT_AUTHENTICATION_CLASSES': [], #read only api, session authentication would load session on every request
+    'DEFAULT_RENDERER_CLASSES': ['hydro.renderers.JSONRenderer', 'rest_framework.renderers.BrowsableAPIRenderer'], #cached series rows are passed through as serialized JSON
+}
+API_MAX_PAGE_SIZE = env.int('API_MAX_PAGE_SIZE', default=50000)
+API_DEFAULT_POINTS = env.int('API_DEFAULT_POINTS', default=2000) #point budget of resample=auto when max_points is not sent
+API_MAX_POINTS = env.int('API_MAX_POINTS', default=10000)
+WARM_CACHE_MAX_POINTS = env.list('WARM_CACHE_MAX_POINTS', cast=int, default=[1500, 2000, 2500, 3000]) #budgets front end sends for common chart widths (seriesMaxPoints in scripts.js), warmed by manage.py warm_cache
+
+QC_MIN_NULL_HOURS = env.int('QC_MIN_NULL_HOURS', default=24) #shorter runs of missing values are not reported
+QC_MIN_FLAT_HOURS = env.int('QC_MIN_FLAT_HOURS', default=24)
+
+API_LIMITS = { #per endpoint guards, max_rows/max_range_days checked from range length, explain_rows triggers EXPLAIN with max_cost, statement_timeout in ms
+    'dataseries': {'max_rows': 200000, 'explain_rows': 100000, 'max_cost': 5000000, 'statement_timeout': 30000},
+    'data': {'max_rows': 500000, 'max_cost': 10000000, 'statement_timeout': 60000},
+    'yearly-data': {'statement_timeout': 10000},
+    'percentiles': {'statement_timeout': 60000},
+    'overlay': {'max_rows': 300000, 'statement_timeout': 30000},
+    'cross-station': {'max_rows': 500000, 'max_range_days': 3660, 'statement_timeout': 30000},
+}
+
+CROSS_STATION_WORKERS = env.int('CROSS_STATION_WORKERS', default=4) #thread pool size for cross station queries
+
+API_THROTTLE_RATES = { #token bucket per client, (tokens per second, burst size)
+    'heavy': (env.float('API_THROTTLE_RATE', default=2.0), env.int('API_THROTTLE_BURST', default=60)),
+    'cross-station': (env.float('API_CROSS_STATION_THROTTLE_RATE', default=0.2), env.int('API_CROSS_STATION_THROTTLE_BURST', default=5)),
+}
+API_COALESCE_TIMEOUT = env.int('API_COALESCE_TIMEOUT', default=60) #seconds concurrent identical requests wait for the first one, should cover statement_timeout
+API_COALESCE_POLL = env.float('API_COALESCE_POLL', default=0.1)
+
+SERIES_CACHE_BYTES = env.int('SERIES_CACHE_BYTES', default=0) #per worker budget of in-process numpy series cache, 0 disables it
+SERIES_CACHE_TIMEOUT = env.int('SERIES_CACHE_TIMEOUT', default=3600) #seconds after which series is reloaded from database
+COLUMNAR_CACHE_DIR = env.str('COLUMNAR_CACHE_DIR', default='') #memory mapped station exports shared by all workers, written by manage.py export_columnar, empty disables
+
+LIVE_KEEPALIVE = env.int('LIVE_KEEPALIVE', default=15) #seconds between keepalive comments of idle /live/ streams
+LIVE_RETRY = env.int('LIVE_RETRY', default=5000) #ms browser waits before reconnecting dropped stream
+LIVE_MAX_ROWS = env.int('LIVE_MAX_ROWS', default=1000) #larger ingests send reload event instead of rows
+
+INGEST_TOKENS = env.list('INGEST_TOKENS', default=[]) #tokens of field loggers, empty list disables ingest endpoint
+INGEST_SPOOL_DIR = env.str('INGEST_SPOOL_DIR', default='/tmp/hydro_ingest_spool') #accepted records not yet written, replayed after restart
+INGEST_BATCH_SIZE = env.int('INGEST_BATCH_SIZE', default=500) #buffered rows which trigger immediate write
+INGEST_FLUSH_INTERVAL = env.float('INGEST_FLUSH_INTERVAL', default=10.0) #seconds smaller batches wait for more records
+INGEST_PAGE_SIZE = env.int('INGEST_PAGE_SIZE', default=1000) #rows per multi-row INSERT statement
+INGEST_MAX_RECORDS = env.int('INGEST_MAX_RECORDS', default=10000)
+
+PERCENTILE_SKETCH_COMPRESSION = env.int('PERCENTILE_SKETCH_COMPRESSION', default=200) #higher keeps more centroids per month and gives more accurate quantiles
+
+HYDRO_YEAR_START_MONTH = env.int('HYDRO_YEAR_START_MONTH', default=1) #first month of years in years, yearly-data, percentiles and resample=1Y, 1 calendar year, 11 hydrological year November - October (part of API cache keys)
+
 
 LANGUAGE_CODE = 'en-us'
 
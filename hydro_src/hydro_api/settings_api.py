@@ -0,0 +1,44 @@
+from .settings import * #API-only profile: DJANGO_SETTINGS_MODULE=hydro_api.settings_api
+
+#workers started with this profile serve only /api/, no admin, site template or sessions
+#lockdown is checked by signed hydro_api_token cookie issued by site workers, clients without it get lockdown form
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.gis',
+    'hydro',
+    'hydro.stations.apps.StationsConfig',
+    'rest_framework',
+    'lockdown', #template of lockdown form
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'hydro.api_access.ApiLockdownMiddleware', #token only, there is no session to fall back to
+    'hydro.middleware.ApiCacheMiddleware',
+]
+
+ROOT_URLCONF = 'hydro_api.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['hydro.renderers.JSONRenderer'], #browsable API pulls in templates and forms
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -112,6 +112,102 @@ document.addEventListener("DOMContentLoaded", function() {
         }
     }
 
+    const CLIENT_CACHE_MAX_ENTRIES = 300; //responses kept in IndexedDB, oldest are removed
+    const VERSION_CHECK_INTERVAL = 5 * 60 * 1000; //ms for which known data version of station is trusted
+    const clientCache = openClientCache();
+    const dataVersions = {}; //station -> {checkedAt, version promise}
+
+    function openClientCache() { //resolves to null when IndexedDB is not available (e.g. private mode), data is then always downloaded
+        return new Promise(resolve => {
+            if (!window.indexedDB) {
+                resolve(null);
+                return;
+            }
+            const request = indexedDB.open('hydro-api-cache', 1);
+            request.onupgradeneeded = () => {
+                const store = request.result.createObjectStore('responses', {keyPath: 'url'});
+                store.createIndex('storedAt', 'storedAt');
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(null);
+        });
+    }
+
+    function readCachedResponse(db, url) {
+        return new Promise(resolve => {
+            if (!db) {
+                resolve(undefined);
+                return;
+            }
+            const request = db.transaction('responses', 'readonly').objectStore('responses').get(url);
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(undefined);
+        });
+    }
+
+    function storeCachedResponse(db, record) { //also removes oldest records over the limit
+        if (!db) return;
+        const store = db.transaction('responses', 'readwrite').objectStore('responses');
+        store.put(Object.assign(record, {storedAt: Date.now()}));
+        const countRequest = store.count();
+        countRequest.onsuccess = () => {
+            let excess = countRequest.result - CLIENT_CACHE_MAX_ENTRIES;
+            if (excess <= 0) return;
+            store.index('storedAt').openCursor().onsuccess = event => {
+                const cursor = event.target.result;
+                if (cursor && excess > 0) {
+                    cursor.delete();
+                    excess--;
+                    cursor.continue();
+                }
+            };
+        };
+    }
+
+    function fetchDataVersion(stationId) { //null when version is unknown, stored responses are then revalidated
+        const known = dataVersions[stationId];
+        if (!known || Date.now() - known.checkedAt > VERSION_CHECK_INTERVAL) {
+            dataVersions[stationId] = {
+                checkedAt: Date.now(),
+                version: fetch(`/api/stations/${stationId}/version/`)
+                    .then(response => response.json())
+                    .then(data => String(data.version))
+                    .catch(() => null)
+            };
+        }
+        return dataVersions[stationId].version;
+    }
+
+    function cachedFetch(stationId, url, options = {}) { //station data stored in IndexedDB, used without request while data version matches, otherwise revalidated by etag
+        const key = `${YEAR_START_MONTH}|${url}`; //payloads depend on year boundaries, not only on data version
+        return Promise.all([clientCache, fetchDataVersion(stationId)])
+            .then(([db, version]) => readCachedResponse(db, key)
+                .then(record => {
+                    if (record && version !== null && record.version === version) {
+                        return record.body;
+                    }
+                    const headers = Object.assign({}, options.headers);
+                    if (record && record.etag) {
+                        headers['If-None-Match'] = record.etag;
+                    }
+                    return fetch(url, Object.assign({}, options, {headers: headers}))
+                        .then(response => {
+                            const responseVersion = response.headers.get('X-Data-Version');
+                            if (response.status === 304 && record) { //unchanged payload, only version is updated
+                                storeCachedResponse(db, Object.assign(record, {version: responseVersion}));
+                                return record.body;
+                            }
+                            if (!response.ok) {
+                                return response.json();
+                            }
+                            return response.json().then(body => {
+                                storeCachedResponse(db, {url: key, version: responseVersion, etag: response.headers.get('ETag'), body: body});
+                                return body;
+                            });
+                        });
+                }));
+    }
+
     function fetchStations() { //populating station dropdown
         fetch('/api/stations/')
             .then(response => response.json())
@@ -146,6 +242,8 @@ document.addEventListener("DOMContentLoaded", function() {
             .catch(error => console.error('Error fetching values:', error));
     }
 
+    const YEAR_START_MONTH = Number(document.body.dataset.yearStartMonth) || 1; //HYDRO_YEAR_START_MONTH, 1 calendar year, 11 hydrological year November - October
+
     function fetchYears() { //populating year dropdown
         const stationId = stationDropdown.value;
         fetch(`/api/stations/${stationId}/years/`)
@@ -174,200 +272,364 @@ document.addEventListener("DOMContentLoaded", function() {
         // check if dropdowns have valid selections
         if (!stationId || !valueField || !year) return;
 
-        fetch(`/api/stations/${stationId}/${valueField}/${year}/yearly-data/`)
-            .then(response => response.json())
-            .then(data => {
-                const hourlyDates = data.map(item => item.date);
-                const hourlyValues = data.map(item => item.value);
-
-                fetch(`/api/stations/${stationId}/${valueField}/percentiles/`, {
-                    headers: {
-                        'X-Requested-With': 'XMLHttpRequest' //custom header
-                    }
-                })
-                    .then(response => response.json())
-                    .then(percentiles => {
-                        const currentYear = new Date(hourlyDates[0]).getFullYear();
-                        const percDate = percentiles.map(d => `${currentYear}-${d.string_date_without_year}`);
-                        const q10 = percentiles.map(d => d.q10);
-                        const q20 = percentiles.map(d => d.q20);
-                        const q30 = percentiles.map(d => d.q30);
-                        const q40 = percentiles.map(d => d.q40);
-                        const q50 = percentiles.map(d => d.q50);
-                        const q60 = percentiles.map(d => d.q60);
-                        const q70 = percentiles.map(d => d.q70);
-                        const q80 = percentiles.map(d => d.q80);
-                        const q90 = percentiles.map(d => d.q90);
-                        const conTrace = {
-                            x: percDate,
-                            y:q50,
-                            fill: 'None',
-                            mode: 'lines',
-                            line: {color: 'transparent'},
-                            showlegend: false,
-                            name: 'controll line',
-                            hoverinfo: 'none',
-                            connectgaps: true,
-                        }
-                        const conTrace2 = {
-                            x: percDate,
-                            y:q30,
-                            fill: 'None',
-                            mode: 'lines',
-                            line: {color: 'transparent'},
-                            showlegend: false,
-                            name: 'controll line',
-                            hoverinfo: 'none',
-                            connectgaps: true,
-                            legendgroup: 'Q30 to Q70'
-                        }
-                        const q10Trace = {
-                            x: percDate,
-                            y: q10,
-                            line: {color: 'transparent'},
-                            mode: "lines",
-                            fill: 'tonexty',
-                            fillcolor: 'rgba(0,100,80,0.2)', 
-                            name: 'Q10',
-                            type: 'scatter',
-                            hoverinfo: 'y',
-                            legendgroup: 'Q10 to Q90'
-                        }
-                        const q30Trace = {
-                            x: percDate,
-                            y: q30,
-                            line: {color: 'transparent'},
-                            mode: "lines",
-                            fill: 'tonexty',
-                            fillcolor: 'rgba(0,176,246,0.2)', 
-                            name: 'Q30',
-                            type: 'scatter',
-                            hoverinfo: 'y',
-                            legendgroup: 'Q30 to Q70'
-                        }
-                        const q70Trace = {
-                            x: percDate,
-                            y: q70,
-                            line: {color: 'transparent'},
-                            mode: "lines",
-                            fill: 'tonexty',
-                            fillcolor: 'rgba(0,176,246,0.2)', 
-                            name: 'Q70',
-                            type: 'scatter',
-                            hoverinfo: 'y',
-                            legendgroup: 'Q30 to Q70'
-                        }
-                        const q90Trace = {
-                            x: percDate,
-                            y: q90,
-                            fill: 'tonexty',
-                            fillcolor: 'rgba(0,100,80,0.2)', 
-                            line: {color: 'transparent'},
-                            mode: "lines",
-                            name: 'Q90',
-                            type: 'scatter',
-                            hoverinfo: 'y',
-                            legendgroup: 'Q10 to Q90'
-                        }
-                        const hourlyTrace = {
-                            x: hourlyDates,
-                            y: hourlyValues,
-                            mode: 'lines',
-                            name: 'Hourly Values',
-                            line: {color: '#005f85'},
-                            type: 'scatter',
-                        };
-
-                        const median = {
-                            x: percDate,
-                            y: q50,
-                            mode: 'lines',
-                            name: 'Median',
-                            line: {color: '#f00069'},
-                            hoverinfo: 'y',
-                            connectgaps: true
-                        };
-
-                        const conTraceMed = {
-                            x: percDate,
-                            y:q50,
-                            fill: 'None',
-                            mode: 'lines',
-                            line: {color: 'transparent'},
-                            showlegend: false,
-                            name: 'controll line',
-                            hoverinfo: 'none',
-                            connectgaps: true,
-                        }
-                        //control traces are needed due to plotly filling lines to next available line, this is why they are also uncluded in groups
-                        const allTraces = [conTraceMed, conTrace2, q10Trace, conTrace, q30Trace, conTrace, median, q70Trace, q90Trace, hourlyTrace];
-                        const layout = {
-                            title: `Hourly data and monthly percentiles (all measured years)`,
-                            xaxis: {
-                                title: `date (${year})`,
-                                type: 'date',
-                                range: [`${currentYear}-01-01`, `${currentYear}-12-31`],
-                            },
-                            yaxis: {
-                                title: `${parLabel} [${parUnit}]`
-                            }
-                        };
-                        Plotly.newPlot(yearlyChart, allTraces, layout);
-                })
-            }
-        )
-        .catch(error => console.error('Error fetching chart data:', error));
-    }
-
-    function fetchDataAndRenderSeriesChart() { //also updates date picker with value range
-        const stationId = stationDropdown.value;
-        const valueField = valueDropdown.value;
-        const startDate = rangePicker.selectedDates[0];
-        const endDate = rangePicker.selectedDates[1];
-        const parLabel = valueDropdown.options[valueDropdown.selectedIndex].textContent;
-        const parUnit = valueDropdown.options[valueDropdown.selectedIndex].getAttribute('unit');
-
-        const formattedStartDate = formatDateForBackend(startDate);
-        const formattedEndDate = formatDateForBackend(endDate);
-
-        if (!stationId || !valueField) return;
-        fetch(`/api/stations/${stationId}/${valueField}/dataseries/?start=${formattedStartDate}&end=${formattedEndDate}`, {
-            headers: {
-                'X-Requested-With': 'XMLHttpRequest'
-            }
-        })
-            .then(response => response.json())
-            .then(responseData => {
-                const minDate = responseData.min_date;
-                const maxDate = responseData.max_date;
-                const data = responseData.data;
+        Promise.all([ //independent requests run concurrently
+            cachedFetch(stationId, `/api/stations/${stationId}/${valueField}/${year}/yearly-data/`),
+            cachedFetch(stationId, `/api/stations/${stationId}/${valueField}/percentiles/`, {
+                headers: {
+                    'X-Requested-With': 'XMLHttpRequest' //custom header
+                }
+            })
+        ])
+            .then(([data, percentiles]) => {
                 const hourlyDates = data.map(item => item.date);
                 const hourlyValues = data.map(item => item.value);
 
+                const currentYear = Number(year); //years end in calendar year they are named by
+                const startYear = YEAR_START_MONTH > 1 ? currentYear - 1 : currentYear;
+                const endMonth = YEAR_START_MONTH > 1 ? YEAR_START_MONTH - 1 : 12;
+                const percDate = percentiles.map(d => { //months from start month on belong to previous calendar year
+                    const month = Number(d.string_date_without_year.slice(0, 2));
+                    return `${month >= YEAR_START_MONTH ? startYear : currentYear}-${d.string_date_without_year}`;
+                });
+                const q10 = percentiles.map(d => d.q10);
+                const q20 = percentiles.map(d => d.q20);
+                const q30 = percentiles.map(d => d.q30);
+                const q40 = percentiles.map(d => d.q40);
+                const q50 = percentiles.map(d => d.q50);
+                const q60 = percentiles.map(d => d.q60);
+                const q70 = percentiles.map(d => d.q70);
+                const q80 = percentiles.map(d => d.q80);
+                const q90 = percentiles.map(d => d.q90);
+                const conTrace = {
+                    x: percDate,
+                    y:q50,
+                    fill: 'None',
+                    mode: 'lines',
+                    line: {color: 'transparent'},
+                    showlegend: false,
+                    name: 'controll line',
+                    hoverinfo: 'none',
+                    connectgaps: true,
+                }
+                const conTrace2 = {
+                    x: percDate,
+                    y:q30,
+                    fill: 'None',
+                    mode: 'lines',
+                    line: {color: 'transparent'},
+                    showlegend: false,
+                    name: 'controll line',
+                    hoverinfo: 'none',
+                    connectgaps: true,
+                    legendgroup: 'Q30 to Q70'
+                }
+                const q10Trace = {
+                    x: percDate,
+                    y: q10,
+                    line: {color: 'transparent'},
+                    mode: "lines",
+                    fill: 'tonexty',
+                    fillcolor: 'rgba(0,100,80,0.2)', 
+                    name: 'Q10',
+                    type: 'scatter',
+                    hoverinfo: 'y',
+                    legendgroup: 'Q10 to Q90'
+                }
+                const q30Trace = {
+                    x: percDate,
+                    y: q30,
+                    line: {color: 'transparent'},
+                    mode: "lines",
+                    fill: 'tonexty',
+                    fillcolor: 'rgba(0,176,246,0.2)', 
+                    name: 'Q30',
+                    type: 'scatter',
+                    hoverinfo: 'y',
+                    legendgroup: 'Q30 to Q70'
+                }
+                const q70Trace = {
+                    x: percDate,
+                    y: q70,
+                    line: {color: 'transparent'},
+                    mode: "lines",
+                    fill: 'tonexty',
+                    fillcolor: 'rgba(0,176,246,0.2)', 
+                    name: 'Q70',
+                    type: 'scatter',
+                    hoverinfo: 'y',
+                    legendgroup: 'Q30 to Q70'
+                }
+                const q90Trace = {
+                    x: percDate,
+                    y: q90,
+                    fill: 'tonexty',
+                    fillcolor: 'rgba(0,100,80,0.2)', 
+                    line: {color: 'transparent'},
+                    mode: "lines",
+                    name: 'Q90',
+                    type: 'scatter',
+                    hoverinfo: 'y',
+                    legendgroup: 'Q10 to Q90'
+                }
                 const hourlyTrace = {
                     x: hourlyDates,
                     y: hourlyValues,
                     mode: 'lines',
                     name: 'Hourly Values',
                     line: {color: '#005f85'},
-                    type: 'scatter',
-                    connectgaps: false
+                    type: traceType(hourlyValues.length),
+                };
+
+                const median = {
+                    x: percDate,
+                    y: q50,
+                    mode: 'lines',
+                    name: 'Median',
+                    line: {color: '#f00069'},
+                    hoverinfo: 'y',
+                    connectgaps: true
                 };
 
+                const conTraceMed = {
+                    x: percDate,
+                    y:q50,
+                    fill: 'None',
+                    mode: 'lines',
+                    line: {color: 'transparent'},
+                    showlegend: false,
+                    name: 'controll line',
+                    hoverinfo: 'none',
+                    connectgaps: true,
+                }
+                //control traces are needed due to plotly filling lines to next available line, this is why they are also uncluded in groups
+                const allTraces = [conTraceMed, conTrace2, q10Trace, conTrace, q30Trace, conTrace, median, q70Trace, q90Trace, hourlyTrace];
                 const layout = {
-                    title: `Time series`,
+                    title: `Hourly data and monthly percentiles (all measured years)`,
                     xaxis: {
-                        title: `date`,
+                        title: `date (${year})`,
                         type: 'date',
+                        range: [`${startYear}-${String(YEAR_START_MONTH).padStart(2, '0')}-01`, `${currentYear}-${String(endMonth).padStart(2, '0')}-${new Date(currentYear, endMonth, 0).getDate()}`],
                     },
                     yaxis: {
                         title: `${parLabel} [${parUnit}]`
                     }
                 };
-                Plotly.newPlot(seriesChart, [hourlyTrace], layout);
-                updateDatePicker(rangePicker, minDate, maxDate);
+                Plotly.newPlot(yearlyChart, allTraces, layout);
+            })
+            .catch(error => console.error('Error fetching chart data:', error));
+    }
+
+    const POINTS_PER_PIXEL = 2; //line keeps min and max look of data when there are about two points per pixel
+    const POINTS_STEP = 250; //budget is rounded so similar chart widths share cached responses
+    const WEBGL_THRESHOLD = 5000; //longer traces are rendered by WebGL, SVG gets slow with tens of thousands of points
+    const SERIES_RELAYOUT_DELAY = 300; //ms without zooming before finer data of visible window is requested
+    const RESAMPLE_LABELS = {'1D': 'Daily Values', '1W': 'Weekly Values', '1M': 'Monthly Values', '1Y': 'Yearly Values'};
+    let seriesOverview = null; //coarse data of whole selected range, restored when zoom is reset
+    let seriesController = null; //cancels request which is no longer needed
+    let seriesRelayoutTimer = null;
+    let seriesRelayoutBound = false;
+    let seriesZoomed = false;
+    let liveSource = null; //stream of new rows of selected station and parameter
+    let liveRefetch = Promise.resolve(); //refetches of resampled buckets are applied in order of notifications
+
+    function formatDateTimeForBackend(value) { //plotly range like '2020-03-01 12:34:56.789', rounded to hour so zoom requests can be cached
+        const text = String(value).replace(' ', 'T');
+        return text.length >= 13 ? `${text.substring(0, 13)}:00` : text;
+    }
+
+    function seriesMaxPoints() { //point budget of time series requests from chart pixel width, server picks resolution fitting into it
+        const width = seriesChart.clientWidth || 1000;
+        return Math.max(POINTS_STEP, Math.round(width * POINTS_PER_PIXEL / POINTS_STEP) * POINTS_STEP);
+    }
+
+    function traceType(points) {
+        return points > WEBGL_THRESHOLD ? 'scattergl' : 'scatter';
+    }
+
+    function fetchSeries(selection, start, end) {
+        if (seriesController) {
+            seriesController.abort();
+        }
+        seriesController = new AbortController();
+        const query = `start=${encodeURIComponent(start)}&end=${encodeURIComponent(end)}&resample=auto&max_points=${seriesMaxPoints()}`;
+        return cachedFetch(selection.stationId, `/api/stations/${selection.stationId}/${selection.valueField}/dataseries/?${query}`, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            signal: seriesController.signal
+        });
+    }
+
+    function renderSeries(selection, responseData, range) { //react keeps chart and its event handlers, only data and range change
+        const data = responseData.data;
+        const trace = {
+            x: data.map(item => item.date),
+            y: data.map(item => item.value),
+            mode: 'lines',
+            name: RESAMPLE_LABELS[responseData.resample] || 'Hourly Values',
+            line: {color: '#005f85'},
+            type: traceType(data.length),
+            connectgaps: false
+        };
+
+        const layout = {
+            title: `Time series`,
+            xaxis: {
+                title: `date`,
+                type: 'date',
+            },
+            yaxis: {
+                title: `${selection.parLabel} [${selection.parUnit}]`
+            }
+        };
+        if (range) {
+            layout.xaxis.range = range;
+        }
+        seriesZoomed = Boolean(range);
+        Plotly.react(seriesChart, [trace], layout);
+        if (!seriesRelayoutBound) {
+            seriesChart.on('plotly_relayout', onSeriesRelayout);
+            seriesRelayoutBound = true;
+        }
+    }
+
+    function onSeriesRelayout(event) { //zoom or pan requests visible window in finer resolution, reset returns to overview
+        if (!seriesOverview) return;
+        clearTimeout(seriesRelayoutTimer);
+        if (event['xaxis.autorange']) {
+            if (seriesController) {
+                seriesController.abort();
+            }
+            renderSeries(seriesOverview.selection, seriesOverview.responseData, null);
+            return;
+        }
+        const range = event['xaxis.range'] || [event['xaxis.range[0]'], event['xaxis.range[1]']];
+        if (range[0] === undefined || range[1] === undefined) return;
+
+        const selection = seriesOverview.selection;
+        seriesRelayoutTimer = setTimeout(() => {
+            fetchSeries(selection, formatDateTimeForBackend(range[0]), formatDateTimeForBackend(range[1]))
+                .then(responseData => renderSeries(selection, responseData, range))
+                .catch(error => {
+                    if (error.name !== 'AbortError') console.error('Error fetching chart data:', error);
+                });
+        }, SERIES_RELAYOUT_DELAY);
+    }
+
+    function pointIndex(data, date) { //binary search in points ordered by date, first point not before date
+        let lo = 0;
+        let hi = data.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (data[mid].date < date) {
+                lo = mid + 1;
+            } else {
+                hi = mid;
             }
-        ).catch(error => console.error('Error fetching chart data:', error)); 
+        }
+        return lo;
+    }
+
+    function refetchBuckets(selection, rows) { //buckets touched by new or re-sent rows are aggregated again by server, the same way as the rest of overview
+        const dates = rows.map(row => row.date).sort();
+        liveRefetch = liveRefetch.then(() => {
+            if (!seriesOverview || seriesOverview.selection !== selection) return;
+            const responseData = seriesOverview.responseData;
+            const data = responseData.data;
+            let index = pointIndex(data, dates[0]);
+            if (index > 0 && (index === data.length || data[index].date > dates[0])) index -= 1; //bucket containing first row starts before it
+            const start = data.length ? data[index].date : dates[0];
+            const [day, month, year] = responseData.max_date.split('-');
+            const knownEnd = `${year}-${month}-${day}T23:00:00`; //buckets after re-sent rows are kept in refetched range
+            const end = dates[dates.length - 1] > knownEnd ? dates[dates.length - 1] : knownEnd;
+            const query = `start=${encodeURIComponent(start)}&end=${encodeURIComponent(end)}&resample=${responseData.resample}`;
+            return fetch(`/api/stations/${selection.stationId}/${selection.valueField}/dataseries/?${query}`, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+                .then(response => response.json())
+                .then(refetched => {
+                    if (seriesOverview === null || seriesOverview.responseData !== responseData) return; //selection changed meanwhile
+                    data.splice(index, data.length - index, ...refetched.data);
+                    responseData.max_date = refetched.max_date;
+                    if (!seriesZoomed) {
+                        Plotly.restyle(seriesChart, {x: [data.map(item => item.date)], y: [data.map(item => item.value)]}, [0]);
+                    }
+                });
+        }).catch(error => console.error('Error refetching live buckets:', error));
+    }
+
+    function subscribeLive(selection) { //new hourly values are pushed by server (only when served by ASGI), no polling of dataseries
+        if (liveSource) {
+            liveSource.close();
+            liveSource = null;
+        }
+        if (!window.EventSource) return;
+        liveSource = new EventSource(`/live/stations/${selection.stationId}/?fields=${selection.valueField}`);
+        liveSource.addEventListener('rows', event => {
+            const message = JSON.parse(event.data);
+            delete dataVersions[selection.stationId]; //stored responses of station are revalidated on next fetch
+            const isWholeSeries = seriesOverview && seriesOverview.selection === selection && rangePicker.selectedDates.length !== 2;
+            if (!isWholeSeries || !message.rows.length) return;
+            if (seriesOverview.responseData.resample) { //overview of resample=auto, hourly rows can not be appended to aggregated points
+                refetchBuckets(selection, message.rows);
+                return;
+            }
+            const data = seriesOverview.responseData.data;
+            const dates = [];
+            const values = [];
+            let replaced = false;
+            message.rows.forEach(row => { //rows up to last plotted hour were re-sent, corrected or filled in late by ingest, they replace points instead of duplicating them
+                const point = {date: row.date, value: row[selection.valueField]};
+                if (!data.length || point.date > data[data.length - 1].date) { //iso dates of same format compare as strings
+                    data.push(point);
+                    dates.push(point.date);
+                    values.push(point.value);
+                    return;
+                }
+                const index = pointIndex(data, point.date);
+                data.splice(index, data[index].date === point.date ? 1 : 0, point);
+                replaced = true;
+            });
+            if (seriesZoomed || (!dates.length && !replaced)) return;
+            if (replaced) {
+                Plotly.restyle(seriesChart, {x: [data.map(item => item.date)], y: [data.map(item => item.value)]}, [0]);
+            } else {
+                Plotly.extendTraces(seriesChart, {x: [dates], y: [values]}, [0]);
+            }
+        });
+        liveSource.addEventListener('reload', () => { //too many new rows for stream
+            delete dataVersions[selection.stationId];
+            fetchDataAndRenderSeriesChart();
+        });
+    }
+
+    function fetchDataAndRenderSeriesChart() { //also updates date picker with value range
+        const stationId = stationDropdown.value;
+        const valueField = valueDropdown.value;
+        const startDate = rangePicker.selectedDates[0];
+        const endDate = rangePicker.selectedDates[1];
+
+        if (!stationId || !valueField) return;
+        const selection = {
+            stationId: stationId,
+            valueField: valueField,
+            parLabel: valueDropdown.options[valueDropdown.selectedIndex].textContent,
+            parUnit: valueDropdown.options[valueDropdown.selectedIndex].getAttribute('unit')
+        };
+
+        const formattedStartDate = formatDateForBackend(startDate);
+        const formattedEndDate = formatDateForBackend(endDate);
+
+        clearTimeout(seriesRelayoutTimer);
+        seriesOverview = null;
+        fetchSeries(selection, formattedStartDate, formattedEndDate)
+            .then(responseData => {
+                seriesOverview = {selection: selection, responseData: responseData};
+                renderSeries(selection, responseData, null);
+                subscribeLive(selection);
+                updateDatePicker(rangePicker, responseData.min_date, responseData.max_date);
+            }
+        ).catch(error => {
+            if (error.name !== 'AbortError') console.error('Error fetching chart data:', error);
+        });
     }
 
     stationDropdown.addEventListener("change", function() {